@@ -5,3 +5,7 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
     verbose_name = "Пользователи и Аккаунты"
+
+    def ready(self):
+        from apps.accounts.signals import connect_signals
+        connect_signals()
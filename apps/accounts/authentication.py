@@ -0,0 +1,75 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.accounts.models import CachedUser
+
+USER_VERSION_KEY = 'accounts:user:{id}:version'
+USER_CACHE_KEY = 'accounts:jwt_user:{id}:{version}'
+# The only fields kept in the cache; never the password hash or profile data
+CACHED_USER_FIELDS = ('id', 'is_active', 'is_staff', 'is_superuser')
+
+
+def _cache():
+    return caches[settings.JWT_USER_CACHE]
+
+
+def get_user_cache_version(user_id):
+    key = USER_VERSION_KEY.format(id=user_id)
+    version = _cache().get(key)
+    if version is None:
+        version = time.time_ns()
+        # add() so that concurrent first requests agree on one version
+        if not _cache().add(key, version, timeout=None):
+            version = _cache().get(key, version)
+    return version
+
+
+def invalidate_cached_user(user_id):
+    """Move the user to a new version so every worker stops using the cached instance."""
+    _cache().set(USER_VERSION_KEY.format(id=user_id), time.time_ns(), timeout=None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that keeps the fields of the resolved user it checks
+    (``CACHED_USER_FIELDS``) in the shared cache for ``JWT_USER_CACHE_TTL`` seconds,
+    keyed by user id and the user's cache version. The user is rebuilt from them as a
+    :class:`~apps.accounts.models.CachedUser` with every other field deferred; the
+    first access to one loads the rest.
+
+    The version is bumped by ``apps.accounts.signals`` whenever the user is saved
+    (profile update, password change) or deleted. With ``CHECK_REVOKE_TOKEN`` the
+    password is needed on every request, so users are not cached.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.JWT_USER_CACHE_TTL or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = USER_CACHE_KEY.format(id=user_id, version=get_user_cache_version(user_id))
+        values = _cache().get(key)
+        if values is None:
+            user = super().get_user(validated_token)
+            _cache().set(key, {name: getattr(user, name) for name in CACHED_USER_FIELDS}, settings.JWT_USER_CACHE_TTL)
+            return user
+
+        # from_db() takes the values in field order, the missing fields are deferred
+        names = [field.attname for field in CachedUser._meta.concrete_fields if field.attname in values]
+        user = CachedUser.from_db(router.db_for_read(CachedUser), names, [values[name] for name in names])
+        # The same check JWTAuthentication runs after loading the user
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
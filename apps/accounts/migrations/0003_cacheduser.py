@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-19 17:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_customuser_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('accounts.customuser',),
+        ),
+    ]
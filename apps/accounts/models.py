@@ -42,3 +42,21 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
             return email
         else:
             return f"User {self.pk}"
+
+
+class CachedUser(CustomUser):
+    """
+    The user ``CachedJWTAuthentication`` restores from the cache. It only carries the
+    fields authentication needs; the first access to any other field loads all of
+    them in one query instead of one query per field.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        if fields is not None:
+            deferred_fields = self.get_deferred_fields()
+            if deferred_fields and set(fields) <= deferred_fields:
+                fields = deferred_fields
+        super().refresh_from_db(using, fields, from_queryset)
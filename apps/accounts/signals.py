@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.accounts.authentication import invalidate_cached_user
+from apps.accounts.models import CachedUser, CustomUser
+
+
+def user_changed(sender, instance, **kwargs):
+    if instance.pk is not None:
+        invalidate_cached_user(instance.pk)
+
+
+def connect_signals():
+    # Signals are sent with the proxy class when request.user itself is saved
+    for model in (CustomUser, CachedUser):
+        uid = f'cached_jwt_user_{model._meta.model_name}'
+        post_save.connect(user_changed, sender=model, dispatch_uid=f'{uid}_save')
+        post_delete.connect(user_changed, sender=model, dispatch_uid=f'{uid}_delete')
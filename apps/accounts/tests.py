@@ -1,3 +1,83 @@
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from apps.accounts.authentication import CACHED_USER_FIELDS, USER_CACHE_KEY, CachedJWTAuthentication, get_user_cache_version
+from apps.accounts.models import CustomUser
+from apps.core.testing import TEST_CACHES, Endpoint, QueryBudgetTestCase
+
+
+class AccountsQueryBudgetTests(QueryBudgetTestCase):
+    urls_module = 'apps.accounts.urls'
+    endpoints = {
+        'signup': Endpoint('post', budget=2, status=201, data=lambda test, size: {
+            'email': f'new{size}@example.com', 'first_name': 'New', 'last_name': 'User',
+            'password': test.password, 'password_confirm': test.password, 'is_agree': True,
+        }),
+        'signin': Endpoint('post', budget=1, data=lambda test, size: {
+            'identifier': test.customer.email, 'password': test.password,
+        }),
+        'user-detail': Endpoint(auth=True, budget=1),
+        'user-by-id': Endpoint(auth=True, budget=2, kwargs=lambda test, size: {'id': test.customer.id}),
+        'update-password': Endpoint('patch', auth=True, budget=2, data=lambda test, size: {'new_password': test.password}),
+    }
+
+
+@override_settings(CACHES=TEST_CACHES, JWT_USER_CACHE='shared', JWT_USER_CACHE_TTL=300)
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='cached@example.com', username='cached', password='secret-password')
+        self.token = AccessToken.for_user(self.user)
+        self.authentication = CachedJWTAuthentication()
+
+    def cached_user(self):
+        """Fill the cache and return the user restored from it."""
+        self.authentication.get_user(self.token)
+        with self.assertNumQueries(0):
+            return self.authentication.get_user(self.token)
+
+    def reloaded_user(self):
+        """The user loaded from the database again, i.e. the cached entry was invalidated."""
+        with self.assertNumQueries(1):
+            return self.authentication.get_user(self.token)
+
+    def test_cached_user(self):
+        cached_user = self.cached_user()
+        key = USER_CACHE_KEY.format(id=self.user.pk, version=get_user_cache_version(self.user.pk))
+        self.assertEqual(set(caches['shared'].get(key)), set(CACHED_USER_FIELDS))
+        self.assertEqual(cached_user, self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual((cached_user.email, cached_user.username), ('cached@example.com', 'cached'))
+            self.assertTrue(cached_user.check_password('secret-password'))
+
+    def test_only_cached_users_load_all_deferred_fields(self):
+        user = CustomUser.objects.only('id').get(pk=self.user.pk)
+        with self.assertNumQueries(2):
+            self.assertEqual((user.email, user.username), ('cached@example.com', 'cached'))
+
+    def test_invalidated_on_save(self):
+        self.cached_user()
+        self.user.first_name = 'Changed'
+        self.user.save()
+        self.assertEqual(self.reloaded_user().first_name, 'Changed')
+
+    def test_invalidated_on_password_change(self):
+        # The password view saves request.user, i.e. the restored user itself
+        cached_user = self.cached_user()
+        cached_user.set_password('new-secret-password')
+        cached_user.save()
+        self.assertTrue(self.reloaded_user().check_password('new-secret-password'))
+
+    def test_invalidated_on_deactivation(self):
+        self.cached_user()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_invalidated_on_delete(self):
+        self.cached_user()
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.contrib import admin
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.analytics.models import (
+    RollupWatermark, SalesHourlyRollup, ProductSalesDailyRollup, ReviewDailyRollup
+)
+from apps.market.models import Product
+
+
+@admin.register(SalesHourlyRollup)
+class SalesDashboardAdmin(admin.ModelAdmin):
+    """
+    Sales and reviews dashboard. Reads only the rollup tables filled by
+    ``manage.py update_rollups``, never the Order or review tables.
+    """
+    change_list_template = 'admin/analytics/dashboard.html'
+
+    def changelist_view(self, request, extra_context=None):
+        now = timezone.now()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        today = today_start.date()
+
+        today_totals = SalesHourlyRollup.objects.filter(bucket__gte=today_start).aggregate(
+            revenue=Sum('revenue'), orders=Sum('orders_count'), units=Sum('units_sold'),
+        )
+        last_24_hours = SalesHourlyRollup.objects.filter(bucket__gte=now - timedelta(hours=24)).order_by('bucket')
+
+        top_sellers = list(
+            ProductSalesDailyRollup.objects.filter(date__gte=today - timedelta(days=6), product__isnull=False)
+            .values('product_id').annotate(units=Sum('units_sold'), revenue=Sum('revenue'))
+            .order_by('-units')[:10]
+        )
+        products = Product.objects.prefetch_related('translations').in_bulk([row['product_id'] for row in top_sellers])
+        for row in top_sellers:
+            row['product'] = products.get(row['product_id'])
+
+        rating_trend = list(
+            ReviewDailyRollup.objects.filter(date__gte=today - timedelta(days=29))
+            .values('date').annotate(reviews=Sum('reviews_count'), rating_sum=Sum('rating_sum'))
+            .order_by('date')
+        )
+        for row in rating_trend:
+            row['average'] = round(row['rating_sum'] / row['reviews'], 2) if row['reviews'] else None
+
+        context = {
+            'title': 'Панель продаж',
+            'today_totals': today_totals,
+            'last_24_hours': last_24_hours,
+            'top_sellers': top_sellers,
+            'rating_trend': rating_trend,
+            'watermarks': RollupWatermark.objects.all(),
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context=context)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.rollups import update_sales_rollups, update_review_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Incrementally fold new orders and reviews into the analytics rollup tables. "
+        "Only rows after the stored watermark are read, so it is meant to run from cron, "
+        "e.g. every 5 minutes: */5 * * * * python manage.py update_rollups"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Source rows folded per transaction")
+
+    def handle(self, *args, **options):
+        orders = update_sales_rollups(batch_size=options['batch_size'])
+        reviews = update_review_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rollups updated: {orders} orders, {reviews} reviews"))
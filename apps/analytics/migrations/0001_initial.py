@@ -0,0 +1,76 @@
+# Generated by Django 5.1.4 on 2026-10-19 16:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('market', '0008_product_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True, verbose_name='Источник')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Последний обработанный ID')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Водяной знак агрегации',
+                'verbose_name_plural': 'Водяные знаки агрегации',
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(unique=True, verbose_name='Час')),
+                ('orders_count', models.PositiveIntegerField(default=0, verbose_name='Количество заказов')),
+                ('units_sold', models.PositiveIntegerField(default=0, verbose_name='Продано единиц')),
+                ('revenue', models.FloatField(default=0.0, verbose_name='Выручка')),
+            ],
+            options={
+                'verbose_name': 'Продажи по часам',
+                'verbose_name_plural': 'Продажи по часам',
+                'ordering': ['-bucket'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSalesDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('units_sold', models.PositiveIntegerField(default=0, verbose_name='Продано единиц')),
+                ('revenue', models.FloatField(default=0.0, verbose_name='Выручка')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_sales', to='market.product', verbose_name='Продукт')),
+            ],
+            options={
+                'verbose_name': 'Продажи продукта по дням',
+                'verbose_name_plural': 'Продажи продуктов по дням',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='product_sales_daily_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_reviews', to='market.product', verbose_name='Продукт')),
+            ],
+            options={
+                'verbose_name': 'Отзывы по дням',
+                'verbose_name_plural': 'Отзывы по дням',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='review_daily_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.market.models import Product
+
+
+class RollupWatermark(models.Model):
+    """Last source row id folded into the rollup tables, one row per source table."""
+    source = models.CharField(_("Источник"), max_length=50, unique=True)
+    last_id = models.BigIntegerField(_("Последний обработанный ID"), default=0)
+    updated_at = models.DateTimeField(_("Дата обновления"), auto_now=True)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"{self.source}: {self.last_id}"
+
+    class Meta:
+        verbose_name = _("Водяной знак агрегации")
+        verbose_name_plural = _("Водяные знаки агрегации")
+
+
+class SalesHourlyRollup(models.Model):
+    bucket = models.DateTimeField(_("Час"), unique=True)
+    orders_count = models.PositiveIntegerField(_("Количество заказов"), default=0)
+    units_sold = models.PositiveIntegerField(_("Продано единиц"), default=0)
+    revenue = models.FloatField(_("Выручка"), default=0.0)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H:00}: {self.revenue}"
+
+    class Meta:
+        ordering = ["-bucket"]
+        verbose_name = _("Продажи по часам")
+        verbose_name_plural = _("Продажи по часам")
+
+
+class ProductSalesDailyRollup(models.Model):
+    date = models.DateField(_("Дата"))
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True, related_name='daily_sales', verbose_name=_("Продукт"))
+    units_sold = models.PositiveIntegerField(_("Продано единиц"), default=0)
+    revenue = models.FloatField(_("Выручка"), default=0.0)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"{self.date}: product #{self.product_id} x {self.units_sold}"
+
+    class Meta:
+        ordering = ["-date"]
+        verbose_name = _("Продажи продукта по дням")
+        verbose_name_plural = _("Продажи продуктов по дням")
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='product_sales_daily_unique'),
+        ]
+
+
+class ReviewDailyRollup(models.Model):
+    date = models.DateField(_("Дата"))
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True, related_name='daily_reviews', verbose_name=_("Продукт"))
+    reviews_count = models.PositiveIntegerField(_("Количество отзывов"), default=0)
+    rating_sum = models.PositiveIntegerField(_("Сумма оценок"), default=0)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"{self.date}: product #{self.product_id} {self.reviews_count} reviews"
+
+    class Meta:
+        ordering = ["-date"]
+        verbose_name = _("Отзывы по дням")
+        verbose_name_plural = _("Отзывы по дням")
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='review_daily_unique'),
+        ]
@@ -0,0 +1,145 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from apps.analytics.models import (
+    RollupWatermark, SalesHourlyRollup, ProductSalesDailyRollup, ReviewDailyRollup
+)
+from apps.market.models import CommentAndReviewProduct
+from apps.order.models import Order, OrderLine
+
+PAID_STATE = 4
+
+logger = logging.getLogger(__name__)
+
+
+def _add_to_rollup(model, key, **increments):
+    """Add ``increments`` to the rollup row identified by ``key``, creating it if needed."""
+    updated = model.objects.filter(**key).update(
+        **{field: F(field) + value for field, value in increments.items()}
+    )
+    if not updated:
+        model.objects.create(**key, **increments)
+
+
+def _next_batch(queryset, watermark, batch_size):
+    """
+    Return the highest id of the next batch after the watermark, or None when caught up.
+
+    Rows younger than ROLLUP_SAFETY_LAG are left for the next run: a transaction that
+    got a lower id may still be committing, and the watermark must never skip it.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.ROLLUP_SAFETY_LAG)
+    ids = list(
+        queryset.filter(id__gt=watermark.last_id, created_at__lte=cutoff)
+        .order_by('id').values_list('id', flat=True)[:batch_size]
+    )
+    return ids[-1] if ids else None
+
+
+def _next_order_batch(watermark, batch_size):
+    """
+    Like :func:`_next_batch`, but stops before the first order whose payment is still
+    in progress: it is folded once Payme reports it paid (or cancelled). Orders pending
+    for longer than ROLLUP_PENDING_TIMEOUT no longer hold the watermark back.
+    """
+    upper_id = _next_batch(Order.objects.all(), watermark, batch_size)
+    if upper_id is None:
+        return None
+    pending = Order.objects.filter(id__gt=watermark.last_id, id__lte=upper_id).exclude(
+        payment_status__in=Order.TERMINAL_STATES,
+    )
+    pending_cutoff = timezone.now() - timedelta(seconds=settings.ROLLUP_PENDING_TIMEOUT)
+    first_pending = (
+        pending.filter(created_at__gt=pending_cutoff).order_by('id').values_list('id', flat=True).first()
+    )
+    if first_pending is not None:
+        upper_id = first_pending - 1
+        if upper_id <= watermark.last_id:
+            return None
+    abandoned = pending.filter(id__lte=upper_id).count()
+    if abandoned:
+        logger.warning("Folding %d orders still pending after ROLLUP_PENDING_TIMEOUT as unpaid", abandoned)
+    return upper_id
+
+
+def _lock_watermark(source):
+    watermark, _ = RollupWatermark.objects.get_or_create(source=source)
+    # Serialises concurrent runs of the command
+    return RollupWatermark.objects.select_for_update().get(pk=watermark.pk)
+
+
+def update_sales_rollups(batch_size=5000):
+    """Fold orders whose payment has completed since the last run into the hourly and per-product daily rollups."""
+    processed = 0
+    while True:
+        with transaction.atomic():
+            watermark = _lock_watermark('orders')
+            upper_id = _next_order_batch(watermark, batch_size)
+            if upper_id is None:
+                return processed
+
+            id_range = {'id__gt': watermark.last_id, 'id__lte': upper_id}
+            orders = Order.objects.filter(payment_status=PAID_STATE, **id_range)
+            lines = OrderLine.objects.filter(
+                order__payment_status=PAID_STATE,
+                order_id__gt=watermark.last_id, order_id__lte=upper_id,
+            )
+
+            hourly = {
+                row['bucket']: {'orders_count': row['orders_count'], 'revenue': row['revenue'] or 0.0, 'units_sold': 0}
+                for row in orders.annotate(bucket=TruncHour('created_at'))
+                .values('bucket').annotate(orders_count=Count('id'), revenue=Sum('total_price'))
+            }
+            for row in lines.annotate(bucket=TruncHour('created_at')).values('bucket').annotate(units=Sum('quantity')):
+                hourly.setdefault(row['bucket'], {'orders_count': 0, 'revenue': 0.0, 'units_sold': 0})
+                hourly[row['bucket']]['units_sold'] = row['units'] or 0
+            for bucket, values in hourly.items():
+                _add_to_rollup(SalesHourlyRollup, {'bucket': bucket}, **values)
+
+            daily = (
+                lines.annotate(date=TruncDate('created_at'))
+                .values('date', 'product_id')
+                .annotate(units=Sum('quantity'), revenue=Sum(F('unit_price') * F('quantity')))
+            )
+            for row in daily:
+                _add_to_rollup(
+                    ProductSalesDailyRollup, {'date': row['date'], 'product_id': row['product_id']},
+                    units_sold=row['units'] or 0, revenue=row['revenue'] or 0.0,
+                )
+
+            processed += Order.objects.filter(**id_range).count()
+            watermark.last_id = upper_id
+            watermark.save(update_fields=['last_id', 'updated_at'])
+
+
+def update_review_rollups(batch_size=5000):
+    """Fold reviews created since the last run into the per-product daily rollup."""
+    processed = 0
+    while True:
+        with transaction.atomic():
+            watermark = _lock_watermark('reviews')
+            upper_id = _next_batch(CommentAndReviewProduct.objects.all(), watermark, batch_size)
+            if upper_id is None:
+                return processed
+
+            reviews = CommentAndReviewProduct.objects.filter(id__gt=watermark.last_id, id__lte=upper_id)
+            daily = (
+                reviews.annotate(date=TruncDate('created_at'))
+                .values('date', 'product_id')
+                .annotate(reviews_count=Count('id'), rating_sum=Sum('review_rating'))
+            )
+            for row in daily:
+                _add_to_rollup(
+                    ReviewDailyRollup, {'date': row['date'], 'product_id': row['product_id']},
+                    reviews_count=row['reviews_count'], rating_sum=row['rating_sum'] or 0,
+                )
+
+            processed += reviews.count()
+            watermark.last_id = upper_id
+            watermark.save(update_fields=['last_id', 'updated_at'])
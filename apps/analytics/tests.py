@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.models import CustomUser
+from apps.analytics.models import RollupWatermark, SalesHourlyRollup
+from apps.analytics.rollups import update_sales_rollups
+from apps.order.models import Order
+
+
+@override_settings(ROLLUP_SAFETY_LAG=0, ROLLUP_PENDING_TIMEOUT=3600)
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', username='buyer', password='x')
+
+    def order(self, payment_status, age=timedelta(minutes=5)):
+        order = Order.objects.create(user=self.user, total_price=100.0, payment_status=payment_status)
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - age)
+        return order
+
+    def revenue(self):
+        return sum(SalesHourlyRollup.objects.values_list('revenue', flat=True))
+
+    def test_order_paid_after_creation_is_counted(self):
+        self.order(4)
+        pending = self.order(0)
+        self.order(4)
+        update_sales_rollups()
+        # The watermark waits at the pending order
+        self.assertEqual(self.revenue(), 100.0)
+        self.assertEqual(RollupWatermark.objects.get(source='orders').last_id, pending.pk - 1)
+
+        Order.objects.filter(pk=pending.pk).update(payment_status=4)
+        update_sales_rollups()
+        self.assertEqual(self.revenue(), 300.0)
+
+    def test_abandoned_order_does_not_block(self):
+        self.order(0, age=timedelta(hours=2))
+        last = self.order(4)
+        update_sales_rollups()
+        self.assertEqual(self.revenue(), 100.0)
+        self.assertEqual(RollupWatermark.objects.get(source='orders').last_id, last.pk)
@@ -2,13 +2,15 @@ from django.contrib import admin
 from django.utils.html import format_html
 from parler.admin import TranslatableAdmin
 
+from apps.core.admin import TranslationPrefetchAdminMixin
 from apps.banner.models import (
 	Banner, Partner, Advertisement, Blog
 )
 
 
 @admin.register(Banner)
-class BannerAdmin(TranslatableAdmin):
+class BannerAdmin(TranslationPrefetchAdminMixin, TranslatableAdmin):
+	translated_field = 'title'
 	list_display = ('image_preview', 'russian_title', 'get_translation_status', 'created_at')
 	search_fields = ('translations__title',)
 	list_filter = ('created_at',)
@@ -26,32 +28,6 @@ class BannerAdmin(TranslatableAdmin):
 	)
 	readonly_fields = ('image_preview', 'created_at')
 
-	def russian_title(self, obj):
-		"""Return Russian translation of the title"""
-		try:
-			obj.set_current_language('ru')
-			return obj.title or 'Без названия'
-		except:
-			return obj.safe_translation_getter('title', any_language=True) or 'Без названия'
-	
-	russian_title.short_description = 'Название (RU)'
-
-	def get_translation_status(self, obj):
-		"""Показать статус переводов"""
-		languages = [('ru', 'RU'), ('en', 'EN'), ('uz', 'UZ'), ('kk', 'KK'), ('ko', 'KO')]
-		completed = []
-		for lang_code, lang_name in languages:
-			try:
-				obj.set_current_language(lang_code)
-				title = obj.title
-				if title and title.strip():  # Check if title exists and is not empty/whitespace
-					completed.append(lang_name)
-			except:
-				pass
-		return f"{len(completed)}/5 ({', '.join(completed)})" if completed else "0/5"
-	
-	get_translation_status.short_description = 'Переводы'
-
 	def image_preview(self, obj):
 		if obj.image:
 			return format_html(
@@ -70,7 +46,8 @@ class BannerAdmin(TranslatableAdmin):
 
 
 @admin.register(Partner)
-class PartnerAdmin(TranslatableAdmin):
+class PartnerAdmin(TranslationPrefetchAdminMixin, TranslatableAdmin):
+	translated_field = 'title'
 	list_display = ('image_preview', 'russian_title', 'get_translation_status', 'created_at')
 	search_fields = ('translations__title',)
 	list_filter = ('created_at',)
@@ -88,32 +65,6 @@ class PartnerAdmin(TranslatableAdmin):
 	)
 	readonly_fields = ('image_preview', 'created_at')
 
-	def russian_title(self, obj):
-		"""Return Russian translation of the title"""
-		try:
-			obj.set_current_language('ru')
-			return obj.title or 'Без названия'
-		except:
-			return obj.safe_translation_getter('title', any_language=True) or 'Без названия'
-	
-	russian_title.short_description = 'Название (RU)'
-
-	def get_translation_status(self, obj):
-		"""Показать статус переводов"""
-		languages = [('ru', 'RU'), ('en', 'EN'), ('uz', 'UZ'), ('kk', 'KK'), ('ko', 'KO')]
-		completed = []
-		for lang_code, lang_name in languages:
-			try:
-				obj.set_current_language(lang_code)
-				title = obj.title
-				if title and title.strip():  # Check if title exists and is not empty/whitespace
-					completed.append(lang_name)
-			except:
-				pass
-		return f"{len(completed)}/5 ({', '.join(completed)})" if completed else "0/5"
-	
-	get_translation_status.short_description = 'Переводы'
-
 	def image_preview(self, obj):
 		if obj.image:
 			return format_html(
@@ -132,7 +83,8 @@ class PartnerAdmin(TranslatableAdmin):
 
 
 @admin.register(Advertisement)
-class AdvertisementAdmin(TranslatableAdmin):
+class AdvertisementAdmin(TranslationPrefetchAdminMixin, TranslatableAdmin):
+	translated_field = 'title'
 	list_display = ('image_preview', 'russian_title', 'get_translation_status', 'created_at')
 	search_fields = ('translations__title',)
 	list_filter = ('created_at',)
@@ -150,32 +102,6 @@ class AdvertisementAdmin(TranslatableAdmin):
 	)
 	readonly_fields = ('image_preview', 'created_at')
 
-	def russian_title(self, obj):
-		"""Return Russian translation of the title"""
-		try:
-			obj.set_current_language('ru')
-			return obj.title or 'Без названия'
-		except:
-			return obj.safe_translation_getter('title', any_language=True) or 'Без названия'
-	
-	russian_title.short_description = 'Название (RU)'
-
-	def get_translation_status(self, obj):
-		"""Показать статус переводов"""
-		languages = [('ru', 'RU'), ('en', 'EN'), ('uz', 'UZ'), ('kk', 'KK'), ('ko', 'KO')]
-		completed = []
-		for lang_code, lang_name in languages:
-			try:
-				obj.set_current_language(lang_code)
-				title = obj.title
-				if title and title.strip():  # Check if title exists and is not empty/whitespace
-					completed.append(lang_name)
-			except:
-				pass
-		return f"{len(completed)}/5 ({', '.join(completed)})" if completed else "0/5"
-	
-	get_translation_status.short_description = 'Переводы'
-
 	def image_preview(self, obj):
 		if obj.image:
 			return format_html(
@@ -194,7 +120,8 @@ class AdvertisementAdmin(TranslatableAdmin):
 
 
 @admin.register(Blog)
-class BlogAdmin(TranslatableAdmin):
+class BlogAdmin(TranslationPrefetchAdminMixin, TranslatableAdmin):
+	translated_field = 'title'
 	list_display = ('image_preview', 'russian_title', 'get_translation_status', 'created_at')
 	search_fields = ('translations__title',)
 	list_filter = ('created_at',)
@@ -212,32 +139,6 @@ class BlogAdmin(TranslatableAdmin):
 	)
 	readonly_fields = ('image_preview', 'created_at')
 
-	def russian_title(self, obj):
-		"""Return Russian translation of the title"""
-		try:
-			obj.set_current_language('ru')
-			return obj.title or 'Без названия'
-		except:
-			return obj.safe_translation_getter('title', any_language=True) or 'Без названия'
-	
-	russian_title.short_description = 'Название (RU)'
-
-	def get_translation_status(self, obj):
-		"""Показать статус переводов"""
-		languages = [('ru', 'RU'), ('en', 'EN'), ('uz', 'UZ'), ('kk', 'KK'), ('ko', 'KO')]
-		completed = []
-		for lang_code, lang_name in languages:
-			try:
-				obj.set_current_language(lang_code)
-				title = obj.title
-				if title and title.strip():  # Check if title exists and is not empty/whitespace
-					completed.append(lang_name)
-			except:
-				pass
-		return f"{len(completed)}/5 ({', '.join(completed)})" if completed else "0/5"
-	
-	get_translation_status.short_description = 'Переводы'
-
 	def image_preview(self, obj):
 		if obj.image:
 			return format_html(
@@ -5,3 +5,7 @@ class BannerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.banner'
     verbose_name = "Главная страница и баннеры"
+
+    def ready(self):
+        from apps.banner.signals import connect_signals
+        connect_signals()
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from apps.core.translations import translated_values
+
 from apps.banner.models import Banner, Partner, Advertisement, Blog
 
 
@@ -13,38 +15,12 @@ class BannerSerializer(serializers.ModelSerializer):
 		read_only_fields = ['created_at']
 
 	def get_translated_title(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				title = obj.title
-				if title:
-					translations[lang_code] = title
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'title', self.context.get('language'))
 
 	def get_translated_description(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				description = obj.description
-				if description:
-					translations[lang_code] = description
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'description', self.context.get('language'))
 
 
 class PartnerSerializer(serializers.ModelSerializer):
@@ -57,38 +33,12 @@ class PartnerSerializer(serializers.ModelSerializer):
 		read_only_fields = ['created_at']
 
 	def get_translated_title(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				title = obj.title
-				if title:
-					translations[lang_code] = title
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'title', self.context.get('language'))
 
 	def get_translated_description(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				description = obj.description
-				if description:
-					translations[lang_code] = description
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'description', self.context.get('language'))
 
 
 class AdvertisementSerializer(serializers.ModelSerializer):
@@ -101,38 +51,12 @@ class AdvertisementSerializer(serializers.ModelSerializer):
 		read_only_fields = ['created_at']
 
 	def get_translated_title(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				title = obj.title
-				if title:
-					translations[lang_code] = title
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'title', self.context.get('language'))
 
 	def get_translated_description(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				description = obj.description
-				if description:
-					translations[lang_code] = description
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'description', self.context.get('language'))
 
 
 class BlogSerializer(serializers.ModelSerializer):
@@ -145,35 +69,9 @@ class BlogSerializer(serializers.ModelSerializer):
 		read_only_fields = ['created_at']
 
 	def get_translated_title(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				title = obj.title
-				if title:
-					translations[lang_code] = title
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'title', self.context.get('language'))
 
 	def get_translated_content(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				content = obj.content
-				if content:
-					translations[lang_code] = content
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'content', self.context.get('language'))
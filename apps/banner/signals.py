@@ -0,0 +1,7 @@
+from apps.banner.models import Advertisement, Banner, Blog, Partner
+from apps.core.invalidation import watch_translations
+
+
+def connect_signals():
+    # Parler caches translations in the default cache; other workers must drop their copies
+    watch_translations(Banner, Partner, Advertisement, Blog)
@@ -1,3 +1,17 @@
-from django.test import TestCase
+from apps.core.testing import Endpoint, QueryBudgetTestCase
 
-# Create your tests here.
+
+class BannerQueryBudgetTests(QueryBudgetTestCase):
+	urls_module = 'apps.banner.urls'
+	endpoints = {
+		'banner-list': Endpoint(budget=3),
+		'partner-list': Endpoint(budget=3),
+		'advertisement-list': Endpoint(budget=3),
+		'blog-list': Endpoint(budget=3),
+		'blog-detail': Endpoint(budget=2, kwargs=lambda test, size: {'pk': test.blog_id}),
+	}
+
+	@property
+	def blog_id(self):
+		from apps.banner.models import Blog
+		return Blog.objects.order_by('id').values_list('id', flat=True).first()
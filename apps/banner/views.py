@@ -8,6 +8,7 @@ from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.banner.models import Banner, Partner, Advertisement, Blog
+from apps.core.translations import LANGUAGE_PARAMETER, requested_language, translations_prefetch
 from apps.banner.serializers import (
 	BannerSerializer, PartnerSerializer, AdvertisementSerializer, BlogSerializer
 )
@@ -22,20 +23,22 @@ class BannerListView(APIView):
 		operation_description='Retrieve a list of all banners.',
 		operation_summary='List Banners',
 		tags=['Banners'],
+		manual_parameters=[LANGUAGE_PARAMETER],
 		responses={
 			200: BannerSerializer(many=True, read_only=True),
 			400: 'Bad Request'
 		}
 	)
 	def get(self, request):
-		banners = Banner.objects.all()
+		language = requested_language(request)
+		banners = Banner.objects.prefetch_related(translations_prefetch('translations', Banner, language))
 		paginator = self.pagination_class()
 		page = paginator.paginate_queryset(banners, request)
 		if page is not None:
-			serializer = BannerSerializer(page, many=True, context={'request': request})
+			serializer = BannerSerializer(page, many=True, context={'request': request, 'language': language})
 			return paginator.get_paginated_response(serializer.data)
 
-		serializer = BannerSerializer(banners, many=True, context={'request': request})
+		serializer = BannerSerializer(banners, many=True, context={'request': request, 'language': language})
 		return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -48,20 +51,22 @@ class PartnerListView(APIView):
 		operation_description='Retrieve a list of all partners.',
 		operation_summary='List Partners',
 		tags=['Partners'],
+		manual_parameters=[LANGUAGE_PARAMETER],
 		responses={
 			200: PartnerSerializer(many=True, read_only=True),
 			400: 'Bad Request'
 		}
 	)
 	def get(self, request):
-		partners = Partner.objects.all()
+		language = requested_language(request)
+		partners = Partner.objects.prefetch_related(translations_prefetch('translations', Partner, language))
 		paginator = self.pagination_class()
 		page = paginator.paginate_queryset(partners, request)
 		if page is not None:
-			serializer = PartnerSerializer(page, many=True, context={'request': request})
+			serializer = PartnerSerializer(page, many=True, context={'request': request, 'language': language})
 			return paginator.get_paginated_response(serializer.data)
 
-		serializer = PartnerSerializer(partners, many=True, context={'request': request})
+		serializer = PartnerSerializer(partners, many=True, context={'request': request, 'language': language})
 		return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -74,19 +79,21 @@ class AdvertisementListView(APIView):
 		operation_description='Retrieve a list of all advertisements.',
 		operation_summary='List Advertisements',
 		tags=['Advertisements'],
+		manual_parameters=[LANGUAGE_PARAMETER],
 		responses={
 			200: AdvertisementSerializer(many=True, read_only=True),
 			400: 'Bad Request'
 		}
 	)
 	def get(self, request):
-		advertisements = Advertisement.objects.all()
+		language = requested_language(request)
+		advertisements = Advertisement.objects.prefetch_related(translations_prefetch('translations', Advertisement, language))
 		paginator = self.pagination_class()
 		page = paginator.paginate_queryset(advertisements, request)
 		if page is not None:
-			serializer = AdvertisementSerializer(page, many=True, context={'request': request})
+			serializer = AdvertisementSerializer(page, many=True, context={'request': request, 'language': language})
 			return paginator.get_paginated_response(serializer.data)
-		serializer = AdvertisementSerializer(advertisements, many=True, context={'request': request})
+		serializer = AdvertisementSerializer(advertisements, many=True, context={'request': request, 'language': language})
 		return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -99,19 +106,21 @@ class BlogListView(APIView):
 		operation_description='Retrieve a list of all blogs.',
 		operation_summary='List Blogs',
 		tags=['Blogs'],
+		manual_parameters=[LANGUAGE_PARAMETER],
 		responses={
 			200: BlogSerializer(many=True, read_only=True),
 			400: 'Bad Request'
 		}
 	)
 	def get(self, request):
-		blogs = Blog.objects.all()
+		language = requested_language(request)
+		blogs = Blog.objects.prefetch_related(translations_prefetch('translations', Blog, language))
 		paginator = self.pagination_class()
 		page = paginator.paginate_queryset(blogs, request)
 		if page is not None:
-			serializer = BlogSerializer(page, many=True, context={'request': request})
+			serializer = BlogSerializer(page, many=True, context={'request': request, 'language': language})
 			return paginator.get_paginated_response(serializer.data)
-		serializer = BlogSerializer(blogs, many=True, context={'request': request})
+		serializer = BlogSerializer(blogs, many=True, context={'request': request, 'language': language})
 		return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -123,12 +132,14 @@ class BlogDetailView(APIView):
 		operation_description='Retrieve a blog detail.',
 		operation_summary='Get Blog Detail',
 		tags=['Blogs'],
+		manual_parameters=[LANGUAGE_PARAMETER],
 		responses={
 			200: BlogSerializer(read_only=True),
 			400: 'Bad Request'
 		}
 	)
 	def get(self, request, pk):
-		blog = Blog.objects.get(pk=pk)
-		serializer = BlogSerializer(blog, context={'request': request})
+		language = requested_language(request)
+		blog = Blog.objects.prefetch_related(translations_prefetch('translations', Blog, language)).get(pk=pk)
+		serializer = BlogSerializer(blog, context={'request': request, 'language': language})
 		return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,58 @@
+class TranslationPrefetchAdminMixin:
+    """
+    Changelist helpers for ``TranslatableAdmin`` classes.
+
+    Translations are prefetched once per page and the translation columns read the
+    prefetched rows, instead of switching the object through every language.
+    """
+    translated_field = 'name'
+    list_select_related_extra = ()
+    list_prefetch_related = ()
+    translation_languages = [('ru', 'RU'), ('en', 'EN'), ('uz', 'UZ'), ('kk', 'KK'), ('ko', 'KO')]
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if self.list_select_related_extra:
+            qs = qs.select_related(*self.list_select_related_extra)
+        return qs.prefetch_related('translations', *self.list_prefetch_related)
+
+    def filled_translations(self, obj):
+        """Return ``{language_code: value}`` for the non-empty translations of the object."""
+        values = {}
+        for translation in obj.translations.all():
+            value = getattr(translation, self.translated_field, None)
+            if value and value.strip():
+                values[translation.language_code] = value
+        return values
+
+    def russian_title(self, obj):
+        """Return Russian translation, or any available one"""
+        values = self.filled_translations(obj)
+        if 'ru' in values:
+            return values['ru']
+        for lang_code, lang_name in self.translation_languages:
+            if lang_code in values:
+                return values[lang_code]
+        return 'Без названия'
+
+    russian_title.short_description = 'Название (RU)'
+
+    def get_all_translations(self, obj):
+        """Показать все переводы для быстрого просмотра"""
+        values = self.filled_translations(obj)
+        translations = [
+            f"{lang_name}: {values[lang_code]}"
+            for lang_code, lang_name in self.translation_languages if lang_code in values
+        ]
+        return " | ".join(translations) if translations else "Нет переводов"
+
+    get_all_translations.short_description = 'Переводы'
+
+    def get_translation_status(self, obj):
+        """Показать статус переводов"""
+        values = self.filled_translations(obj)
+        completed = [lang_name for lang_code, lang_name in self.translation_languages if lang_code in values]
+        total = len(self.translation_languages)
+        return f"{len(completed)}/{total} ({', '.join(completed)})" if completed else f"0/{total}"
+
+    get_translation_status.short_description = 'Переводы'
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    verbose_name = "Общее"
+
+    def ready(self):
+        # The serialize phase of the Server-Timing header wraps DRF's Serializer.data
+        # process-wide, so it is only installed when the header is enabled
+        if settings.SERVER_TIMING_ENABLED:
+            from apps.core.instrumentation import install_serializer_timing
+            install_serializer_timing()
@@ -0,0 +1,130 @@
+"""
+Helpers for the in-process benchmarks (``manage.py benchmark_endpoints``).
+
+A scenario is a callable issuing one request through ``django.test.Client``, so
+the full middleware stack, authentication, serialization and rendering are
+measured, but not the network or the WSGI server.
+"""
+import contextlib
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+import django
+from django.db import connection
+
+from apps.core.instrumentation import QueryCounter
+
+# Lower is better for every metric; a relative increase above the threshold is a regression
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'alloc_peak_kib', 'queries')
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+@contextlib.contextmanager
+def quiet_stdout():
+    """Silence the print() debugging left in some views while they are measured."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def run_scenario(call, iterations, warmup, alloc_iterations):
+    """
+    Run ``call`` ``warmup + iterations`` times and return its statistics.
+
+    ``call`` returns the response and must succeed (status < 400). Latencies and
+    query counts come from the timed iterations; allocations are measured in a
+    separate, shorter pass because tracemalloc slows everything down.
+    """
+    with quiet_stdout():
+        for _ in range(warmup):
+            _checked(call)
+
+        latencies = []
+        query_counts = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            with ExitStack() as stack:
+                queries = QueryCounter().install(stack)
+                start = time.perf_counter()
+                _checked(call)
+                latencies.append(time.perf_counter() - start)
+            query_counts.append(queries.count)
+        elapsed = time.perf_counter() - started
+
+        peaks = []
+        net = []
+        tracemalloc.start()
+        try:
+            for _ in range(alloc_iterations):
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                _checked(call)
+                after, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                net.append(after - before)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'throughput_rps': round(iterations / elapsed, 2),
+        'queries': max(query_counts),
+        'alloc_peak_kib': round(percentile(peaks, 0.50) / 1024, 1) if peaks else None,
+        'alloc_retained_kib': round(percentile(net, 0.50) / 1024, 1) if net else None,
+    }
+
+
+def _checked(call):
+    response = call()
+    if response.status_code >= 400:
+        raise RuntimeError(f"Benchmark request failed with {response.status_code}: {response.content[:500]!r}")
+    return response
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Return ``[(scenario, metric, baseline_value, current_value, change), ...]`` for every
+    metric of ``COMPARED_METRICS`` that got worse by more than ``threshold`` (0.1 = 10 %).
+    Any additional query counts as a regression.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if metric == 'queries':
+                worse = new > old
+            else:
+                worse = new > old * (1 + threshold)
+            if worse:
+                change = (new - old) / old if old else float('inf')
+                regressions.append((name, metric, old, new, change))
+    return regressions
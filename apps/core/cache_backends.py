@@ -0,0 +1,119 @@
+"""
+Cache backends that count hits and misses into ``cache_requests_total``.
+
+Set ``OPTIONS: {'METRICS_NAME': '<alias>'}`` to label the counters with the cache alias.
+The file and database backends also accept
+
+* ``CULL_LIVE_ENTRIES: False``: when ``MAX_ENTRIES`` is reached only expired entries
+  are removed, never live ones (for state such as circuit breakers and locks);
+* ``CULL_INTERVAL`` (file backend): count the entries at most every so many seconds
+  instead of on every ``set()``, which lists the whole directory.
+"""
+import logging
+import os
+import tempfile
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+
+from apps.core import metrics
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    def __init__(self, location, params):
+        params = dict(params)
+        options = dict(params.get('OPTIONS') or {})
+        self.metrics_name = options.pop('METRICS_NAME', self.__class__.__name__)
+        self.cull_live_entries = options.pop('CULL_LIVE_ENTRIES', True)
+        self.cull_interval = float(options.pop('CULL_INTERVAL', 0))
+        params['OPTIONS'] = options
+        super().__init__(location, params)
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            metrics.CACHE_REQUESTS.inc(cache=self.metrics_name, result='miss')
+            return default
+        metrics.CACHE_REQUESTS.inc(cache=self.metrics_name, result='hit')
+        return value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedFileBasedCache(InstrumentedCacheMixin, FileBasedCache):
+    _next_cull = 0
+
+    def _cull(self):
+        now = time.monotonic()
+        if now < self._next_cull:
+            return
+        self._next_cull = now + self.cull_interval
+        if self.cull_live_entries:
+            return super()._cull()
+        filelist = self._list_cache_files()
+        if len(filelist) < self._max_entries:
+            return
+        for fname in filelist:
+            try:
+                with open(fname, 'rb') as f:
+                    self._is_expired(f)  # removes the file when it has expired
+            except FileNotFoundError:
+                pass
+        remaining = len(self._list_cache_files())
+        if remaining >= self._max_entries:
+            logger.warning("Cache %s holds %d live entries, more than MAX_ENTRIES", self.metrics_name, remaining)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # FileBasedCache.add() checks and then sets. Linking the written file into place
+        # fails when the key exists, so add() works as a lock between processes.
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as f:
+                self._write_content(f, timeout, value)
+            for attempt in range(2):
+                try:
+                    os.link(tmp_path, fname)
+                    return True
+                except FileExistsError:
+                    # has_key() removes an expired file, which makes the second attempt possible
+                    if attempt or self.has_key(key, version):
+                        return False
+        finally:
+            os.remove(tmp_path)
+
+
+class InstrumentedDatabaseCache(InstrumentedCacheMixin, DatabaseCache):
+    def _cull(self, db, cursor, now, num):
+        if self.cull_live_entries:
+            return super()._cull(db, cursor, now, num)
+        connection = connections[db]
+        cursor.execute(
+            'DELETE FROM %s WHERE %s < %%s' % (
+                connection.ops.quote_name(self._table), connection.ops.quote_name('expires'),
+            ),
+            [connection.ops.adapt_datetimefield_value(now)],
+        )
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    def __init__(self, server, params):
+        # Redis evicts according to its maxmemory-policy, the client rejects Django's culling options
+        params = dict(params)
+        options = dict(params.get('OPTIONS') or {})
+        for name in ('MAX_ENTRIES', 'CULL_FREQUENCY'):
+            options.pop(name, None)
+        params['OPTIONS'] = options
+        super().__init__(server, params)
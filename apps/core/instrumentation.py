@@ -0,0 +1,123 @@
+"""Request instrumentation shared by the metrics and timing middlewares and the benchmarks."""
+import time
+from contextvars import ContextVar
+
+from django.db import connections
+from rest_framework.serializers import ListSerializer, Serializer
+
+_current_timer = ContextVar('request_phase_timer', default=None)
+
+
+def view_label(request):
+    """Name of the resolved view class (or function) of ``request``."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    view_class = getattr(match.func, 'view_class', None) or getattr(match.func, 'cls', None)
+    if view_class is not None:
+        return view_class.__name__
+    return match.view_name or match.func.__name__
+
+
+class QueryCounter:
+    """
+    ``execute_wrapper`` that counts queries and the time spent in them.
+
+    Usage::
+
+        with ExitStack() as stack:
+            queries = QueryCounter().install(stack)
+            ...
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+    def install(self, stack):
+        """Wrap every database connection for the lifetime of ``stack``."""
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+
+class QueryLog(QueryCounter):
+    """:class:`QueryCounter` that also keeps every statement with its duration."""
+
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.duration += duration
+            self.count += 1
+            self.queries.append({'sql': sql, 'params': repr(params)[:500], 'ms': round(duration * 1000, 3)})
+
+
+class PhaseTimer:
+    """Time spent per phase (``serialize``, ``render``, ...) while serving one request."""
+
+    def __init__(self):
+        self.phases = {}
+        self.depth = 0
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def activate(self):
+        return _current_timer.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current_timer.reset(token)
+
+
+def current_timer():
+    return _current_timer.get()
+
+
+def _timed_data(fget):
+    def data(self):
+        timer = _current_timer.get()
+        # Only the outermost .data is timed, nested serializers are part of it
+        if timer is None or timer.depth:
+            return fget(self)
+        timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            timer.depth -= 1
+            timer.add('serialize', time.perf_counter() - start)
+    data.timed = True
+    return data
+
+
+def install_serializer_timing():
+    """
+    Make ``Serializer.data`` and ``ListSerializer.data`` report to the active
+    :class:`PhaseTimer`.
+
+    This replaces the properties on DRF's classes for the whole process. The views
+    serialize inside their handlers, so there is no hook that could time them
+    instead. ``CoreConfig.ready()`` installs it once when ``SERVER_TIMING_ENABLED``
+    is set. Outside a timed request the wrapper only reads a context variable.
+    Calling it again does nothing.
+    """
+    for serializer_class in (Serializer, ListSerializer):
+        fget = serializer_class.data.fget
+        if not getattr(fget, 'timed', False):
+            serializer_class.data = property(_timed_data(fget))
@@ -0,0 +1,164 @@
+"""
+Cross-worker invalidation of the in-process cache level.
+
+:class:`~apps.core.tiered_cache.TieredCache` keeps values read from the shared cache
+in every worker for up to ``CACHE_LOCAL_TIMEOUT`` seconds. To drop them as soon as
+the data changes, the keys to evict are sent with PostgreSQL ``NOTIFY`` on
+``CACHE_INVALIDATION_CHANNEL`` once the transaction commits (:func:`publish`), and
+every worker runs a :class:`Listener` thread that listens on the channel and evicts
+exactly those keys from its own in-process level. Keys are published by
+
+* ``TieredCache.bump_namespace``, i.e. the product and catalog namespaces bumped by
+  ``apps.market.signals`` when products, categories, colors, images or reviews change;
+* ``TieredCache.set()``, ``delete()``, ``incr()`` and their ``_many`` variants, for every
+  key written or deleted directly;
+* :func:`watch_translations`, for parler's cached translations of a model.
+
+The listener is started from gunicorn's ``post_worker_init``. Other databases have no
+``NOTIFY``; there, and in processes without a listener, the local timeout still bounds
+how long a worker can serve an old value.
+"""
+import json
+import logging
+import os
+import select
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_delete, post_save
+from parler.cache import get_translation_cache_key
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes and more
+MAX_PAYLOAD_BYTES = 7900
+RECONNECT_DELAY = 5
+_state = {'pid': None, 'listener': None}
+
+
+def is_available(alias=DEFAULT_DB_ALIAS):
+    return settings.CACHE_INVALIDATION_ENABLED and connections[alias].vendor == 'postgresql'
+
+
+def payloads(keys):
+    """JSON lists of ``keys``, split so that each one fits in a NOTIFY payload."""
+    chunk, size = [], 2
+    for key in keys:
+        key_size = len(json.dumps(key).encode()) + 1
+        if chunk and size + key_size > MAX_PAYLOAD_BYTES:
+            yield json.dumps(chunk, separators=(',', ':'))
+            chunk, size = [], 2
+        chunk.append(key)
+        size += key_size
+    if chunk:
+        yield json.dumps(chunk, separators=(',', ':'))
+
+
+def publish(keys, version=None, using=DEFAULT_DB_ALIAS):
+    """Evict ``keys`` from the in-process cache of every worker when the current transaction commits."""
+    keys = list(dict.fromkeys(keys))
+    if version is not None:
+        # Keys of an explicit cache version are sent as [key, version]
+        keys = [[key, version] for key in keys]
+    if keys and is_available(using):
+        transaction.on_commit(lambda: _notify(keys, using), using=using)
+
+
+def _notify(keys, using):
+    try:
+        with connections[using].cursor() as cursor:
+            for payload in payloads(keys):
+                cursor.execute('SELECT pg_notify(%s, %s)', [settings.CACHE_INVALIDATION_CHANNEL, payload])
+    except Exception:
+        # The change is committed already; the other workers catch up after CACHE_LOCAL_TIMEOUT
+        logger.warning("Could not publish cache invalidation for %d keys", len(keys), exc_info=True)
+
+
+def evict(payload, cache_alias='default'):
+    """Handle one message: drop its keys from this process's in-process cache level."""
+    cache = caches[cache_alias]
+    try:
+        keys = json.loads(payload)
+    except ValueError:
+        logger.warning("Ignoring malformed cache invalidation message %r", payload[:200])
+        return
+    for key in keys:
+        if isinstance(key, list):
+            cache.evict_local(key[:1], version=key[1])
+        else:
+            cache.evict_local([key])
+
+
+class Listener(threading.Thread):
+    """Evicts the keys published by any worker; reconnects when the connection drops."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, cache_alias='default'):
+        super().__init__(name='cache-invalidation', daemon=True)
+        self.using = using
+        self.cache_alias = cache_alias
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.warning("Cache invalidation listener lost its connection", exc_info=True)
+                self._stopped.wait(RECONNECT_DELAY)
+
+    def _listen(self):
+        # A connection of its own: it blocks in select() and must stay outside transactions
+        wrapper = connections.create_connection(self.using)
+        try:
+            wrapper.ensure_connection()
+            wrapper.set_autocommit(True)
+            raw = wrapper.connection  # psycopg2, as pinned in requirements.txt
+            with raw.cursor() as cursor:
+                cursor.execute(f'LISTEN {wrapper.ops.quote_name(settings.CACHE_INVALIDATION_CHANNEL)}')
+            # Whatever was published while we were not listening is lost
+            caches[self.cache_alias].clear_local()
+            while not self._stopped.is_set():
+                if not select.select([raw], [], [], 1.0)[0]:
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    evict(raw.notifies.pop(0).payload, self.cache_alias)
+        finally:
+            wrapper.close()
+
+
+def start_listener():
+    """Start this process's listener unless it runs already or the database has no NOTIFY."""
+    if _state['pid'] == os.getpid():
+        return _state['listener']
+    if not is_available():
+        return None
+    listener = Listener()
+    listener.start()
+    _state.update(pid=os.getpid(), listener=listener)
+    return listener
+
+
+def translation_keys(translations_model, master_id):
+    return [
+        get_translation_cache_key(translations_model, master_id, code)
+        for code, name in settings.LANGUAGES
+    ]
+
+
+def translation_changed(sender, instance, **kwargs):
+    publish(translation_keys(sender, instance.master_id))
+
+
+def watch_translations(*models):
+    """Publish the parler cache keys of ``models`` whenever one of their translations changes."""
+    for model in models:
+        for translations_model in model._parler_meta.get_all_models():
+            uid = f'cache_invalidation_{translations_model._meta.label}'
+            post_save.connect(translation_changed, sender=translations_model, dispatch_uid=f'{uid}_save')
+            post_delete.connect(translation_changed, sender=translations_model, dispatch_uid=f'{uid}_delete')
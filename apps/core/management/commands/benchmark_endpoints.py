@@ -0,0 +1,164 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core.benchmarks import compare, environment, run_scenario
+from apps.market.models import Product, ProductColor
+from apps.order.models import CardDetails, Order
+from apps.order.payme_stub import PaymeStub, start_in_thread
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the catalog and order endpoints in-process against the current database "
+        "(fill it with seed_catalog first). Reports p50/p95/p99 latency, sequential throughput, "
+        "allocations and queries per scenario as JSON; --compare flags regressions against a "
+        "stored baseline and exits with an error if there are any."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help="Timed requests per scenario")
+        parser.add_argument('--warmup', type=int, default=20, help="Untimed requests per scenario")
+        parser.add_argument('--alloc-iterations', type=int, default=20,
+                            help="Requests per scenario measured with tracemalloc")
+        parser.add_argument('--scenario', action='append', default=None,
+                            help="Only run scenarios whose name contains this (repeatable)")
+        parser.add_argument('--output', default=None, help="Write the results to this JSON file")
+        parser.add_argument('--compare', default=None, help="Baseline JSON file to compare against")
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help="Relative slowdown counted as a regression, 0.10 = 10%%")
+        parser.add_argument('--payme-latency', default='fixed:0',
+                            help="Latency of the local Payme stand-in used by order creation, e.g. fixed:50")
+        parser.add_argument('--middleware', action='store_true',
+                            help="Run every scenario through the full middleware stack as well and report "
+                                 "what the lightweight API stack (API_PATH_PREFIXES) saves per request")
+
+    def handle(self, *args, **options):
+        if not Product.objects.exclude(stock=0).exists():
+            raise CommandError("No products in stock, seed the database first: manage.py seed_catalog --preset medium")
+        card = CardDetails.objects.filter(verified=True).select_related('user').order_by('id').first()
+        if card is None:
+            raise CommandError("No verified card found, seed the database first: manage.py seed_catalog")
+
+        self.client = Client()
+        self.auth = {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(card.user)}"}
+        scenarios = self.scenarios(card)
+        if options['scenario']:
+            scenarios = {name: scenario for name, scenario in scenarios.items()
+                         if any(part in name for part in options['scenario'])}
+
+        results = {}
+        for name, scenario in scenarios.items():
+            if options['middleware']:
+                # An empty prefix list sends API requests through every middleware again
+                with override_settings(API_PATH_PREFIXES=[]):
+                    results[f'{name} [full middleware]'] = full = scenario(options)
+                self.write_result(f'{name} [full middleware]', full)
+            results[name] = scenario(options)
+            self.write_result(name, results[name])
+            if options['middleware']:
+                self.stdout.write(
+                    f"{'':<40} API stack saves {full['p50_ms'] - results[name]['p50_ms']:.3f} ms (p50) and "
+                    f"{full['alloc_peak_kib'] - results[name]['alloc_peak_kib']:.1f} KiB peak per request"
+                )
+
+        report = {'environment': environment(), 'dataset': self.dataset(), 'results': results}
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = compare(baseline, report, options['threshold'])
+            for name, metric, old, new, change in regressions:
+                self.stdout.write(self.style.ERROR(f"REGRESSION {name} {metric}: {old} -> {new} ({change:+.0%})"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
+
+    def write_result(self, name, result):
+        self.stdout.write(
+            f"{name:<40} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+            f"p99 {result['p99_ms']:>9.2f} ms  {result['throughput_rps']:>8.1f} req/s  "
+            f"{result['queries']:>3} queries  {result['alloc_peak_kib']} KiB peak"
+        )
+
+    def get(self, url_name, params=None, auth=False, **kwargs):
+        url = reverse(url_name, kwargs=kwargs or None)
+        headers = self.auth if auth else {}
+        return lambda options: run_scenario(
+            lambda: self.client.get(url, params or {}, **headers),
+            options['iterations'], options['warmup'], options['alloc_iterations'],
+        )
+
+    def scenarios(self, card):
+        in_stock = Product.objects.exclude(stock=0)
+        category_id = (in_stock.values('category').annotate(n=Count('id')).order_by('-n')
+                       .values_list('category', flat=True).first())
+        brand = in_stock.exclude(brand='').values_list('brand', flat=True).order_by('id').first()
+        color = ProductColor.objects.values_list('color', flat=True).order_by('id').first()
+        prices = sorted(in_stock.values_list('price', flat=True)[:1000])
+        product_id = in_stock.order_by('id').values_list('id', flat=True).first()
+        search = Product._parler_meta.root_model.objects.filter(master_id=product_id).values_list('name', flat=True)[0]
+
+        return {
+            'categories': self.get('top_level_category_list'),
+            'colors': self.get('product_color_hex_list'),
+            'products': self.get('product_list'),
+            'products?page_size=100': self.get('product_list', {'page_size': 100}),
+            'products?category': self.get('product_list', {'category': category_id}),
+            'products?brand': self.get('product_list', {'brand': brand}),
+            'products?price_range': self.get('product_list', {
+                'min_price': prices[len(prices) // 4], 'max_price': prices[len(prices) * 3 // 4],
+            }),
+            'products?search': self.get('product_list', {'search': search.split()[-1]}),
+            'products?color': self.get('product_list', {'color': color}),
+            'products?has_discount&ordering': self.get('product_list', {'has_discount': 'true', 'ordering': 'price'}),
+            'products?category&brand': self.get('product_list', {'category': category_id, 'brand': brand}),
+            'products?page=2': self.get('product_list', {'page': 2}),
+            'product_detail': self.get('product_detail', pk=product_id),
+            'user_orders': self.get('user-orders', auth=True),
+            'user_orders?page_size=50': self.get('user-orders', {'page_size': 50}, auth=True),
+            'order_create': lambda options: self.order_create(card, options),
+        }
+
+    def order_create(self, card, options):
+        """Checkout against a local Payme stand-in; everything it writes is rolled back."""
+        stub = PaymeStub(latency=options['payme_latency'], seed=0)
+        server, url = start_in_thread(stub)
+        requests_needed = options['warmup'] + options['iterations'] + options['alloc_iterations']
+        product_ids = list(
+            Product.objects.filter(stock__gte=requests_needed * 2).order_by('id').values_list('id', flat=True)[:3]
+        )
+        if not product_ids:
+            raise CommandError("No product has enough stock for the order_create scenario")
+        payload = {
+            'card_id': card.id, 'address': 'Benchmark', 'phone': '+998900000000', 'full_name': 'Benchmark',
+            'product_list': [{'product_id': product_id, 'quantity': 1} for product_id in product_ids],
+        }
+        try:
+            with override_settings(PAYME_URL=url), transaction.atomic():
+                token = stub.cards_create({'card': {'number': card.card_number, 'expire': card.expiration_date}})
+                CardDetails.objects.filter(pk=card.pk).update(payme_token=token['card']['token'])
+                result = run_scenario(
+                    lambda: self.client.post(reverse('order-create'), payload, content_type='application/json', **self.auth),
+                    options['iterations'], options['warmup'], options['alloc_iterations'],
+                )
+                transaction.set_rollback(True)
+        finally:
+            server.shutdown()
+            server.server_close()
+        return result
+
+    def dataset(self):
+        return {
+            'products': Product.objects.count(),
+            'orders': Order.objects.count(),
+        }
@@ -0,0 +1,28 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+from config.openapi import API_INFO, schema_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once (e.g. at build time) into OPENAPI_SCHEMA_DIR; "
+        "with OPENAPI_SCHEMA_PREGENERATED=True the swagger/redoc views serve these files"
+    )
+
+    def handle(self, *args, **options):
+        schema = OpenAPISchemaGenerator(API_INFO).get_schema(request=None, public=True)
+        os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+        for fmt, codec in (('json', OpenAPICodecJson([])), ('yaml', OpenAPICodecYaml([]))):
+            path = schema_path(fmt)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(codec.encode(schema))
+            # Running workers pick the new file up by its modification time
+            os.replace(tmp_path, path)
+            self.stdout.write(f"Wrote {path}")
+        self.stdout.write(self.style.SUCCESS(f"OpenAPI schema generated with {len(schema.paths)} paths"))
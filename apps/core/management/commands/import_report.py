@@ -0,0 +1,82 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker imports before serving: settings, apps, the WSGI handler and the URLconf
+STARTUP_CODE = (
+    "import django.core.wsgi, django.urls; "
+    "django.core.wsgi.get_wsgi_application(); "
+    "django.urls.get_resolver().url_patterns"
+)
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_import_times(output):
+    """``[(module, self_us, cumulative_us, depth)]`` from the stderr of ``python -X importtime``."""
+    entries = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+class Command(BaseCommand):
+    help = (
+        "Import the project the way a worker starts (python -X importtime in a fresh "
+        "interpreter) and report the modules that take the longest to import"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25)
+        parser.add_argument('--output', help="Also write the full report as JSON to this file")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        entries = parse_import_times(result.stderr)
+        if result.returncode or not entries:
+            raise CommandError(f"Importing the project failed:\n{result.stderr[-2000:]}")
+
+        packages = defaultdict(int)
+        for module, self_us, cumulative_us, depth in entries:
+            packages[module.split('.')[0]] += self_us
+        total_us = sum(cumulative for module, self_us, cumulative, depth in entries if depth == 1)
+
+        limit = options['limit']
+        report = {
+            'total_ms': round(total_us / 1000, 1),
+            'modules': len(entries),
+            'packages': sorted(
+                ({'package': name, 'self_ms': round(us / 1000, 1)} for name, us in packages.items()),
+                key=lambda row: -row['self_ms'],
+            ),
+            'self': [
+                {'module': module, 'self_ms': round(self_us / 1000, 1), 'cumulative_ms': round(cumulative_us / 1000, 1)}
+                for module, self_us, cumulative_us, depth in sorted(entries, key=lambda e: -e[1])
+            ],
+        }
+
+        self.stdout.write(f"{report['modules']} modules imported in {report['total_ms']} ms\n")
+        self.stdout.write("Packages by own import time:")
+        for row in report['packages'][:limit]:
+            self.stdout.write(f"{row['self_ms']:>10.1f} ms  {row['package']}")
+        self.stdout.write("\nModules by own import time (cumulative includes their imports):")
+        for row in report['self'][:limit]:
+            self.stdout.write(f"{row['self_ms']:>10.1f} ms {row['cumulative_ms']:>10.1f} ms  {row['module']}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
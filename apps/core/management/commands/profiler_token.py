@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from config.middleware.profiler import make_profile_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a signed token for profiling single requests without a staff login: "
+        "append ?_profile=<token> (and &_profile_report=1 for the report as response body)"
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_profile_token())
+        self.stderr.write(f"Valid for {settings.PROFILER_TOKEN_MAX_AGE} seconds, artifacts go to {settings.PROFILER_DIR}")
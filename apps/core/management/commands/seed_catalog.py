@@ -0,0 +1,289 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.models import CustomUser
+from apps.market.cache import bump_catalog_cache_version
+from apps.market.category_labels import invalidate_category_labels
+from apps.market.models import Category, CommentAndReviewProduct, Product, ProductColor, ProductImage
+from apps.order.models import CardDetails, Order, OrderLine
+
+PRESETS = {
+    # top-level categories, subcategories per top-level, products, users, orders
+    'tiny': {'categories': 3, 'subcategories': 3, 'products': 50, 'users': 10, 'orders': 50},
+    'medium': {'categories': 10, 'subcategories': 8, 'products': 5000, 'users': 1000, 'orders': 20000},
+    'large': {'categories': 25, 'subcategories': 12, 'products': 100000, 'users': 50000, 'orders': 1000000},
+}
+
+SEED_EMAIL = 'seed-user-{}@seed.example.com'
+SEED_PASSWORD = 'seed-password'
+
+CATEGORY_WORDS = {
+    'ru': ['Уход за лицом', 'Макияж', 'Волосы', 'Тело', 'Парфюмерия', 'Ногти', 'Аксессуары', 'Мужчинам'],
+    'en': ['Face care', 'Makeup', 'Hair', 'Body', 'Fragrance', 'Nails', 'Accessories', 'For men'],
+    'uz': ['Yuz parvarishi', 'Pardoz', 'Soch', 'Tana', 'Atir', 'Tirnoq', 'Aksessuarlar', 'Erkaklar uchun'],
+    'kk': ['Бет күтімі', 'Макияж', 'Шаш', 'Дене', 'Парфюмерия', 'Тырнақ', 'Аксессуарлар', 'Ерлерге'],
+    'ko': ['페이스 케어', '메이크업', '헤어', '바디', '향수', '네일', '액세서리', '남성용'],
+}
+PRODUCT_WORDS = {
+    'ru': ['Крем', 'Сыворотка', 'Тушь', 'Помада', 'Тоник', 'Маска', 'Шампунь', 'Бальзам', 'Пудра', 'Гель'],
+    'en': ['Cream', 'Serum', 'Mascara', 'Lipstick', 'Toner', 'Mask', 'Shampoo', 'Balm', 'Powder', 'Gel'],
+    'uz': ['Krem', 'Zardob', 'Tush', 'Lab bo‘yog‘i', 'Tonik', 'Niqob', 'Shampun', 'Balzam', 'Upa', 'Gel'],
+    'kk': ['Крем', 'Сарысу', 'Тушь', 'Ерін далабы', 'Тоник', 'Маска', 'Сусабын', 'Бальзам', 'Опа', 'Гель'],
+    'ko': ['크림', '세럼', '마스카라', '립스틱', '토너', '마스크', '샴푸', '밤', '파우더', '젤'],
+}
+DESCRIPTION_WORDS = {
+    'ru': 'увлажняет питает восстанавливает защищает кожу подходит для ежедневного ухода мягкая текстура',
+    'en': 'moisturizes nourishes restores protects skin suitable for daily care soft texture lightweight formula',
+    'uz': 'namlaydi oziqlantiradi tiklaydi himoya qiladi teri kundalik parvarish uchun mos yumshoq tekstura',
+    'kk': 'ылғалдандырады қоректендіреді қалпына келтіреді қорғайды тері күнделікті күтімге жарайды',
+    'ko': '보습 영양 재생 보호 피부 데일리 케어에 적합 부드러운 텍스처 가벼운 포뮬러',
+}
+BRANDS = ['SeedBee', 'Missha', 'Innisfree', 'Etude', 'Cosrx', 'Laneige', 'Nivea', 'Garnier', "L'Oreal", 'Maybelline']
+FIRST_NAMES = ['Aziz', 'Dilnoza', 'Sardor', 'Malika', 'Timur', 'Aigerim', 'Jasur', 'Nilufar', 'Anna', 'Min-ji']
+LAST_NAMES = ['Karimov', 'Rashidova', 'Tursunov', 'Abdullaeva', 'Ivanov', 'Nurlanova', 'Kim', 'Park', 'Petrova']
+CITIES = ['Ташкент', 'Самарканд', 'Бухара', 'Алматы', 'Астана', 'Наманган', 'Андижан']
+REVIEW_TEXTS = ['Отличный продукт', 'Понравилось', 'Хорошо, но дорого', 'Не подошло', 'Буду брать ещё', 'Нормально']
+# Mostly paid orders, some cancelled and a few stuck in intermediate states
+ORDER_STATES = [(4, 80), (50, 12), (0, 4), (2, 2), (20, 1), (21, 1)]
+# bulk_update() builds one CASE branch per row, small batches keep it cheap
+CREATED_AT_UPDATE_BATCH = 500
+
+
+def bulk_create_dated(model, objs, batch_size=None):
+    """
+    bulk_create ``objs`` and keep their generated ``created_at``: auto_now_add
+    stores now() on insert, so the dates are written back by primary key.
+    """
+    dates = [obj.created_at for obj in objs]
+    objs = model.objects.bulk_create(objs, batch_size=batch_size)
+    for obj, created_at in zip(objs, dates):
+        obj.created_at = created_at
+    model.objects.bulk_update(objs, ['created_at'], batch_size=CREATED_AT_UPDATE_BATCH)
+    return objs
+
+
+def luhn_complete(prefix):
+    """Append the Luhn check digit to ``prefix``, as CardDetailsSerializer validates it."""
+    checksum = 0
+    for index, digit in enumerate(int(d) for d in reversed(prefix)):
+        if index % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        checksum += digit
+    return f"{prefix}{(10 - checksum % 10) % 10}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with a deterministic catalog: a category tree, products with "
+        "translations in every language, images, colors, reviews, users with verified cards and "
+        "orders with lines. Use --preset tiny/medium/large and override single counts if needed; "
+        "the same --seed always produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default='tiny')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per bulk_create and transaction")
+        parser.add_argument('--days', type=int, default=365, help="Spread creation dates over this many past days")
+        for name in PRESETS['tiny']:
+            parser.add_argument(f'--{name}', type=int, default=None, help=f"Override the preset's number of {name}")
+
+    def handle(self, *args, **options):
+        if CustomUser.objects.filter(email=SEED_EMAIL.format(0)).exists():
+            raise CommandError("The database already contains seeded data, run the command on an empty database")
+
+        self.counts = {name: options[name] if options[name] is not None else value
+                       for name, value in PRESETS[options['preset']].items()}
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.languages = [code for code, name in settings.LANGUAGES]
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=options['days'])
+
+        subcategory_ids = self.seed_categories()
+        products = self.seed_products(subcategory_ids)
+        user_ids = self.seed_users()
+        self.seed_orders(products, user_ids)
+
+        # bulk_create sends no signals, so the catalog caches are invalidated once here
+        invalidate_category_labels()
+        bump_catalog_cache_version()
+        self.stdout.write(self.style.SUCCESS(
+            "Seeding finished: " + ", ".join(f"{value} {name}" for name, value in self.counts.items())
+        ))
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield range(start, min(start + self.batch_size, total))
+
+    def created_at(self, index, total):
+        """Creation dates grow with the row index, like ids do in a real database."""
+        span = (self.now - self.start).total_seconds()
+        offset = span * (index + self.rng.random()) / max(total, 1)
+        return self.start + timedelta(seconds=min(offset, span))
+
+    def translations(self, model, masters, values):
+        """Build a translation row for every master and language from ``values(master_index, language)``."""
+        translation_model = model._parler_meta.root_model
+        return [
+            translation_model(master_id=master.pk, language_code=language, **values(index, language))
+            for index, master in enumerate(masters)
+            for language in self.languages
+        ]
+
+    def seed_categories(self):
+        top_count, sub_count = self.counts['categories'], self.counts['subcategories']
+        with transaction.atomic():
+            tops = Category.objects.bulk_create([Category() for _ in range(top_count)])
+            Category._parler_meta.root_model.objects.bulk_create(self.translations(
+                Category, tops,
+                lambda i, language: {'name': f"{CATEGORY_WORDS[language][i % 8]} {i // 8 + 1}"},
+            ))
+            subs = Category.objects.bulk_create([Category(parent=top) for top in tops for _ in range(sub_count)])
+            Category._parler_meta.root_model.objects.bulk_create(self.translations(
+                Category, subs,
+                lambda i, language: {
+                    'name': f"{CATEGORY_WORDS[language][i // sub_count % 8]} {PRODUCT_WORDS[language][i % 10]}"
+                },
+            ))
+        self.stdout.write(f"Created {len(tops)} categories with {len(subs)} subcategories")
+        return [sub.pk for sub in subs]
+
+    def seed_products(self, subcategory_ids):
+        """Return ``[(id, name, price, discount_price), ...]`` for building orders."""
+        total = self.counts['products']
+        translation_model = Product._parler_meta.root_model
+        products = []
+        for batch in self.batches(total):
+            rows = []
+            for index in batch:
+                price = float(self.rng.randrange(15, 900) * 1000)
+                discounted = self.rng.random() < 0.3
+                rows.append(Product(
+                    category_id=self.rng.choice(subcategory_ids),
+                    price=price,
+                    discount_price=round(price * self.rng.uniform(0.6, 0.95), -2) if discounted else 0.0,
+                    brand=self.rng.choice(BRANDS),
+                    is_popular=self.rng.random() < 0.1,
+                    is_new=self.rng.random() < 0.1,
+                    is_discounted=discounted,
+                    stock=self.rng.choice([0] + [self.rng.randrange(1, 500)] * 9),
+                    code=f"{10000000 + index}",
+                    package_code=f"{1000 + index % 9000}",
+                    created_at=self.created_at(index, total),
+                ))
+            with transaction.atomic():
+                rows = bulk_create_dated(Product, rows)
+                words = [self.rng.randrange(10) for _ in rows]
+                translation_model.objects.bulk_create(self.translations(
+                    Product, rows,
+                    lambda i, language: {
+                        'name': f"{rows[i].brand} {PRODUCT_WORDS[language][words[i]]} {rows[i].code[-4:]}",
+                        'description': self.description(language),
+                    },
+                ), batch_size=self.batch_size)
+                images, colors, reviews = [], [], []
+                for product in rows:
+                    images += [ProductImage(product=product, image=f"products/images/seed/{product.code}-{n}.jpg")
+                               for n in range(self.rng.randint(1, 4))]
+                    colors += [ProductColor(product=product, color=f"#{self.rng.randrange(1 << 24):06X}FF")
+                               for _ in range(self.rng.randint(0, 3))]
+                    reviews += [CommentAndReviewProduct(
+                        product=product,
+                        full_name=f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                        content=self.rng.choice(REVIEW_TEXTS),
+                        review_rating=self.rng.choices([1, 2, 3, 4, 5], weights=[3, 4, 10, 33, 50])[0],
+                        created_at=product.created_at + (self.now - product.created_at) * self.rng.random(),
+                    ) for _ in range(self.rng.randint(0, 5))]
+                ProductImage.objects.bulk_create(images, batch_size=self.batch_size)
+                ProductColor.objects.bulk_create(colors, batch_size=self.batch_size)
+                bulk_create_dated(CommentAndReviewProduct, reviews, batch_size=self.batch_size)
+            products += [(product.pk, rows[i].code, product.price, product.discount_price)
+                         for i, product in enumerate(rows)]
+            self.stdout.write(f"Created {len(products)} of {total} products")
+        names = dict(
+            translation_model.objects.filter(language_code=settings.LANGUAGE_CODE).values_list('master_id', 'name')
+        )
+        return [(pk, names.get(pk, code), price, discount) for pk, code, price, discount in products]
+
+    def description(self, language):
+        words = DESCRIPTION_WORDS[language].split()
+        return ' '.join(self.rng.choice(words) for _ in range(self.rng.randint(8, 30))).capitalize() + '.'
+
+    def seed_users(self):
+        total = self.counts['users']
+        # Hashing is deliberately slow, every seeded user shares one hash of SEED_PASSWORD
+        password = make_password(SEED_PASSWORD)
+        user_ids = []
+        for batch in self.batches(total):
+            users = [CustomUser(
+                email=SEED_EMAIL.format(index),
+                username=f"seed-user-{index}",
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                password=password,
+                is_agree=True,
+            ) for index in batch]
+            with transaction.atomic():
+                users = CustomUser.objects.bulk_create(users)
+                CardDetails.objects.bulk_create([CardDetails(
+                    user=user,
+                    card_number=luhn_complete(f"8600{self.rng.randrange(10 ** 11):011d}"),
+                    card_holder=f"{user.first_name} {user.last_name}".upper(),
+                    expiration_date=f"{self.rng.randint(1, 12):02d}{self.now.year % 100 + self.rng.randint(1, 5):02d}",
+                    payme_token=uuid.UUID(int=self.rng.getrandbits(128)).hex,
+                    verified=self.rng.random() < 0.9,
+                ) for user in users])
+            user_ids += [user.pk for user in users]
+            self.stdout.write(f"Created {len(user_ids)} of {total} users")
+        return user_ids
+
+    def seed_orders(self, products, user_ids):
+        total = self.counts['orders']
+        states, weights = zip(*ORDER_STATES)
+        for batch in self.batches(total):
+            orders, order_lines = [], []
+            for index in batch:
+                created_at = self.created_at(index, total)
+                items, lines, amount = [], [], 0.0
+                for pk, name, price, discount_price in self.rng.sample(products, min(len(products), self.rng.randint(1, 5))):
+                    quantity = self.rng.choices([1, 2, 3, 4], weights=[70, 20, 7, 3])[0]
+                    unit_price = discount_price or price
+                    amount += unit_price * quantity
+                    # Same shape as OrderCreateView._prepare_order_data
+                    items.append({"id": pk, "name": name, "quantity": quantity, "price": unit_price})
+                    lines.append(OrderLine(
+                        product_id=pk, quantity=quantity, unit_price=unit_price,
+                        discount=(price - unit_price) * quantity if discount_price else 0.0,
+                        created_at=created_at,
+                    ))
+                user_id = self.rng.choice(user_ids)
+                orders.append(Order(
+                    order_id=uuid.UUID(int=self.rng.getrandbits(128), version=4),
+                    user_id=user_id,
+                    address=f"{self.rng.choice(CITIES)}, ул. {self.rng.randint(1, 200)}, кв. {self.rng.randint(1, 150)}",
+                    phone=f"+99890{self.rng.randrange(10 ** 7):07d}",
+                    full_name=f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                    products=items,
+                    total_price=amount,
+                    payment_status=self.rng.choices(states, weights=weights)[0],
+                    created_at=created_at,
+                ))
+                order_lines.append(lines)
+            with transaction.atomic():
+                orders = bulk_create_dated(Order, orders)
+                for order, lines in zip(orders, order_lines):
+                    for line in lines:
+                        line.order = order
+                OrderLine.objects.bulk_create([line for lines in order_lines for line in lines],
+                                              batch_size=self.batch_size)
+            self.stdout.write(f"Created {batch.stop} of {total} orders")
@@ -0,0 +1,159 @@
+"""
+tracemalloc diagnostics for long-running worker processes.
+
+Tracing is started on demand (staff endpoint ``/debug/memory`` or ``SIGUSR2``)
+because it slows the process down noticeably. Snapshots are kept in memory, so
+diffs show which lines allocated the memory that stayed alive in between.
+Everything is per process: send ``kill -USR2 <worker pid>`` to a worker (never to
+the gunicorn master, which re-executes itself on USR2); the endpoint reports the
+pid of the worker that answered.
+"""
+import gc
+import logging
+import os
+import resource
+import signal
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+snapshots = []
+_lock = threading.Lock()
+_state = {'signal_pid': None}
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def start(frames=None):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames or settings.MEMORY_TRACE_FRAMES)
+
+
+def stop():
+    tracemalloc.stop()
+    with _lock:
+        snapshots.clear()
+
+
+def take_snapshot():
+    """Take a snapshot (starting tracing first if needed) and keep the first and the latest ones."""
+    start()
+    snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+    entry = {'snapshot': snapshot, 'taken_at': time.time(), 'traced_bytes': tracemalloc.get_traced_memory()[0]}
+    with _lock:
+        snapshots.append(entry)
+        # The first snapshot stays as baseline for the growth since tracing started
+        while len(snapshots) > settings.MEMORY_MAX_SNAPSHOTS:
+            del snapshots[1]
+    return entry
+
+
+def _format_stat(stat, diff=False):
+    frame = stat.traceback[0]
+    entry = {
+        'site': f"{frame.filename}:{frame.lineno}",
+        'size_kib': round(stat.size / 1024, 1),
+        'count': stat.count,
+    }
+    if diff:
+        entry['size_diff_kib'] = round(stat.size_diff / 1024, 1)
+        entry['count_diff'] = stat.count_diff
+    if len(stat.traceback) > 1:
+        entry['traceback'] = [f"{f.filename}:{f.lineno}" for f in stat.traceback]
+    return entry
+
+
+def top_sites(snapshot, limit=25, key_type='lineno'):
+    return [_format_stat(stat) for stat in snapshot.statistics(key_type)[:limit]]
+
+
+def growth(older, newer, limit=25, key_type='lineno'):
+    """Allocation sites that grew the most between two snapshots."""
+    stats = [stat for stat in newer.compare_to(older, key_type) if stat.size_diff > 0]
+    return [_format_stat(stat, diff=True) for stat in stats[:limit]]
+
+
+def process_memory():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    rss_kib = None
+    try:
+        with open('/proc/self/statm') as f:
+            rss_kib = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return {'rss_kib': rss_kib, 'max_rss_kib': usage.ru_maxrss}
+
+
+def report(limit=25, base=0, compare_to=-1):
+    """Everything the diagnostics endpoint shows, for snapshots ``base`` and ``compare_to``."""
+    traced, peak = tracemalloc.get_traced_memory()
+    data = {
+        'pid': os.getpid(),
+        'tracing': tracemalloc.is_tracing(),
+        'traced_kib': round(traced / 1024, 1),
+        'traced_peak_kib': round(peak / 1024, 1),
+        **process_memory(),
+        'gc_objects': len(gc.get_objects()),
+        'gc_counts': gc.get_count(),
+        # With DEBUG = True every executed query is kept until the next request starts
+        'debug_query_log': {alias: len(connections[alias].queries_log) for alias in connections},
+        'snapshots': [
+            {'index': i, 'taken_at': entry['taken_at'], 'traced_kib': round(entry['traced_bytes'] / 1024, 1)}
+            for i, entry in enumerate(snapshots)
+        ],
+    }
+    if snapshots:
+        newer = snapshots[compare_to]['snapshot']
+        data['top'] = top_sites(newer, limit)
+        if len(snapshots) > 1:
+            data['growth'] = growth(snapshots[base]['snapshot'], newer, limit)
+    return data
+
+
+def write_report(limit=25):
+    """Snapshot and write the growth since the previous and the first snapshot to MEMORY_DIAGNOSTICS_DIR."""
+    take_snapshot()
+    lines = [f"pid {os.getpid()} at {time.strftime('%Y-%m-%d %H:%M:%S')}: {process_memory()}"]
+    if len(snapshots) > 1:
+        for title, older in (('previous', snapshots[-2]), ('first', snapshots[0])):
+            lines.append(f"\nGrowth since the {title} snapshot:")
+            for entry in growth(older['snapshot'], snapshots[-1]['snapshot'], limit):
+                lines.append(f"{entry['size_diff_kib']:>+12.1f} KiB {entry['count_diff']:>+9} blocks  {entry['site']}")
+    lines.append("\nLargest allocation sites:")
+    for entry in top_sites(snapshots[-1]['snapshot'], limit):
+        lines.append(f"{entry['size_kib']:>12.1f} KiB {entry['count']:>9} blocks  {entry['site']}")
+
+    os.makedirs(settings.MEMORY_DIAGNOSTICS_DIR, exist_ok=True)
+    path = os.path.join(settings.MEMORY_DIAGNOSTICS_DIR, f"memory-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    logger.warning("Memory report of process %s written to %s", os.getpid(), path)
+    return path
+
+
+def _handle_signal(signum, frame):
+    try:
+        write_report()
+    except Exception:
+        logger.exception("Memory report failed")
+
+
+def install_signal_handler():
+    """
+    Handle SIGUSR2 in this process. Gunicorn resets USR2 in every new worker, so this
+    runs lazily on the worker's first request (from the main thread only).
+    """
+    if _state['signal_pid'] == os.getpid() or threading.current_thread() is not threading.main_thread():
+        return
+    signal.signal(signal.SIGUSR2, _handle_signal)
+    _state['signal_pid'] = os.getpid()
@@ -0,0 +1,238 @@
+"""
+Minimal Prometheus-style metrics that work across gunicorn worker processes.
+
+Each process keeps its counters and histograms in memory and periodically writes
+a snapshot to ``METRICS_DIR/metrics-<pid>-<token>.json``; the ``/metrics`` view
+merges the snapshots of all processes and renders the text exposition format.
+Snapshots of exited workers are kept so counters stay monotonic, and deleted
+``METRICS_SNAPSHOT_MAX_AGE`` seconds after the worker exited (Prometheus sees a
+counter reset then); clear the directory when the server (not a single worker)
+restarts.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REGISTRY = {}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_state = {'token': None, 'last_flush': 0.0}
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    def _key(self, labels):
+        return self.name, tuple(str(labels.get(label, '')) for label in self.labelnames)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            _counters[key] = _counters.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(float(b) for b in buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        # Per-bucket (non-cumulative) counts, the last slot is +Inf
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            entry = _histograms.get(key)
+            if entry is None:
+                entry = _histograms[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            entry['buckets'][index] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by resolved view, method and status code.',
+    ('view', 'method', 'status'),
+)
+HTTP_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by resolved view.', ('view', 'method'),
+)
+DB_QUERIES = Histogram(
+    'db_queries_per_request', 'Number of database queries per request.', ('view',), QUERY_COUNT_BUCKETS,
+)
+DB_TIME = Histogram(
+    'db_query_seconds_per_request', 'Time spent in database queries per request.', ('view',),
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by cache alias and result (hit, miss; local_hit and stale for the tiered cache).', ('cache', 'result'),
+)
+PAYME_REQUESTS = Counter(
+    'payme_requests_total', 'Payme API calls by method and status.', ('method', 'status'),
+)
+PAYME_LATENCY = Histogram(
+    'payme_request_duration_seconds', 'Payme API call latency by method.', ('method',),
+)
+
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _counters.clear()
+    _histograms.clear()
+    _state['token'] = None
+    _state['last_flush'] = 0.0
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _snapshot_path():
+    if _state['token'] is None:
+        _state['token'] = f"{os.getpid()}-{time.time_ns()}"
+    return os.path.join(settings.METRICS_DIR, f"metrics-{_state['token']}.json")
+
+
+def flush():
+    """Write this process' values to its snapshot file."""
+    with _lock:
+        data = {
+            'counters': [[name, list(labels), value] for (name, labels), value in _counters.items()],
+            'histograms': [
+                [name, list(labels), entry['buckets'], entry['sum'], entry['count']]
+                for (name, labels), entry in _histograms.items()
+            ],
+        }
+        _state['last_flush'] = time.monotonic()
+    if not data['counters'] and not data['histograms']:
+        return
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    path = _snapshot_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def maybe_flush():
+    if time.monotonic() - _state['last_flush'] >= settings.METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+atexit.register(flush)
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _is_expired(path, now):
+    """Whether ``path`` is the snapshot of a process that exited more than METRICS_SNAPSHOT_MAX_AGE ago."""
+    try:
+        pid = int(os.path.basename(path).split('-')[1])
+        # Processes write their snapshot when they exit
+        if now - os.path.getmtime(path) < settings.METRICS_SNAPSHOT_MAX_AGE:
+            return False
+    except (IndexError, ValueError, OSError):
+        return False
+    return not _is_running(pid)
+
+
+def collect():
+    """Merge the snapshots of all processes into ``(counters, histograms)``."""
+    flush()
+    counters = {}
+    histograms = {}
+    now = time.time()
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics-*.json')):
+        if _is_expired(path, now):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in data.get('counters', []):
+            key = (name, tuple(labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, buckets, total, count in data.get('histograms', []):
+            key = (name, tuple(labels))
+            entry = histograms.setdefault(key, {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0})
+            if len(entry['buckets']) != len(buckets):
+                continue
+            entry['buckets'] = [a + b for a, b in zip(entry['buckets'], buckets)]
+            entry['sum'] += total
+            entry['count'] += count
+    return counters, histograms
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labels, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Return all metrics in the Prometheus text exposition format."""
+    counters, histograms = collect()
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        if metric.kind == 'counter':
+            for (metric_name, labels), value in sorted(counters.items()):
+                if metric_name == name:
+                    lines.append(f'{name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}')
+            continue
+        for (metric_name, labels), entry in sorted(histograms.items()):
+            if metric_name != name:
+                continue
+            cumulative = 0
+            bounds = [_format_value(b) for b in metric.buckets] + ['+Inf']
+            for bound, count in zip(bounds, entry['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(metric.labelnames, labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(metric.labelnames, labels)} {_format_value(entry["sum"])}')
+            lines.append(f'{name}_count{_format_labels(metric.labelnames, labels)} {entry["count"]}')
+    return '\n'.join(lines) + '\n'
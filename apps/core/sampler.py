@@ -0,0 +1,130 @@
+"""
+Low-overhead statistical profiler for worker processes.
+
+``ITIMER_PROF`` delivers ``SIGPROF`` every ``SAMPLER_INTERVAL`` seconds of CPU time
+used by the process. The handler records the Python stack of every thread that is
+currently serving a request (see ``config.middleware.sampler``), prefixed with the
+view serving it, and a background thread writes the aggregated counts every
+``SAMPLER_DUMP_INTERVAL`` seconds to ``SAMPLER_DIR/stacks-<pid>-<time>.collapsed``
+in the collapsed format read by flamegraph.pl and speedscope::
+
+    ProductListView;get (apps/market/views.py:97);data (rest_framework/serializers.py:793);... 42
+
+Timers and threads do not survive fork(), so the sampler is started lazily in
+each worker process by the middleware, or from gunicorn's ``post_worker_init``.
+"""
+import atexit
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Thread id -> label of the view it is serving; only these threads are sampled
+active_threads = {}
+
+_samples = Counter()
+_labels = {}
+_state = {'pid': None, 'handler_seconds': 0.0, 'samples': 0}
+# Reentrant: the handler may interrupt the main thread while it holds the lock in dump()
+_lock = threading.RLock()
+
+
+def _code_label(code):
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for prefix in (str(settings.BASE_DIR) + os.sep, *(p + os.sep for p in sys.path if 'site-packages' in p)):
+            if filename.startswith(prefix):
+                filename = filename[len(prefix):]
+                break
+        label = _labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+    return label
+
+
+def _sample(signum, frame):
+    start = time.perf_counter()
+    frames = sys._current_frames()
+    max_depth = settings.SAMPLER_MAX_DEPTH
+    stacks = []
+    for thread_id, view in list(active_threads.items()):
+        current = frames.get(thread_id)
+        stack = []
+        while current is not None and len(stack) < max_depth:
+            stack.append(_code_label(current.f_code))
+            current = current.f_back
+        stack.append(view)
+        stacks.append(';'.join(reversed(stack)))
+    with _lock:
+        _samples.update(stacks)
+        _state['samples'] += 1
+        _state['handler_seconds'] += time.perf_counter() - start
+
+
+def is_running():
+    return _state['pid'] == os.getpid()
+
+
+def start():
+    """Start sampling in this process; must run in the main thread. Returns False if it cannot."""
+    if is_running() or not settings.SAMPLER_ENABLED:
+        return is_running()
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    # State inherited from the parent process belongs to the parent
+    active_threads.clear()
+    _samples.clear()
+    _state.update(pid=os.getpid(), handler_seconds=0.0, samples=0)
+    signal.signal(signal.SIGPROF, _sample)
+    signal.setitimer(signal.ITIMER_PROF, settings.SAMPLER_INTERVAL, settings.SAMPLER_INTERVAL)
+    threading.Thread(target=_dump_loop, name='stack-sampler-dump', daemon=True).start()
+    # Without a handler a pending SIGPROF would kill the exiting process
+    atexit.register(stop)
+    logger.info("Stack sampler started in process %s every %ss of CPU time", os.getpid(), settings.SAMPLER_INTERVAL)
+    return True
+
+
+def stop():
+    if is_running():
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        dump()
+        _state['pid'] = None
+
+
+def dump():
+    """Write the stacks collected since the last dump; returns the file name or None."""
+    with _lock:
+        samples = dict(_samples)
+        _samples.clear()
+        handler_seconds, sample_count = _state['handler_seconds'], _state['samples']
+        _state.update(handler_seconds=0.0, samples=0)
+    if not samples:
+        return None
+    os.makedirs(settings.SAMPLER_DIR, exist_ok=True)
+    path = os.path.join(settings.SAMPLER_DIR, f"stacks-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.collapsed")
+    with open(path, 'a') as f:
+        for stack, count in samples.items():
+            f.write(f"{stack} {count}\n")
+    # Each tick stands for SAMPLER_INTERVAL seconds of CPU time of the process
+    cpu_seconds = sample_count * settings.SAMPLER_INTERVAL
+    logger.info(
+        "Stack sampler wrote %s stacks to %s, handler overhead %.2f%% of sampled CPU time",
+        len(samples), path, 100 * handler_seconds / cpu_seconds if cpu_seconds else 0.0,
+    )
+    return path
+
+
+def _dump_loop():
+    pid = os.getpid()
+    while _state['pid'] == pid:
+        time.sleep(settings.SAMPLER_DUMP_INTERVAL)
+        try:
+            dump()
+        except OSError:
+            logger.exception("Stack sampler could not write its samples")
@@ -0,0 +1,256 @@
+"""
+Query-count budgets for the API endpoints.
+
+Every app's ``tests.py`` declares a :class:`QueryBudgetTestCase` with one
+:class:`Endpoint` per URL name of the app's ``urls.py``. Each endpoint is called
+once with a dataset of size 1 and once with a dataset of size 100 (products on the
+page, items in the order, ...). The test fails when the query count differs
+between the two, i.e. a query runs per row, or exceeds the declared budget. The
+failure message lists the SQL grouped by the line of project code that issued it.
+
+Payme is replaced by the in-process stand-in from ``apps.order.payme_stub`` and
+the caches by local-memory caches that are cleared before every call, so the
+counts are those of a cold cache.
+"""
+import os
+import traceback
+import unittest
+from collections import OrderedDict
+from contextlib import ExitStack
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.test import override_settings
+from django.urls import URLPattern, URLResolver, reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import CustomUser
+from apps.banner.models import Advertisement, Banner, Blog, Partner
+from apps.core import instrumentation
+from apps.market.models import Category, CommentAndReviewProduct, Product, ProductColor, ProductImage
+from apps.order.models import CardDetails
+from apps.order.payme_stub import PaymeStub, start_in_thread
+
+LIST_SIZES = (1, 100)
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'apps.core.tiered_cache.TieredCache', 'OPTIONS': {
+        'SHARED_ALIAS': 'shared', 'COORDINATION_ALIAS': 'coordination',
+    }},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'query-budget-shared'},
+    'coordination': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'query-budget-coordination'},
+}
+
+_PROJECT_ROOT = str(settings.BASE_DIR)
+# Frames of these files never point at the code that caused a query
+_SKIPPED_FILES = {os.path.abspath(__file__), os.path.abspath(instrumentation.__file__)}
+
+
+class Endpoint:
+    """
+    How to call one URL name of the app under test.
+
+    ``kwargs``, ``data`` and ``query`` may be callables taking ``(test, size)`` so they
+    can refer to the seeded objects; ``auth`` selects the seeded customer's JWT.
+    """
+
+    def __init__(self, method='get', budget=0, kwargs=None, data=None, query=None, auth=False, status=200):
+        self.method = method
+        self.budget = budget
+        self.kwargs = kwargs
+        self.data = data
+        self.query = query
+        self.auth = auth
+        self.status = status
+
+    @staticmethod
+    def resolve(value, test, size):
+        return value(test, size) if callable(value) else value
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that records every query with the project frame that issued it."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, self.call_site()))
+        return execute(sql, params, many, context)
+
+    @staticmethod
+    def call_site():
+        for frame in reversed(traceback.extract_stack()[:-2]):
+            filename = os.path.abspath(frame.filename)
+            if filename.startswith(_PROJECT_ROOT) and filename not in _SKIPPED_FILES and 'site-packages' not in filename:
+                return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+        return '<outside project code>'
+
+    def __len__(self):
+        return len(self.queries)
+
+    def report(self):
+        grouped = OrderedDict()
+        for sql, site in self.queries:
+            grouped.setdefault(site, []).append(sql)
+        lines = []
+        for site, statements in sorted(grouped.items(), key=lambda item: -len(item[1])):
+            lines.append(f"  {len(statements):4d} x {site}")
+            for sql in list(OrderedDict.fromkeys(statements))[:3]:
+                lines.append(f"         {sql[:300]}")
+        return '\n'.join(lines)
+
+
+def seed_dataset(size, offset=0):
+    """
+    Add ``size`` rows of every listable object: categories, products with
+    translations, images, colors and reviews, banners, partners, advertisements
+    and blogs. Returns the created products.
+    """
+    top = Category.objects.create(name=f"Категория {offset}")
+    top.set_current_language('en')
+    top.name = f"Category {offset}"
+    top.save()
+    products = []
+    for i in range(offset, offset + size):
+        sub = Category.objects.create(name=f"Подкатегория {i}", parent=top)
+        product = Product.objects.create(
+            name=f"Продукт {i}", description=f"Описание {i}", category=sub, price=1000.0 + i,
+            discount_price=900.0 + i if i % 2 else 0.0, brand=f"Brand {i % 7}", stock=1000,
+            code=f"CODE{i}", package_code=f"PKG{i}",
+        )
+        product.set_current_language('en')
+        product.name = f"Product {i}"
+        product.save()
+        ProductImage.objects.create(product=product, image=f"products/images/{i}.jpg")
+        ProductColor.objects.create(product=product, color=f"#{i % 256:02X}0000FF")
+        CommentAndReviewProduct.objects.create(product=product, full_name=f"User {i}", content="Отлично", review_rating=5)
+        products.append(product)
+        for model in (Banner, Partner, Advertisement):
+            model.objects.create(title=f"{model.__name__} {i}", description="Описание", image=f"banners/{i}.jpg")
+        Blog.objects.create(title=f"Blog {i}", content="Текст", image=f"blogs/{i}.jpg")
+    return products
+
+
+@override_settings(
+    CACHES=TEST_CACHES, PAYME_BREAKER_CACHE='coordination', SERVER_TIMING_SAMPLE_RATE=0.0,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class QueryBudgetTestCase(APITestCase):
+    """
+    Subclasses set ``urls_module`` and ``endpoints`` (URL name -> :class:`Endpoint`)
+    and may override :meth:`seed` to add endpoint specific data of the given size.
+    """
+    urls_module = None
+    url_namespace = None
+    endpoints = {}
+    password = 'Secret-pass-123'
+
+    @classmethod
+    def setUpClass(cls):
+        if cls.urls_module is None:
+            raise unittest.SkipTest('QueryBudgetTestCase is a base class')
+        super().setUpClass()
+        cls.payme = PaymeStub(seed=1)
+        cls.payme_server, payme_url = start_in_thread(cls.payme)
+        cls.payme_settings = override_settings(PAYME_URL=payme_url)
+        cls.payme_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.payme_settings.disable()
+        cls.payme_server.shutdown()
+        cls.payme_server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.customer = CustomUser.objects.create_user(
+            email='customer@example.com', username='customer', password=self.password,
+        )
+        self.card = CardDetails.objects.create(
+            user=self.customer, card_number='8600123412341234', card_holder='Test Customer',
+            expiration_date='1299', verified=True,
+            payme_token=self.payme.cards_create({'card': {'number': '8600123412341234', 'expire': '1299'}})['card']['token'],
+        )
+        self.products = []
+        self.seeded = 0
+
+    def seed(self, size):
+        """Grow the dataset to ``size`` rows per list."""
+        self.products += seed_dataset(size - self.seeded, offset=self.seeded)
+        self.seeded = size
+
+    def call(self, name, endpoint, size):
+        self.client.credentials()
+        if endpoint.auth:
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.customer)}")
+        view_name = f"{self.url_namespace}:{name}" if self.url_namespace else name
+        url = reverse(view_name, kwargs=Endpoint.resolve(endpoint.kwargs, self, size))
+        query = Endpoint.resolve(endpoint.query, self, size)
+        data = Endpoint.resolve(endpoint.data, self, size)
+        for cache in caches.all():
+            cache.clear()
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            if endpoint.method == 'get':
+                response = self.client.get(url, query)
+            else:
+                response = getattr(self.client, endpoint.method)(url, data, format='json')
+        self.assertEqual(
+            response.status_code, endpoint.status,
+            f"{name} (size {size}) returned {response.status_code}: {getattr(response, 'data', response.content)!r}",
+        )
+        return recorder
+
+    def test_every_url_has_a_budget(self):
+        names = {pattern.name for pattern in _iter_patterns(import_module(self.urls_module).urlpatterns)}
+        missing = names - set(self.endpoints)
+        self.assertFalse(missing, f"{self.urls_module}: no query budget declared for {sorted(missing)}")
+
+    def test_query_budgets(self):
+        for name, endpoint in self.endpoints.items():
+            with self.subTest(endpoint=name):
+                self.seeded = 0
+                with _rollback():
+                    recorders = {}
+                    for size in LIST_SIZES:
+                        self.seed(size)
+                        recorders[size] = self.call(name, endpoint, size)
+                small, large = (recorders[size] for size in LIST_SIZES)
+                if len(large) != len(small):
+                    self.fail(
+                        f"{name}: {len(small)} queries for {LIST_SIZES[0]} rows but {len(large)} for "
+                        f"{LIST_SIZES[1]}, something queries per row:\n{large.report()}"
+                    )
+                if len(large) > endpoint.budget:
+                    self.fail(f"{name}: {len(large)} queries, budget is {endpoint.budget}:\n{large.report()}")
+
+
+def _iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern
+
+
+class _rollback:
+    """Run a block in a savepoint that is always rolled back, so endpoints start from the same data."""
+
+    def __enter__(self):
+        from django.db import transaction
+        self.atomic = transaction.atomic()
+        self.atomic.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        from django.db import transaction
+        transaction.set_rollback(True)
+        self.atomic.__exit__(exc_type, exc, tb)
+        return False
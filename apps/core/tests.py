@@ -0,0 +1,189 @@
+import datetime
+import decimal
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import Serializer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from apps.core import invalidation, metrics
+from apps.core.instrumentation import PhaseTimer, install_serializer_timing
+from apps.core.renderers import ORJSONRenderer
+from apps.core.testing import TEST_CACHES
+from apps.core.views import metrics_allowed
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def assertSameOutput(self, data, accepted_media_type=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_drf_types(self):
+        self.assertSameOutput({
+            'aware': timezone.now(),
+            'naive': datetime.datetime(2024, 1, 2, 3, 4, 5, 123456),
+            'date': datetime.date(2024, 1, 2),
+            'time': datetime.time(1, 2, 3, 456789),
+            'decimal': decimal.Decimal('12.50'),
+            'lazy': _("Not found"),
+            'uuid': uuid.uuid4(),
+            'duration': datetime.timedelta(minutes=90),
+            'results': ReturnList([ReturnDict({'id': 1, 'name': "Помада"}, serializer=None)], serializer=None),
+            1: 'integer key',
+            'tuple': (1, None, True),
+        })
+
+    def test_fallbacks(self):
+        self.assertSameOutput({'floats': [1e16, 1e-05, 2.5e-07, 0.1, -3.0], 'big': 2 ** 70})
+        self.assertSameOutput(1e22)
+        self.assertSameOutput({'id': 1}, 'application/json; indent=4')
+
+    def test_separators_are_escaped(self):
+        self.assertSameOutput({'text': "line\u2028paragraph\u2029end </script>"})
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = caches['default']
+        self.cache.clear()
+
+    def test_local_copy(self):
+        self.cache.set('key', [1])
+        caches['shared'].set('key', [2])
+        self.assertEqual(self.cache.get('key'), [1])
+        self.cache.evict_local(['key'])
+        self.assertEqual(self.cache.get('key'), [2])
+
+    def test_invalidation_message(self):
+        self.cache.set('key', [1])
+        caches['shared'].set('key', [2])
+        keys = ['key'] + [f'other:{i:04}' for i in range(1000)]
+        messages = list(invalidation.payloads(keys))
+        self.assertGreater(len(messages), 1)
+        self.assertTrue(all(len(message.encode()) < 8000 for message in messages))
+        self.assertEqual(sum((json.loads(message) for message in messages), []), keys)
+        invalidation.evict(messages[0])
+        self.assertEqual(self.cache.get('key'), [2])
+
+    def test_versioned_invalidation_message(self):
+        self.cache.set('key', [1], version=2)
+        caches['shared'].set('key', [2], version=2)
+        invalidation.evict(next(invalidation.payloads([['key', 2]])))
+        self.assertEqual(self.cache.get('key', version=2), [2])
+
+    def test_many(self):
+        self.cache.set_many({'a': 1, 'b': 2})
+        caches['shared'].set('a', 3)
+        self.assertEqual(self.cache.get_many(['a', 'b']), {'a': 1, 'b': 2})
+        self.cache.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get_many(['a', 'b']), {})
+
+    def test_namespace_bump(self):
+        key = self.cache.namespaced_key('catalog', 'colors')
+        self.cache.set(key, ['#fff'])
+        self.cache.bump_namespace('catalog')
+        self.assertNotEqual(self.cache.namespaced_key('catalog', 'colors'), key)
+
+    def test_stale_while_revalidate(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(self.cache.get_or_compute('key', compute, timeout=0.05), 1)
+        self.assertEqual(self.cache.get_or_compute('key', compute, timeout=0.05), 1)
+        time.sleep(0.1)
+        # Another worker is refreshing it: the stale value is served
+        caches['coordination'].add('lock:key', 1)
+        self.assertEqual(self.cache.get_or_compute('key', compute, timeout=0.05), 1)
+        caches['coordination'].delete('lock:key')
+        self.assertEqual(self.cache.get_or_compute('key', compute, timeout=0.05), 2)
+        self.assertEqual(len(calls), 2)
+
+    def test_culling_keeps_stamps_and_locks(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        backend = 'apps.core.cache_backends.InstrumentedFileBasedCache'
+        with override_settings(CACHES={
+            'default': TEST_CACHES['default'],
+            'shared': {'BACKEND': backend, 'LOCATION': f'{cache_dir}/shared', 'OPTIONS': {'MAX_ENTRIES': 20}},
+            'coordination': {
+                'BACKEND': backend, 'LOCATION': f'{cache_dir}/coordination',
+                'OPTIONS': {'MAX_ENTRIES': 20, 'CULL_LIVE_ENTRIES': False},
+            },
+        }):
+            cache = caches['default']
+            cache.clear_local()
+            version = cache.namespace_version('catalog')
+            self.assertTrue(cache._acquire('key'))
+            for i in range(200):
+                cache.set(f'other:{i}', i)
+            cache.clear_local()
+            self.assertEqual(cache.namespace_version('catalog'), version)
+            self.assertTrue(caches['coordination'].has_key('lock:key'))
+            cache._release('key')
+
+
+class MetricsTests(SimpleTestCase):
+    @override_settings(METRICS_TOKEN='secret')
+    def test_access(self):
+        factory = RequestFactory()
+        self.assertFalse(metrics_allowed(factory.get('/metrics', REMOTE_ADDR='127.0.0.1')))
+        self.assertFalse(metrics_allowed(factory.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')))
+        self.assertTrue(metrics_allowed(factory.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')))
+        with override_settings(METRICS_TOKEN=''):
+            self.assertFalse(metrics_allowed(factory.get('/metrics', HTTP_AUTHORIZATION='Bearer ')))
+
+    def test_old_snapshots_are_pruned(self):
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir)
+        # pid_max is far below 2**30, so no process has this pid
+        exited = os.path.join(metrics_dir, f'metrics-{2 ** 30}-1.json')
+        running = os.path.join(metrics_dir, f'metrics-{os.getpid()}-1.json')
+        for path in (exited, running):
+            with open(path, 'w') as f:
+                json.dump({'counters': [['cache_requests_total', ['default', 'hit'], 1]], 'histograms': []}, f)
+            os.utime(path, (0, 0))
+        with override_settings(METRICS_DIR=metrics_dir, METRICS_SNAPSHOT_MAX_AGE=60):
+            metrics.collect()
+        self.assertFalse(os.path.exists(exited))
+        self.assertTrue(os.path.exists(running))
+
+
+class SerializerTimingTests(SimpleTestCase):
+    class ItemSerializer(serializers.Serializer):
+        name = serializers.CharField()
+
+    def test_serialize_phase(self):
+        # CoreConfig.ready() installed it already when SERVER_TIMING_ENABLED is set
+        install_serializer_timing()
+        fget = Serializer.data.fget
+        self.assertTrue(fget.timed)
+        install_serializer_timing()
+        self.assertIs(Serializer.data.fget, fget)
+
+        timer = PhaseTimer()
+        token = timer.activate()
+        try:
+            data = self.ItemSerializer([{'name': 'a'}, {'name': 'b'}], many=True).data
+        finally:
+            PhaseTimer.deactivate(token)
+        self.assertEqual(data, [{'name': 'a'}, {'name': 'b'}])
+        self.assertEqual(list(timer.phases), ['serialize'])
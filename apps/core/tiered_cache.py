@@ -0,0 +1,277 @@
+"""
+Two-level cache: a small in-process LRU in front of the cache shared by all workers.
+
+``TieredCache`` is a regular Django cache backend (the ``default`` alias), so parler and
+``cache.get()``/``cache.set()`` callers get local hits without any change. Values read
+from the shared cache are kept locally for at most ``LOCAL_TIMEOUT`` seconds, which
+bounds how long another worker's change can go unnoticed. Writes and deletes also
+drop the key from the in-process level of every worker right away, through
+``apps.core.invalidation``. On top of the backend API it offers:
+
+* namespaces: :meth:`TieredCache.namespaced_key` puts the namespace's version stamp into
+  a key and :meth:`TieredCache.bump_namespace` invalidates every key of a namespace at
+  once, without knowing or deleting them (and, through ``apps.core.invalidation``, drops
+  the old stamp from the in-process level of every worker right away);
+* :meth:`TieredCache.get_or_compute`: stale-while-revalidate with single-flight locking.
+  An expired entry is served for ``stale`` more seconds while exactly one process (and
+  thread) recomputes it; on a cold miss the other callers wait for that result instead
+  of all running the computation at once.
+
+Namespace stamps and the single-flight locks are kept in ``COORDINATION_ALIAS``, a cache
+that does not evict live entries, so filling the shared cache cannot reset them.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from apps.core import invalidation, metrics
+
+NAMESPACE_KEY = 'ns:{namespace}'
+LOCK_KEY = 'lock:{key}'
+_MISSING = object()
+
+# Django creates a cache instance per thread; like LocMemCache, the instances of one
+# process share the in-process level (and know which keys are being computed)
+_locals = {}
+_locks = {}
+_computing = {}
+
+
+class TieredCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        params = dict(params)
+        options = dict(params.get('OPTIONS') or {})
+        self.shared_alias = options.pop('SHARED_ALIAS', 'shared')
+        # Namespace stamps and locks must outlive the cached data, keep them where nothing is culled
+        self.coordination_alias = options.pop('COORDINATION_ALIAS', self.shared_alias)
+        self.local_max_entries = int(options.pop('LOCAL_MAX_ENTRIES', 1000))
+        self.local_timeout = float(options.pop('LOCAL_TIMEOUT', 5))
+        self.lock_timeout = float(options.pop('LOCK_TIMEOUT', 10))
+        self.metrics_name = options.pop('METRICS_NAME', 'tiered')
+        params['OPTIONS'] = options
+        super().__init__(params)
+        name = location or self.shared_alias
+        # key -> (local expiry on the monotonic clock, pickled value), least recently used first
+        self._local = _locals.setdefault(name, OrderedDict())
+        self._local_lock = _locks.setdefault(name, threading.Lock())
+        self._computing = _computing.setdefault(name, {})
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @property
+    def coordination(self):
+        return caches[self.coordination_alias]
+
+    # In-process level. Values are pickled like LocMemCache does, so callers never share
+    # (and mutate) one object.
+
+    def _local_get(self, key):
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def _local_set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        timeout = self.get_backend_timeout(timeout)
+        local_timeout = self.local_timeout if timeout is None else min(self.local_timeout, timeout - time.time())
+        if local_timeout <= 0:
+            self._local_delete(key)
+            return
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._local_lock:
+            self._local[key] = (time.monotonic() + local_timeout, pickled)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._local_lock:
+            return self._local.pop(key, None) is not None
+
+    def evict_local(self, keys, version=None):
+        """Drop ``keys`` from this process only, e.g. when another worker reports a change."""
+        for key in keys:
+            self._local_delete(self.make_and_validate_key(key, version=version))
+
+    def clear_local(self):
+        with self._local_lock:
+            self._local.clear()
+
+    # Django cache API
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self._local_get(local_key)
+        if value is not _MISSING:
+            metrics.CACHE_REQUESTS.inc(cache=self.metrics_name, result='local_hit')
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            metrics.CACHE_REQUESTS.inc(cache=self.metrics_name, result='miss')
+            return default
+        metrics.CACHE_REQUESTS.inc(cache=self.metrics_name, result='hit')
+        self._local_set(local_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._local_set(self.make_and_validate_key(key, version=version), value, timeout)
+        invalidation.publish([key], version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed_keys = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed_keys:
+                self._local_set(self.make_and_validate_key(key, version=version), value, timeout)
+        invalidation.publish(data, version)
+        return failed_keys
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if not self.shared.add(key, value, timeout, version=version):
+            return False
+        self._local_set(self.make_and_validate_key(key, version=version), value, timeout)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        invalidation.publish([key], version)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.evict_local(keys, version=version)
+        invalidation.publish(keys, version)
+        self.shared.delete_many(keys, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local_delete(self.make_and_validate_key(key, version=version))
+        invalidation.publish([key], version)
+        return self.shared.incr(key, delta, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def clear(self):
+        self.clear_local()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    # Namespaces
+
+    def namespace_version(self, namespace):
+        key = NAMESPACE_KEY.format(namespace=namespace)
+        local_key = self.make_and_validate_key(key)
+        version = self._local_get(local_key)
+        if version is _MISSING:
+            version = self.coordination.get(key)
+            if version is None:
+                # add() so that concurrent first requests agree on one version
+                self.coordination.add(key, time.time_ns(), timeout=None)
+                version = self.coordination.get(key)
+            self._local_set(local_key, version)
+        return version
+
+    def bump_namespace(self, *namespaces):
+        """Make every key of ``namespaces`` unreachable; they expire from the shared cache on their own."""
+        version = time.time_ns()
+        keys = [NAMESPACE_KEY.format(namespace=namespace) for namespace in namespaces]
+        self.coordination.set_many({key: version for key in keys}, timeout=None)
+        self.evict_local(keys)
+        invalidation.publish(keys)
+
+    def namespaced_key(self, namespace, key):
+        return f'{namespace}:{self.namespace_version(namespace)}:{key}'
+
+    # Stale-while-revalidate
+
+    def get_or_compute(self, key, compute, timeout=DEFAULT_TIMEOUT, stale=60, namespace=None):
+        """
+        Return the cached result of ``compute()``, computing it once across all workers.
+
+        The entry is fresh for ``timeout`` seconds and then served for ``stale`` more
+        seconds while the first caller to notice refreshes it.
+        """
+        if namespace is not None:
+            key = self.namespaced_key(namespace, key)
+        entry = self.get(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if fresh_until > time.time():
+                return value
+            # The local copy may be older than what another worker already stored
+            entry = self.shared.get(key) or entry
+            fresh_until, value = entry
+            if fresh_until > time.time():
+                self._local_set(self.make_and_validate_key(key), entry)
+                return value
+            if self._acquire(key):
+                try:
+                    return self._compute(key, compute, timeout, stale)
+                finally:
+                    self._release(key)
+            metrics.CACHE_REQUESTS.inc(cache=self.metrics_name, result='stale')
+            return value
+
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            if self._acquire(key):
+                try:
+                    entry = self.shared.get(key)
+                    if entry is not None and entry[0] > time.time():
+                        return entry[1]
+                    return self._compute(key, compute, timeout, stale)
+                finally:
+                    self._release(key)
+            # Someone else is computing it, wait for the result
+            time.sleep(0.02)
+            entry = self.shared.get(key)
+            if entry is not None:
+                return entry[1]
+            if time.monotonic() > deadline:
+                return compute()
+
+    def _compute(self, key, compute, timeout, stale):
+        value = compute()
+        timeout = self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+        if timeout is None:
+            fresh_until, total = float('inf'), None
+        else:
+            fresh_until, total = time.time() + timeout, timeout + stale
+        self.set(key, (fresh_until, value), total)
+        return value
+
+    def _acquire(self, key):
+        with self._local_lock:
+            if key in self._computing:
+                return False
+            self._computing[key] = True
+        # Other processes: add() is atomic in the shared backends (see cache_backends)
+        if self.coordination.add(LOCK_KEY.format(key=key), 1, timeout=self.lock_timeout):
+            return True
+        with self._local_lock:
+            del self._computing[key]
+        return False
+
+    def _release(self, key):
+        self.coordination.delete(LOCK_KEY.format(key=key))
+        with self._local_lock:
+            self._computing.pop(key, None)
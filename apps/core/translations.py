@@ -0,0 +1,86 @@
+"""
+Single-language API responses.
+
+Translated fields are returned as ``{language: value}`` for every language. With
+``?lang=<code>`` (or ``?lang=auto`` for the language ``LocaleMiddleware`` picked from
+``Accept-Language``) only that language is returned, resolved through the
+``PARLER_LANGUAGES`` fallback chain the same way parler resolves ``obj.name``, and
+:func:`translations_prefetch` fetches one translation row per object instead of all
+of them.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Case, OuterRef, Prefetch, Subquery, Value, When
+from django.utils.translation import get_supported_language_variant
+from drf_yasg import openapi
+from parler import appsettings as parler_settings
+
+LANGUAGE_QUERY_PARAM = 'lang'
+
+LANGUAGE_PARAMETER = openapi.Parameter(
+    LANGUAGE_QUERY_PARAM, openapi.IN_QUERY, type=openapi.TYPE_STRING,
+    description="Only return translations in this language (ru, en, uz, kk, ko), falling back like the site does; "
+                "'auto' uses Accept-Language. All languages are returned without it.",
+)
+
+
+@lru_cache(maxsize=None)
+def language_chain(language_code):
+    """``language_code`` followed by its PARLER_LANGUAGES fallbacks, in lookup order."""
+    chain = [language_code]
+    for code in parler_settings.PARLER_LANGUAGES.get_fallback_languages(language_code):
+        if code not in chain:
+            chain.append(code)
+    return tuple(chain)
+
+
+def requested_language(request):
+    """Language selected with ``?lang=``, or None when the client wants every language."""
+    value = request.GET.get(LANGUAGE_QUERY_PARAM) if request is not None else None
+    if not value:
+        return None
+    if value == 'auto':
+        return getattr(request, 'LANGUAGE_CODE', None) or settings.LANGUAGE_CODE
+    try:
+        return get_supported_language_variant(value)
+    except LookupError:
+        return None
+
+
+def translations_prefetch(lookup, model, language_code):
+    """
+    Prefetch for the ``translations`` relation at ``lookup`` (e.g. ``'category__translations'``)
+    of the parler ``model``. With a language only the row parler would read for it is
+    fetched: the first language of its fallback chain the object has a translation in.
+    """
+    if language_code is None:
+        return lookup
+    translations_model = model._parler_meta.root_model
+    chain = language_chain(language_code)
+    best_language = (
+        translations_model.objects
+        .filter(master_id=OuterRef('master_id'), language_code__in=chain)
+        .order_by(Case(*(When(language_code=code, then=Value(rank)) for rank, code in enumerate(chain))))
+        .values('language_code')[:1]
+    )
+    return Prefetch(lookup, queryset=translations_model.objects.filter(language_code=Subquery(best_language)))
+
+
+def translated_values(obj, field, language_code=None):
+    """
+    ``{language: value}`` of a translated field for ``language_code``, or for every
+    language when it is None. Reads the prefetched ``translations``, missing and empty
+    values are left out.
+    """
+    rows = {translation.language_code: translation for translation in obj.translations.all()}
+    codes = [language_code] if language_code else [code for code, name in settings.LANGUAGES]
+    values = {}
+    for code in codes:
+        for candidate in language_chain(code):
+            if candidate in rows:
+                value = getattr(rows[candidate], field)
+                if value:
+                    values[code] = value
+                break
+    return values
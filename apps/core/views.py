@@ -0,0 +1,57 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from apps.core import memory, metrics
+
+
+def metrics_allowed(request):
+    """
+    Staff users and scrapers sending ``Authorization: Bearer <METRICS_TOKEN>`` may read
+    operational endpoints. The client address is not trusted: behind a local proxy
+    every request comes from 127.0.0.1.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return True
+    scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(
+        settings.METRICS_TOKEN and scheme.lower() == 'bearer'
+        and hmac.compare_digest(token.strip().encode(), settings.METRICS_TOKEN.encode())
+    )
+
+
+def metrics_view(request):
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_http_methods(['GET', 'POST'])
+def memory_view(request):
+    """
+    tracemalloc diagnostics of the worker answering (staff only, see apps.core.memory).
+
+    GET reports memory usage, the largest allocation sites and the growth between
+    snapshots ``?base=`` and ``?compare=`` (default: first and latest). POST with
+    ``action`` ``start``, ``snapshot`` or ``stop`` controls tracing.
+    """
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        if action == 'start':
+            memory.start()
+        elif action == 'snapshot':
+            memory.take_snapshot()
+        elif action == 'stop':
+            memory.stop()
+        else:
+            return JsonResponse({'error': "action must be start, snapshot or stop"}, status=400)
+    try:
+        limit = int(request.GET.get('limit', 25))
+        base = int(request.GET.get('base', 0))
+        compare_to = int(request.GET.get('compare', -1))
+        return JsonResponse(memory.report(limit, base, compare_to))
+    except (ValueError, IndexError):
+        return JsonResponse({'error': "limit, base and compare must be valid snapshot indexes"}, status=400)
@@ -0,0 +1,115 @@
+"""
+Work done once in the gunicorn master before it forks the workers.
+
+With ``preload_app`` the application is imported in the master, but Django still
+builds most of its state lazily on the first request of every worker: URL
+resolver, gettext catalogs, model relation caches, serializer fields, the
+category label index. ``warm_up`` does that work up front so every worker
+inherits it through copy-on-write and the first requests are not slow, then
+closes the connections that must not be shared with the children.
+"""
+import gc
+import logging
+import time
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+from django.utils import translation
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def _project_serializers():
+    """Serializer classes defined in the ``serializers`` module of the project's apps."""
+    for app_config in apps.get_app_configs():
+        if not app_config.name.startswith('apps.'):
+            continue
+        try:
+            module = import_module(f'{app_config.name}.serializers')
+        except ModuleNotFoundError:
+            continue
+        for value in vars(module).values():
+            if isinstance(value, type) and issubclass(value, BaseSerializer) and value.__module__ == module.__name__:
+                yield value
+
+
+def warm_modules():
+    # Pillow imports its format plugins on the first image that is opened
+    from PIL import Image
+    Image.init()
+
+
+def warm_translations():
+    resolver = get_resolver()
+    for code, name in settings.LANGUAGES:
+        with translation.override(code):
+            translation.gettext('Not found')
+            # The reverse lookup tables are built per active language
+            resolver.reverse_dict
+
+
+def warm_models():
+    for model in apps.get_models(include_auto_created=True):
+        model._meta.get_fields()
+        model._meta.related_objects
+
+
+def warm_serializers():
+    serializer_classes = list(_project_serializers())
+    for serializer_class in serializer_classes:
+        try:
+            serializer_class(context={}).fields
+        except Exception:
+            logger.debug("Could not build the fields of %s", serializer_class.__name__, exc_info=True)
+    return len(serializer_classes)
+
+
+def warm_category_tree():
+    from apps.market.cache import catalog_cache_version
+    from apps.market.category_labels import get_category_labels
+
+    for code, name in settings.LANGUAGES:
+        get_category_labels(code)
+    catalog_cache_version()
+
+
+STEPS = (
+    ('modules', warm_modules),
+    ('translations', warm_translations),
+    ('models', warm_models),
+    ('serializers', warm_serializers),
+    ('category_tree', warm_category_tree),
+)
+
+
+def warm_up():
+    """Run every step and return ``{step: milliseconds}``; a failing step is logged and skipped."""
+    timings = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except DatabaseError:
+            logger.warning("Warmup step %s skipped, the database is not available", name, exc_info=True)
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    # Sockets opened here would be shared by every forked worker
+    connections.close_all()
+    caches.close_all()
+    logger.info("Warmup finished: %s", ', '.join(f"{name} {ms} ms" for name, ms in timings.items()))
+    return timings
+
+
+def freeze():
+    """
+    Move everything allocated so far to the permanent generation. The collector then
+    never touches these objects (and their pages) in the workers, which keeps the
+    memory shared with the master instead of copying it on the first collection.
+    """
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
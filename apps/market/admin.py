@@ -1,6 +1,15 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.db.models import Count, F, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.utils.html import format_html
 from parler.admin import TranslatableAdmin
+
+from apps.core.admin import TranslationPrefetchAdminMixin
+from apps.market.cache import bump_product_cache_versions
+from apps.market.category_labels import get_category_labels
+from apps.market.widgets import CategorySelect2Widget
 from apps.market.models import (
 	Category, TopLevelCategory, SubCategory, Product, ProductImage, ProductColor,
   	CommentAndReviewProduct
@@ -13,7 +22,7 @@ class ParentCategoryFilter(admin.SimpleListFilter):
 
 	def lookups(self, request, model_admin):
 		# Only show top-level categories as filter options
-		top_level_categories = Category.objects.filter(parent__isnull=True)
+		top_level_categories = Category.objects.filter(parent__isnull=True).prefetch_related('translations')
 		return [(cat.id, cat.safe_translation_getter('name', any_language=True) or 'Безымянный') for cat in top_level_categories]
 
 	def queryset(self, request, queryset):
@@ -22,8 +31,16 @@ class ParentCategoryFilter(admin.SimpleListFilter):
 		return queryset
 
 
+class CategoryFilter(admin.RelatedFieldListFilter):
+	"""Category filter whose labels ("Parent / Child") come from the cached label index"""
+
+	def field_choices(self, field, request, model_admin):
+		labels = get_category_labels()
+		return sorted(labels.items(), key=lambda choice: choice[1])
+
+
 @admin.register(TopLevelCategory)
-class TopLevelCategoryAdmin(TranslatableAdmin):
+class TopLevelCategoryAdmin(TranslationPrefetchAdminMixin, TranslatableAdmin):
 	list_display = ('russian_title', 'get_all_translations', 'created_at')
 	search_fields = ('translations__name',)
 	list_filter = ('created_at',)
@@ -38,31 +55,6 @@ class TopLevelCategoryAdmin(TranslatableAdmin):
 	)
 	readonly_fields = ('created_at',)
 	
-	def russian_title(self, obj):
-		"""Return Russian translation of the name"""
-		try:
-			obj.set_current_language('ru')
-			return obj.name or 'Без названия'
-		except:
-			return obj.safe_translation_getter('name', any_language=True) or 'Без названия'
-	
-	russian_title.short_description = 'Название (RU)'
-	
-	def get_all_translations(self, obj):
-		"""Показать все переводы для быстрого просмотра"""
-		translations = []
-		for lang_code, lang_name in [('ru', 'RU'), ('en', 'EN'), ('uz', 'UZ'), ('kk', 'KK'), ('ko', 'KO')]:
-			try:
-				obj.set_current_language(lang_code)
-				name = obj.name
-				if name:
-					translations.append(f"{lang_name}: {name}")
-			except:
-				pass
-		return " | ".join(translations) if translations else "Нет переводов"
-	
-	get_all_translations.short_description = 'Переводы'
-
 	def get_queryset(self, request):
 		qs = super().get_queryset(request)
 		return qs.filter(parent__isnull=True)
@@ -85,10 +77,12 @@ class TopLevelCategoryAdmin(TranslatableAdmin):
 
 
 @admin.register(SubCategory)
-class SubCategoryAdmin(TranslatableAdmin):
+class SubCategoryAdmin(TranslationPrefetchAdminMixin, TranslatableAdmin):
 	list_display = ('russian_title', 'parent', 'get_all_translations', 'created_at')
 	search_fields = ('translations__name', 'parent__translations__name')
 	list_filter = (ParentCategoryFilter, 'created_at')
+	list_select_related_extra = ('parent',)
+	list_prefetch_related = ('parent__translations',)
 	fieldsets = (
 		('Основная информация', {
 			'fields': ('name', 'parent'),
@@ -100,31 +94,6 @@ class SubCategoryAdmin(TranslatableAdmin):
 	)
 	readonly_fields = ('created_at',)
 	
-	def russian_title(self, obj):
-		"""Return Russian translation of the name"""
-		try:
-			obj.set_current_language('ru')
-			return obj.name or 'Без названия'
-		except:
-			return obj.safe_translation_getter('name', any_language=True) or 'Без названия'
-	
-	russian_title.short_description = 'Название (RU)'
-	
-	def get_all_translations(self, obj):
-		"""Показать все переводы для быстрого просмотра"""
-		translations = []
-		for lang_code, lang_name in [('ru', 'RU'), ('en', 'EN'), ('uz', 'UZ'), ('kk', 'KK'), ('ko', 'KO')]:
-			try:
-				obj.set_current_language(lang_code)
-				name = obj.name
-				if name:
-					translations.append(f"{lang_name}: {name}")
-			except:
-				pass
-		return " | ".join(translations) if translations else "Нет переводов"
-	
-	get_all_translations.short_description = 'Переводы'
-
 	def get_queryset(self, request):
 		qs = super().get_queryset(request)
 		return qs.filter(parent__isnull=False, parent__parent__isnull=True)
@@ -137,6 +106,7 @@ class SubCategoryAdmin(TranslatableAdmin):
 	def formfield_for_foreignkey(self, db_field, request, **kwargs):
 		if db_field.name == 'parent':
 			kwargs['queryset'] = Category.objects.filter(parent__isnull=True)
+			kwargs['widget'] = CategorySelect2Widget()
 		return super().formfield_for_foreignkey(db_field, request, **kwargs)
 	
 	class Media:
@@ -210,11 +180,35 @@ class CommentAndReviewProductInline(admin.TabularInline):
 		return True
 
 
+class ProductActionForm(ActionForm):
+	value = forms.DecimalField(
+		label='Значение', required=False,
+		help_text='Процент скидки или изменение остатка (можно отрицательное)'
+	)
+
+
+def _bulk_update(modeladmin, request, queryset, **values):
+	"""Apply ``values`` to the selected products with a single UPDATE and report the row count"""
+	product_ids = list(queryset.values_list('pk', flat=True))
+	updated = Product.objects.filter(pk__in=product_ids).update(**values)
+	bump_product_cache_versions(product_ids)
+	modeladmin.message_user(request, f'Обновлено продуктов: {updated}', messages.SUCCESS)
+
+
+def _flag_action(field, value, description):
+	def action(modeladmin, request, queryset):
+		_bulk_update(modeladmin, request, queryset, **{field: value})
+	action.__name__ = f"{'set' if value else 'unset'}_{field}"
+	return admin.action(description=description)(action)
+
+
 @admin.register(Product)
-class ProductAdmin(TranslatableAdmin):
-	list_display = ('thumbnail_preview', 'russian_title', 'category', 'brand', 'price', 'discount_price', 'get_translation_status', 'created_at')
+class ProductAdmin(TranslationPrefetchAdminMixin, TranslatableAdmin):
+	list_display = ('thumbnail_preview', 'russian_title', 'category', 'brand', 'price', 'discount_price', 'images_count', 'get_translation_status', 'created_at')
 	search_fields = ('translations__name', 'category__translations__name', 'brand')
-	list_filter = ('category', 'brand', 'created_at')
+	list_filter = (('category', CategoryFilter), 'brand', 'created_at')
+	list_select_related_extra = ('category__parent',)
+	list_prefetch_related = ('category__translations', 'category__parent__translations')
 	fieldsets = (
 		('Основная информация', {
 			'fields': ('name', 'description', 'category', 'brand'),
@@ -232,32 +226,19 @@ class ProductAdmin(TranslatableAdmin):
 	)
 	readonly_fields = ('thumbnail_preview',)
 	inlines = [ProductImageInline, ProductColorInline, CommentAndReviewProductInline]
+	action_form = ProductActionForm
+	actions = [
+		_flag_action('is_popular', True, 'Отметить как популярные'),
+		_flag_action('is_popular', False, 'Снять отметку «популярный»'),
+		_flag_action('is_new', True, 'Отметить как новые'),
+		_flag_action('is_new', False, 'Снять отметку «новый»'),
+		_flag_action('is_discounted', True, 'Отметить как товары со скидкой'),
+		_flag_action('is_discounted', False, 'Снять отметку «со скидкой»'),
+		'apply_percentage_discount',
+		'remove_discount',
+		'adjust_stock',
+	]
 	
-	def russian_title(self, obj):
-		"""Return Russian translation of the name"""
-		try:
-			obj.set_current_language('ru')
-			return obj.name or 'Без названия'
-		except:
-			return obj.safe_translation_getter('name', any_language=True) or 'Без названия'
-	
-	russian_title.short_description = 'Название (RU)'
-	
-	def get_translation_status(self, obj):
-		"""Показать статус переводов"""
-		languages = [('ru', 'RU'), ('en', 'EN'), ('uz', 'UZ'), ('kk', 'KK'), ('ko', 'KO')]
-		completed = []
-		for lang_code, lang_name in languages:
-			try:
-				obj.set_current_language(lang_code)
-				if obj.name:
-					completed.append(lang_name)
-			except:
-				pass
-		return f"{len(completed)}/5 ({', '.join(completed)})" if completed else "0/5"
-	
-	get_translation_status.short_description = 'Переводы'
-
 	def translated_name(self, obj):
 		return obj.safe_translation_getter('name', any_language=True) or 'Безымянный'
 	translated_name.short_description = 'Название продукта'
@@ -273,18 +254,55 @@ class ProductAdmin(TranslatableAdmin):
 	thumbnail_preview.short_description = "Миниатюра"
 
 	def images_count(self, obj):
-		return obj.images.count()
+		return obj.images_count
 	images_count.short_description = 'Количество изображений'
+	images_count.admin_order_field = 'images_count'
+
+	def _action_value(self, request):
+		try:
+			value = self.action_form.base_fields['value'].clean(request.POST.get('value'))
+		except forms.ValidationError:
+			value = None
+		if value is not None:
+			return value
+		self.message_user(request, 'Укажите значение в поле «Значение»', messages.ERROR)
+		return None
+
+	@admin.action(description='Применить скидку в процентах')
+	def apply_percentage_discount(self, request, queryset):
+		percent = self._action_value(request)
+		if percent is None:
+			return
+		if not 0 < percent < 100:
+			self.message_user(request, 'Процент скидки должен быть от 0 до 100', messages.ERROR)
+			return
+		factor = float((100 - percent) / 100)
+		_bulk_update(self, request, queryset, discount_price=F('price') * factor, is_discounted=True)
+
+	@admin.action(description='Убрать скидку')
+	def remove_discount(self, request, queryset):
+		_bulk_update(self, request, queryset, discount_price=0.0, is_discounted=False)
+
+	@admin.action(description='Изменить остаток на складе')
+	def adjust_stock(self, request, queryset):
+		delta = self._action_value(request)
+		if delta is None:
+			return
+		if delta != int(delta):
+			self.message_user(request, 'Изменение остатка должно быть целым числом', messages.ERROR)
+			return
+		_bulk_update(self, request, queryset, stock=Greatest(Coalesce(F('stock'), Value(0)) + int(delta), Value(0)))
 
 	def formfield_for_foreignkey(self, db_field, request, **kwargs):
 		if db_field.name == 'category':
 			# Show only subcategories (categories that have a parent)
 			kwargs['queryset'] = Category.objects.filter(parent__isnull=False).order_by('parent__id', 'id')
+			kwargs['widget'] = CategorySelect2Widget()
 		return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 	def get_queryset(self, request):
 		qs = super().get_queryset(request)
-		return qs.prefetch_related('category__translations', 'images')
+		return qs.annotate(images_count=Count('images', distinct=True))
 
 	class Media:
 		js = ('admin/js/image_preview.js',)
@@ -5,3 +5,7 @@ class MarketConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.market'
     verbose_name = "Маркетплейс"
+
+    def ready(self):
+        from apps.market.signals import connect_signals
+        connect_signals()
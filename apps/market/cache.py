@@ -0,0 +1,43 @@
+"""
+Cache namespaces for product data.
+
+Cached product payloads are stored in the :data:`CATALOG_NAMESPACE` (lists, the
+category tree, brands and colors) or in :func:`product_namespace` (a single product)
+of the default :class:`~apps.core.tiered_cache.TieredCache`. Bumping a namespace
+makes every entry built from the old data unreachable without deleting keys.
+"""
+from django.core.cache import caches
+
+CATALOG_NAMESPACE = 'market:catalog'
+CATALOG_TIMEOUT = 60 * 5
+
+
+def product_namespace(product_id):
+    return f'market:product:{product_id}'
+
+
+def _cache():
+    return caches['default']
+
+
+def product_cache_version(product_id):
+    return _cache().namespace_version(product_namespace(product_id))
+
+
+def catalog_cache_version():
+    return _cache().namespace_version(CATALOG_NAMESPACE)
+
+
+def cached_catalog(key, compute):
+    """``compute()`` cached in the catalog namespace, recomputed by one worker at a time."""
+    return _cache().get_or_compute(key, compute, CATALOG_TIMEOUT, namespace=CATALOG_NAMESPACE)
+
+
+def bump_catalog_cache_version():
+    """Invalidate every cached product list, e.g. after a category rename."""
+    _cache().bump_namespace(CATALOG_NAMESPACE)
+
+
+def bump_product_cache_versions(product_ids):
+    """Invalidate cached data for ``product_ids`` and every cached product list."""
+    _cache().bump_namespace(CATALOG_NAMESPACE, *(product_namespace(product_id) for product_id in product_ids))
@@ -0,0 +1,63 @@
+"""
+Precomputed "Parent / Child" labels for the whole category tree.
+
+``Category.__str__`` walks the ancestors with a query per level, which makes
+category dropdowns cost a query per option. The index is built from two queries
+and kept per language in :data:`CATEGORY_LABELS_NAMESPACE` of the default
+:class:`~apps.core.tiered_cache.TieredCache`, which the signals in
+``apps.market.signals`` bump whenever a category or one of its translations changes.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import get_language
+
+from apps.core.translations import language_chain
+from apps.market.models import Category
+
+CATEGORY_LABELS_NAMESPACE = 'market:category_labels'
+CATEGORY_LABELS_TIMEOUT = 60 * 60 * 24
+UNNAMED = "Без названия"
+
+
+def build_category_labels(language_code):
+    """Return ``{category_id: label}`` with the same labels as ``Category.__str__``."""
+    parents = dict(Category.objects.values_list('id', 'parent_id'))
+    names = {}
+    translations = Category._parler_meta.root_model.objects.values_list('master_id', 'language_code', 'name')
+    for master_id, code, name in translations:
+        if name:
+            names.setdefault(master_id, {})[code] = name
+
+    chain = language_chain(language_code)
+
+    def own_name(category_id):
+        values = names.get(category_id)
+        if not values:
+            return UNNAMED
+        for code in chain:
+            if code in values:
+                return values[code]
+        return next(iter(values.values()))
+
+    labels = {}
+    for category_id in parents:
+        parts = []
+        current = category_id
+        while current is not None and len(parts) <= len(parents):
+            parts.append(own_name(current))
+            current = parents.get(current)
+        labels[category_id] = ' / '.join(reversed(parts))
+    return labels
+
+
+def get_category_labels(language_code=None):
+    """Return the cached label index for ``language_code`` (the active language by default)."""
+    language_code = language_code or get_language() or settings.LANGUAGE_CODE
+    return caches['default'].get_or_compute(
+        language_code, lambda: build_category_labels(language_code), CATEGORY_LABELS_TIMEOUT,
+        namespace=CATEGORY_LABELS_NAMESPACE,
+    )
+
+
+def invalidate_category_labels():
+    caches['default'].bump_namespace(CATEGORY_LABELS_NAMESPACE)
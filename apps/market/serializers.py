@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from apps.core.translations import translated_values, translations_prefetch
+
 from apps.market.models import (
 	TopLevelCategory, SubCategory, Category, Product, ProductImage, ProductColor,
 	CommentAndReviewProduct
@@ -19,21 +21,8 @@ class SubCategorySerializer(serializers.ModelSerializer):
 		return obj.parent.name
 
 	def get_translated_name(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				name = obj.name
-				if name:
-					translations[lang_code] = name
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'name', self.context.get('language'))
 
 
 class TopLevelCategorySerializer(serializers.ModelSerializer):
@@ -50,21 +39,8 @@ class TopLevelCategorySerializer(serializers.ModelSerializer):
 		return SubCategorySerializer(sub_categories, many=True, context=self.context).data
 
 	def get_translated_name(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				name = obj.name
-				if name:
-					translations[lang_code] = name
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'name', self.context.get('language'))
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -104,6 +80,15 @@ class ProductSerializer(serializers.ModelSerializer):
 				  'comment_count', 'comment_and_review', 'total_rating', 'is_news', 'is_populars', 'stock', 'is_new', 'is_popular', 'is_discounted', 'created_at']
 		read_only_fields = ['created_at']
 
+	@staticmethod
+	def setup_eager_loading(queryset, language=None):
+		"""Load everything the serializer reads, so a page of products costs a fixed number of queries"""
+		return queryset.select_related('category__parent').prefetch_related(
+			translations_prefetch('translations', Product, language), 'images', 'colors', 'comments',
+			translations_prefetch('category__translations', Category, language),
+			translations_prefetch('category__parent__translations', Category, language),
+		)
+
 	def get_is_news(self, obj):
 		from datetime import timedelta
 		from django.utils import timezone
@@ -125,38 +110,12 @@ class ProductSerializer(serializers.ModelSerializer):
 		return "Нет категории"
 
 	def get_translated_name(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				name = obj.name
-				if name:
-					translations[lang_code] = name
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'name', self.context.get('language'))
 
 	def get_translated_description(self, obj):
-		"""Get all translations for all languages"""
-		translations = {}
-		for lang_code, lang_name in [('ru', 'russian'), ('en', 'english'), ('uz', 'uzbek'), ('kk', 'kazakh'), ('ko', 'korean')]:
-			try:
-				obj.set_current_language(lang_code)
-				name = obj.description
-				if name:
-					translations[lang_code] = name
-			except:
-				pass
-		try:
-			obj.set_current_language('ru')
-		except:
-			pass
-		return translations
+		"""Translations in the language requested with ?lang=, or in all languages"""
+		return translated_values(obj, 'description', self.context.get('language'))
 
 	def get_comment_count(self, obj):
 		"""Get the count of comments and reviews for the product."""
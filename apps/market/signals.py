@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.core.invalidation import watch_translations
+from apps.market.cache import bump_catalog_cache_version, bump_product_cache_versions
+from apps.market.category_labels import invalidate_category_labels
+from apps.market.models import (
+    Category, TopLevelCategory, SubCategory, Product, ProductColor, ProductImage, CommentAndReviewProduct,
+)
+
+
+def category_changed(sender, **kwargs):
+    invalidate_category_labels()
+    bump_catalog_cache_version()
+
+
+def product_changed(sender, instance, **kwargs):
+    product_id = getattr(instance, 'master_id', None) or instance.pk
+    bump_product_cache_versions([product_id])
+
+
+def product_part_changed(sender, instance, **kwargs):
+    # Colors, images and reviews are part of the product payload (and of the color list)
+    if instance.product_id is None:
+        bump_catalog_cache_version()
+    else:
+        bump_product_cache_versions([instance.product_id])
+
+
+def connect_signals():
+    # Proxy models send signals with themselves as sender, so each one is connected
+    senders = (Category, TopLevelCategory, SubCategory, Category._parler_meta.root_model)
+    for sender in senders:
+        post_save.connect(category_changed, sender=sender, dispatch_uid=f'category_labels_save_{sender.__name__}')
+        post_delete.connect(category_changed, sender=sender, dispatch_uid=f'category_labels_delete_{sender.__name__}')
+
+    for sender in (Product, Product._parler_meta.root_model):
+        post_save.connect(product_changed, sender=sender, dispatch_uid=f'product_version_save_{sender.__name__}')
+        post_delete.connect(product_changed, sender=sender, dispatch_uid=f'product_version_delete_{sender.__name__}')
+
+    for sender in (ProductColor, ProductImage, CommentAndReviewProduct):
+        post_save.connect(product_part_changed, sender=sender, dispatch_uid=f'product_part_save_{sender.__name__}')
+        post_delete.connect(product_part_changed, sender=sender, dispatch_uid=f'product_part_delete_{sender.__name__}')
+
+    # Parler caches translations in the default cache; other workers must drop their copies
+    watch_translations(Category, Product)
@@ -1,3 +1,107 @@
-from django.test import TestCase
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from apps.core.testing import TEST_CACHES, Endpoint, QueryBudgetTestCase, seed_dataset
+from apps.core.translations import translations_prefetch
+from apps.market.admin import CategoryFilter
+from apps.market.category_labels import get_category_labels
+from apps.market.models import Category, CommentAndReviewProduct, Product, ProductImage
+
+
+class MarketQueryBudgetTests(QueryBudgetTestCase):
+    urls_module = 'apps.market.urls'
+    endpoints = {
+        'top_level_category_list': Endpoint(budget=4),
+        'product_list': Endpoint(budget=8, query={'page_size': 100}),
+        'product_detail': Endpoint(budget=7, kwargs=lambda test, size: {'pk': test.products[0].pk}),
+        'comment_and_review_create': Endpoint('post', budget=3, status=201, data=lambda test, size: {
+            'product': test.products[0].pk, 'full_name': 'Reviewer', 'content': 'Хорошо', 'review_rating': 5,
+        }),
+        'product_color_hex_list': Endpoint(budget=1),
+        'product_brand_list': Endpoint(budget=1),
+    }
+
+    def seed(self, size):
+        previous = self.seeded
+        super().seed(size)
+        # The detail page lists every image and review of one product, so those scale too
+        product = self.products[0]
+        for i in range(previous, size - 1):
+            ProductImage.objects.create(product=product, image=f"products/images/extra-{i}.jpg")
+            CommentAndReviewProduct.objects.create(product=product, full_name=f"Reviewer {i}", content="Хорошо", review_rating=4)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ProductLanguageTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Names exist in ru and en, descriptions only in ru
+        cls.product = seed_dataset(1)[0]
+        cls.url = reverse('product_detail', kwargs={'pk': cls.product.pk})
+
+    def get(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_all_languages_without_lang(self):
+        data, queries = self.get()
+        self.assertEqual(data['translated_name'], {
+            'ru': "Продукт 0", 'en': "Product 0", 'uz': "Продукт 0", 'kk': "Продукт 0", 'ko': "Продукт 0",
+        })
+
+    def test_requested_language_with_fallback(self):
+        all_languages, expected_queries = self.get()
+        data, queries = self.get({'lang': 'en'})
+        self.assertEqual(data['translated_name'], {'en': "Product 0"})
+        # Like parler, an existing but empty translation is not replaced by a fallback
+        self.assertNotIn('en', all_languages['translated_description'])
+        self.assertEqual(data['translated_description'], {})
+        self.assertEqual(queries, expected_queries)
+
+        data, queries = self.get({'lang': 'kk'})
+        self.assertEqual(data['translated_name'], {'kk': "Продукт 0"})
+
+    def test_unknown_language_returns_all(self):
+        data, queries = self.get({'lang': 'xx'})
+        self.assertEqual(len(data['translated_name']), 5)
+
+    def test_only_the_needed_translation_is_fetched(self):
+        for language, fetched in (('en', 'en'), ('kk', 'ru')):
+            product = Product.objects.prefetch_related(
+                translations_prefetch('translations', Product, language)
+            ).get(pk=self.product.pk)
+            self.assertEqual([t.language_code for t in product.translations.all()], [fetched])
+
+
+@override_settings(CACHES=TEST_CACHES)
+@override_settings(CACHES=TEST_CACHES)
+class CategoryFilterTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_labels_without_query_per_level(self):
+        parent = None
+        for level in range(4):
+            parent = Category.objects.create(name=f"Уровень {level}", parent=parent)
+        expected = sorted((category.pk, str(category)) for category in Category.objects.all())
+        # Two queries build the label index, whatever the depth of the tree
+        with self.assertNumQueries(2):
+            choices = CategoryFilter.field_choices(CategoryFilter.__new__(CategoryFilter), None, None, None)
+        self.assertEqual(sorted(choices), expected)
+        self.assertEqual(choices[-1][1], "Уровень 0 / Уровень 1 / Уровень 2 / Уровень 3")
+
+    def test_labels_follow_renames(self):
+        category = Category.objects.create(name="Старое")
+        self.assertEqual(get_category_labels('ru')[category.pk], "Старое")
+        with self.assertNumQueries(0):
+            get_category_labels('ru')
+        category.name = "Новое"
+        category.save()
+        self.assertEqual(get_category_labels('ru')[category.pk], "Новое")
@@ -15,6 +15,8 @@ from apps.market.serializers import (
 	CommentAndReviewProductCreateSerializer
 )
 from apps.market.filters import ProductFilter
+from apps.market.cache import cached_catalog
+from apps.core.translations import LANGUAGE_PARAMETER, requested_language, translations_prefetch
 
 
 class ProductPagination(PageNumberPagination):
@@ -33,15 +35,25 @@ class TopLevelCategoryListView(APIView):
 		operation_description='Retrieve a list of all top-level categories.',
 		operation_summary='List Top-Level Categories',
 		tags=['Categories'],
+		manual_parameters=[LANGUAGE_PARAMETER],
 		responses={
 			200: TopLevelCategorySerializer(many=True, read_only=True),
 			400: 'Bad Request'
 		}
 	)
 	def get(self, request):
-		categories =  Category.objects.filter(parent=None).order_by('-id')
-		serializer = TopLevelCategorySerializer(categories, many=True, context={'request': request})
-		return Response(serializer.data, status=status.HTTP_200_OK)
+		language = requested_language(request)
+
+		def build():
+			categories =  Category.objects.filter(parent=None).order_by('-id').prefetch_related(
+				translations_prefetch('translations', Category, language),
+				translations_prefetch('subcategories__translations', Category, language),
+			)
+			serializer = TopLevelCategorySerializer(categories, many=True, context={'request': request, 'language': language})
+			return list(serializer.data)
+
+		data = cached_catalog(f'categories:{language or "all"}', build)
+		return Response(data, status=status.HTTP_200_OK)
 
 
 class ProductListView(APIView):
@@ -72,6 +84,7 @@ class ProductListView(APIView):
 			openapi.Parameter('is_new', openapi.IN_QUERY, description="Filter new products (true/false)", type=openapi.TYPE_BOOLEAN),
 			openapi.Parameter('is_discounted', openapi.IN_QUERY, description="Filter products with discount price (true/false)", type=openapi.TYPE_BOOLEAN),
 			openapi.Parameter('ordering', openapi.IN_QUERY, description="Order by: created_at, -created_at, price, -price, id, -id", type=openapi.TYPE_STRING),
+			LANGUAGE_PARAMETER,
 		],
 		responses={
 			200: openapi.Response(
@@ -94,7 +107,8 @@ class ProductListView(APIView):
 	)
 	def get(self, request):
 		# Get all products
-		queryset = Product.objects.exclude(stock=0).order_by('-created_at')
+		language = requested_language(request)
+		queryset = ProductSerializer.setup_eager_loading(Product.objects.exclude(stock=0).order_by('-created_at'), language)
 		
 		# Apply filters using Django Filter
 		filterset = ProductFilter(request.query_params, queryset=queryset)
@@ -105,7 +119,7 @@ class ProductListView(APIView):
 		paginated_products = paginator.paginate_queryset(filtered_queryset, request)
 		
 		# Serialize the data
-		serializer = ProductSerializer(paginated_products, many=True, context={'request': request})
+		serializer = ProductSerializer(paginated_products, many=True, context={'request': request, 'language': language})
 		
 		# Return paginated response
 		return paginator.get_paginated_response(serializer.data)
@@ -138,8 +152,7 @@ class ProductColorHexListView(APIView):
     )
     def get(self, request):
         # Get all color hex values from ProductColor, then deduplicate in Python to ensure uniqueness
-        colors_qs = ProductColor.objects.values_list('color', flat=True)
-        colors = list(dict.fromkeys(colors_qs))
+        colors = cached_catalog('colors', lambda: list(dict.fromkeys(ProductColor.objects.values_list('color', flat=True))))
         return Response({'colors': colors}, status=status.HTTP_200_OK)
 
 
@@ -172,7 +185,7 @@ class ProductBrandListView(APIView):
         # Get all non-empty brand values from Product, then deduplicate in Python to ensure uniqueness
         brands_qs = Product.objects.exclude(brand__isnull=True).exclude(brand__exact='').values_list('brand', flat=True)
         # Use dict.fromkeys to preserve order while deduplicating
-        brands = list(dict.fromkeys(brands_qs))
+        brands = cached_catalog('brands', lambda: list(dict.fromkeys(brands_qs)))
         return Response({'brands': brands}, status=status.HTTP_200_OK)
 
 
@@ -184,6 +197,7 @@ class ProductDetailView(APIView):
 		operation_description='Retrieve detailed information about a specific product by its ID.',
 		operation_summary='Get Product Detail',
 		tags=['Products'],
+		manual_parameters=[LANGUAGE_PARAMETER],
 		responses={
 			200: ProductSerializer,
 			404: 'Product not found'
@@ -191,8 +205,9 @@ class ProductDetailView(APIView):
 	)
 	def get(self, request, pk):
 		try:
-			product = Product.objects.get(pk=pk)
-			serializer = ProductSerializer(product, context={'request': request})
+			language = requested_language(request)
+			product = ProductSerializer.setup_eager_loading(Product.objects.all(), language).get(pk=pk)
+			serializer = ProductSerializer(product, context={'request': request, 'language': language})
 			return Response(serializer.data, status=status.HTTP_200_OK)
 		except Product.DoesNotExist:
 			return Response({'detail': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
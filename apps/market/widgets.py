@@ -0,0 +1,58 @@
+from django import forms
+from django_select2.conf import settings as select2_settings
+from django_select2.forms import ModelSelect2Widget
+
+from apps.market.category_labels import get_category_labels
+
+
+def _as_list(assets):
+    """SELECT2_JS and SELECT2_CSS may be a single path, a list or empty."""
+    if isinstance(assets, str):
+        return [assets]
+    return list(assets or [])
+
+
+class CategorySelect2Widget(ModelSelect2Widget):
+    """
+    Category autocomplete for admin forms.
+
+    Labels and search both use the cached "Parent / Child" index, so neither the
+    form nor the AJAX lookup walks the category tree per option.
+    """
+    search_fields = ['translations__name__icontains']
+
+    def __init__(self, *args, **kwargs):
+        attrs = kwargs.setdefault('attrs', {})
+        attrs.setdefault('data-minimum-input-length', 0)
+        attrs.setdefault('style', 'width: 30em;')
+        super().__init__(*args, **kwargs)
+
+    def label_from_instance(self, obj):
+        return get_category_labels().get(obj.pk) or str(obj)
+
+    def filter_queryset(self, request, term, queryset=None, **dependent_fields):
+        if queryset is None:
+            queryset = self.get_queryset()
+        if dependent_fields:
+            queryset = queryset.filter(**dependent_fields)
+        if not term:
+            return queryset
+        bits = term.lower().split()
+        ids = [
+            category_id for category_id, label in get_category_labels().items()
+            if all(bit in label.lower() for bit in bits)
+        ]
+        return queryset.filter(pk__in=ids)
+
+    @property
+    def media(self):
+        # Same assets as Select2Mixin.media, with select2 loaded onto admin's jQuery
+        # before jquery.init.js calls noConflict()
+        i18n = []
+        if self.i18n_name in select2_settings.SELECT2_I18N_AVAILABLE_LANGUAGES:
+            i18n = [f'{select2_settings.SELECT2_I18N_PATH}/{self.i18n_name}.js']
+        return forms.Media(
+            js=['admin/js/vendor/jquery/jquery.js', *_as_list(select2_settings.SELECT2_JS), *i18n,
+                'admin/js/jquery.init.js', 'django_select2/django_select2.js'],
+            css={'screen': [*_as_list(select2_settings.SELECT2_CSS), 'django_select2/django_select2.css']},
+        )
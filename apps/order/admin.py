@@ -1,18 +1,118 @@
+import json
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from .models import CardDetails, Order
+from .models import ArchivedOrder, CardDetails, Order
+from .widgets import UserSelect2Widget
 from apps.market.models import Product
 
 
+class UserAutocompleteFilter(admin.SimpleListFilter):
+    """
+    User filter rendered as a django_select2 search box instead of one link per user.
+    """
+    title = _('Пользователь')
+    parameter_name = 'user'
+    template = 'admin/order/autocomplete_filter.html'
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.widget = UserSelect2Widget(attrs={'style': 'width: 100%;', 'data-minimum-input-length': 2})
+        self.widget_id = f'{self.parameter_name}_autocomplete_filter'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    @property
+    def widget_html(self):
+        return self.widget.render(self.parameter_name, self.value(), attrs={'id': self.widget_id})
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value is None:
+            return queryset
+        if not value.isdigit():
+            return queryset.none()
+        return queryset.filter(user_id=value)
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'display': _('All'),
+        }
+
+
+class TotalPriceRangeFilter(admin.SimpleListFilter):
+    """Fixed price buckets instead of one option per distinct total_price."""
+    title = _('Общая цена')
+    parameter_name = 'total_price_range'
+    ranges = (
+        ('0-100000', _('до 100 000'), 0, 100000),
+        ('100000-500000', _('100 000 – 500 000'), 100000, 500000),
+        ('500000-1000000', _('500 000 – 1 000 000'), 500000, 1000000),
+        ('1000000-', _('более 1 000 000'), 1000000, None),
+    )
+
+    def lookups(self, request, model_admin):
+        return [(key, label) for key, label, low, high in self.ranges]
+
+    def queryset(self, request, queryset):
+        for key, label, low, high in self.ranges:
+            if self.value() == key:
+                queryset = queryset.filter(total_price__gte=low)
+                if high is not None:
+                    queryset = queryset.filter(total_price__lt=high)
+                return queryset
+        return queryset
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    On PostgreSQL, use the planner's row estimate instead of COUNT(*) once the
+    changelist is large enough that the exact number does not matter.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connection.vendor == 'postgresql' and hasattr(queryset, 'query'):
+            estimate = self._estimate(queryset)
+            if estimate is not None and estimate > self.exact_count_threshold:
+                return estimate
+        return queryset.count()
+
+    def _estimate(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        try:
+            return int(plan[0]['Plan']['Plan Rows'])
+        except (IndexError, KeyError, TypeError):
+            return None
+
+
 @admin.register(CardDetails)
 class CardDetailsAdmin(admin.ModelAdmin):
     list_display = ('user_email', 'card_holder', 'card_number_masked', 'expiration_date', 'created_at', 'is_expired')
-    list_filter = ('expiration_date', 'created_at', 'user')
+    list_filter = ('expiration_date', 'created_at', UserAutocompleteFilter)
     search_fields = ('user__email', 'card_holder', 'card_number')
     readonly_fields = ('created_at',)
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         (_('Пользователь'), {
@@ -57,10 +157,12 @@ class CardDetailsAdmin(admin.ModelAdmin):
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('order_id', 'user_email', 'full_name', 'phone', 'address', 'total_price', 'products_count', 'created_at', 'status_display', 'payment_status_display')
-    list_filter = ('created_at', 'user', 'total_price', 'payment_status')
+    list_filter = ('created_at', UserAutocompleteFilter, TotalPriceRangeFilter, 'payment_status')
     search_fields = ('order_id', 'user__email')
     readonly_fields = ('order_id', 'created_at', 'products_display')
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         (_('Основная информация'), {
@@ -88,26 +190,43 @@ class OrderAdmin(admin.ModelAdmin):
     products_count.short_description = _('Количество продуктов')
     
     def products_display(self, obj):
-        if not obj.products:
+        lines = list(obj.lines.select_related('product').prefetch_related('product__translations'))
+        if lines:
+            products = [
+                {
+                    'id': line.product_id or 'N/A',
+                    'name': str(line.product) if line.product else 'Неизвестный продукт',
+                    'quantity': line.quantity,
+                    'price': line.unit_price,
+                    'product': line.product,
+                }
+                for line in lines
+            ]
+        elif obj.products:
+            # Orders that have not been backfilled into OrderLine yet: one query for all products
+            product_map = Product.objects.in_bulk([p.get('id') for p in obj.products if p.get('id') is not None])
+            products = [
+                {
+                    'id': product.get('id', 'N/A'),
+                    'name': product.get('name', 'Неизвестный продукт'),
+                    'quantity': product.get('quantity', 1),
+                    'price': product.get('price', 0),
+                    'product': product_map.get(product.get('id')),
+                }
+                for product in obj.products
+            ]
+        else:
             return _('Нет продуктов')
-        
+
         html = '<ul>'
-        for product in obj.products:
-            product_id = product.get('id', 'N/A')
-            product_name = product.get('name', 'Неизвестный продукт')
-            quantity = product.get('quantity', 1)
-            price = product.get('price', 0)
-            try:
-                prod = Product.objects.get(id=product_id)
-                thumbnail = prod.thumbnail.url if prod.thumbnail else ''
-                image_html = f'<img src="{thumbnail}" style="max-width:50px; max-height:50px;" alt="{product_name}">' if thumbnail else ''
-            except Product.DoesNotExist:
-                image_html = ''
-            
-            html += f'<li>{image_html} <strong>{product_name}</strong> (ID: {product_id}) - '
-            html += f'Количество: {quantity}, Цена: {price} ₽</li>'
+        for product in products:
+            prod = product['product']
+            thumbnail = prod.thumbnail.url if prod and prod.thumbnail else ''
+            image_html = f'<img src="{thumbnail}" style="max-width:50px; max-height:50px;" alt="{product["name"]}">' if thumbnail else ''
+            html += f'<li>{image_html} <strong>{product["name"]}</strong> (ID: {product["id"]}) - '
+            html += f'Количество: {product["quantity"]}, Цена: {product["price"]} ₽</li>'
         html += '</ul>'
-        
+
         return format_html(html)
     products_display.short_description = _('Детали продуктов')
     
@@ -140,3 +259,27 @@ class OrderAdmin(admin.ModelAdmin):
         # Prevent deletion of orders
         return False
 
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'order_id', 'user_email', 'total_price', 'payment_status', 'created_at', 'archived_at')
+    list_filter = ('payment_status',)
+    search_fields = ('order_id', 'user__email')
+    date_hierarchy = 'created_at'
+
+    def user_email(self, obj):
+        return obj.user.email if obj.user else _('Неизвестный пользователь')
+    user_email.short_description = _('Email пользователя')
+    user_email.admin_order_field = 'user__email'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
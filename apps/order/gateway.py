@@ -0,0 +1,117 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from requests.exceptions import HTTPError, RequestException, Timeout
+
+
+class PaymentGatewayUnavailable(RequestException):
+    """Raised without touching the network while the Payme circuit is open."""
+
+
+class DeadlineExceeded(Timeout):
+    """Raised when the per-request gateway time budget is used up."""
+
+
+def payme_error_status(error):
+    """Short status label for a failed gateway call, used in the Payme metrics."""
+    if isinstance(error, PaymentGatewayUnavailable):
+        return 'circuit_open'
+    if isinstance(error, DeadlineExceeded):
+        return 'deadline_exceeded'
+    if isinstance(error, Timeout):
+        return 'timeout'
+    if isinstance(error, HTTPError) and error.response is not None:
+        return f'http_{error.response.status_code}'
+    return 'error'
+
+
+class Deadline:
+    """
+    Time budget shared by every gateway call made while serving one request.
+    """
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def timeout(self, default):
+        """Return the timeout for the next call, capped by the remaining budget."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Время ожидания ответа от Payme истекло")
+        return min(default, remaining)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker whose state lives in a shared cache, so every worker process
+    sees the same failure count and opens/closes the circuit together. The cache
+    (``PAYME_BREAKER_CACHE``) must not evict live entries, or an open circuit closes.
+
+    closed    -> calls go through, consecutive failures are counted
+    open      -> calls fail fast until ``recovery_timeout`` has passed
+    half-open -> a single worker gets to send a probe request, the result
+                 either closes the circuit again or re-opens it
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name, failure_threshold=None, recovery_timeout=None, cache_alias=None):
+        self.name = name
+        if failure_threshold is None:
+            failure_threshold = settings.PAYME_BREAKER_FAILURE_THRESHOLD
+        if recovery_timeout is None:
+            recovery_timeout = settings.PAYME_BREAKER_RECOVERY_TIMEOUT
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.cache = caches[cache_alias or settings.PAYME_BREAKER_CACHE]
+        self.failures_key = f'circuit:{name}:failures'
+        self.opened_at_key = f'circuit:{name}:opened_at'
+        self.probe_key = f'circuit:{name}:probe'
+
+    @property
+    def state(self):
+        opened_at = self.cache.get(self.opened_at_key)
+        if opened_at is None:
+            return self.CLOSED
+        if time.time() - opened_at < self.recovery_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def before_call(self):
+        """Raise ``PaymentGatewayUnavailable`` if the call must not be attempted."""
+        state = self.state
+        if state == self.OPEN:
+            raise PaymentGatewayUnavailable("Платежи временно недоступны")
+        if state == self.HALF_OPEN:
+            # Only one worker probes the gateway, the rest keep failing fast.
+            if not self.cache.add(self.probe_key, True, timeout=self.recovery_timeout):
+                raise PaymentGatewayUnavailable("Платежи временно недоступны")
+
+    def record_success(self):
+        keys = [self.failures_key, self.opened_at_key, self.probe_key]
+        # Avoid a shared-cache write on every healthy call
+        if self.cache.get_many(keys):
+            self.cache.delete_many(keys)
+
+    def record_failure(self):
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+        self.cache.add(self.failures_key, 0, timeout=None)
+        try:
+            failures = self.cache.incr(self.failures_key)
+        except ValueError:
+            failures = 1
+            self.cache.set(self.failures_key, failures, timeout=None)
+        if failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.cache.set(self.opened_at_key, time.time(), timeout=None)
+        self.cache.delete(self.probe_key)
@@ -0,0 +1,104 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.order.models import ArchivedOrder, ArchivedOrderLine, Order, OrderLine
+
+ARCHIVE_FIELDS = (
+    'id', 'order_id', 'user_id', 'address', 'phone', 'full_name',
+    'products', 'total_price', 'payment_status', 'created_at',
+)
+LINE_FIELDS = ('id', 'product_id', 'quantity', 'unit_price', 'discount', 'created_at')
+
+
+def archive_is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [ArchivedOrder._meta.db_table])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def month_bounds(value):
+    start = value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def ensure_month_partition(value, tablespace=None):
+    """Create the monthly partition of the archive table that ``value`` falls into."""
+    start, end = month_bounds(value.astimezone(dt_timezone.utc))
+    table = ArchivedOrder._meta.db_table
+    partition = f"{table}_y{start.year}m{start.month:02d}"
+    quote_name = connection.ops.quote_name
+    sql = (
+        f"CREATE TABLE IF NOT EXISTS {quote_name(partition)} PARTITION OF {quote_name(table)} "
+        "FOR VALUES FROM (%s) TO (%s)"
+    )
+    if tablespace:
+        sql += f" TABLESPACE {quote_name(tablespace)}"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [start, end])
+
+
+def archive_lines(order_ids):
+    """Copy the lines of ``order_ids`` to the archive before the orders are deleted."""
+    lines = OrderLine.objects.filter(order_id__in=order_ids).values('order_id', *LINE_FIELDS)
+    ArchivedOrderLine.objects.bulk_create([
+        ArchivedOrderLine(archived_order_id=line.pop('order_id'), **line) for line in lines
+    ])
+
+
+class Command(BaseCommand):
+    help = (
+        "Move orders older than --older-than-days in a terminal payment state (paid, cancelled) "
+        "and their lines from the order tables to the archive tables. On PostgreSQL the archive "
+        "is partitioned by month and missing partitions are created, optionally in a cold --tablespace."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=1000, help="Orders moved per transaction")
+        parser.add_argument('--tablespace', default=None, help="Tablespace for newly created archive partitions")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many orders would be moved")
+
+    def handle(self, *args, **options):
+        tablespace = options['tablespace']
+        # quote_name() does not escape, a name must not be able to close the quotes
+        if tablespace and ('"' in tablespace or '\0' in tablespace):
+            raise CommandError(f"Invalid tablespace name: {tablespace!r}")
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        candidates = Order.objects.filter(
+            created_at__lt=cutoff, payment_status__in=Order.TERMINAL_STATES
+        ).order_by('id')
+
+        if options['dry_run']:
+            self.stdout.write(f"{candidates.count()} orders created before {cutoff:%Y-%m-%d} would be archived")
+            return
+
+        partitioned = archive_is_partitioned()
+        known_partitions = set()
+        moved = 0
+        while True:
+            with transaction.atomic():
+                rows = list(candidates.values(*ARCHIVE_FIELDS)[:options['batch_size']])
+                if not rows:
+                    break
+                if partitioned:
+                    for row in rows:
+                        month = (row['created_at'].year, row['created_at'].month)
+                        if month not in known_partitions:
+                            ensure_month_partition(row['created_at'], tablespace)
+                            known_partitions.add(month)
+                order_ids = [row['id'] for row in rows]
+                ArchivedOrder.objects.bulk_create([ArchivedOrder(**row) for row in rows])
+                # Deleting the orders cascades to their OrderLine rows, so those go first
+                archive_lines(order_ids)
+                Order.objects.filter(id__in=order_ids).delete()
+            moved += len(rows)
+            self.stdout.write(f"Archived {moved} orders")
+
+        self.stdout.write(self.style.SUCCESS(f"Archiving finished: {moved} orders moved"))
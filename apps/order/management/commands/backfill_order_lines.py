@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from apps.market.models import Product
+from apps.order.models import Order, OrderLine
+
+
+class Command(BaseCommand):
+    help = "Create OrderLine rows for historical orders from their Order.products JSON, in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Orders processed per transaction")
+        parser.add_argument('--start-id', type=int, default=0, help="Resume after this order id")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = options['start_id']
+        orders_done = lines_done = 0
+
+        # Orders that already have lines (new checkouts, earlier runs) are skipped,
+        # so the command can be re-run or resumed safely.
+        pending = Order.objects.annotate(
+            has_lines=Exists(OrderLine.objects.filter(order=OuterRef('pk')))
+        ).filter(has_lines=False).order_by('id')
+
+        while True:
+            chunk = list(pending.filter(id__gt=last_id).only('id', 'products', 'created_at')[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+
+            product_ids = {
+                item.get('id') for order in chunk for item in (order.products or []) if isinstance(item, dict)
+            }
+            existing_ids = set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+
+            lines = []
+            for order in chunk:
+                for item in order.products or []:
+                    if not isinstance(item, dict):
+                        continue
+                    product_id = item.get('id')
+                    lines.append(OrderLine(
+                        order=order,
+                        product_id=product_id if product_id in existing_ids else None,
+                        quantity=item.get('quantity') or 1,
+                        unit_price=item.get('price') or 0.0,
+                        # The JSON payload only kept the charged price, the discount is unknown
+                        discount=0.0,
+                        created_at=order.created_at,
+                    ))
+
+            with transaction.atomic():
+                OrderLine.objects.bulk_create(lines, batch_size=chunk_size)
+
+            orders_done += len(chunk)
+            lines_done += len(lines)
+            self.stdout.write(f"Processed orders up to id {last_id}: {orders_done} orders, {lines_done} lines")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill finished: {orders_done} orders, {lines_done} lines created"))
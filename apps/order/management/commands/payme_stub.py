@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from apps.order.payme_stub import PaymeStub, make_server
+
+
+class Command(BaseCommand):
+    help = "Run a local Payme JSON-RPC stand-in with latency and fault injection (see apps/order/payme_stub.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8089)
+        parser.add_argument('--latency', default='fixed:0',
+                            help="Latency distribution in ms: fixed:50, uniform:20,200, normal:100,30, "
+                                 "exponential:100 or lognormal:4.5,0.5")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Share of calls answered with a JSON-RPC error")
+        parser.add_argument('--http-error-rate', type=float, default=0.0, help="Share of calls answered with HTTP 500")
+        parser.add_argument('--hang-rate', type=float, default=0.0, help="Share of calls that hang for --hang-seconds")
+        parser.add_argument('--hang-seconds', type=float, default=30.0)
+        parser.add_argument('--pay-states', default='4',
+                            help="Weighted receipt states returned by receipts.pay, e.g. 4:0.95,50:0.05")
+        parser.add_argument('--verify-code', default='666666', help="SMS code accepted by cards.verify")
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--verbose-requests', action='store_true', help="Log every request")
+
+    def handle(self, *args, **options):
+        stub = PaymeStub(
+            latency=options['latency'],
+            error_rate=options['error_rate'],
+            http_error_rate=options['http_error_rate'],
+            hang_rate=options['hang_rate'],
+            hang_seconds=options['hang_seconds'],
+            pay_states=options['pay_states'],
+            verify_code=options['verify_code'],
+            seed=options['seed'],
+        )
+        server = make_server(stub, options['host'], options['port'], quiet=not options['verbose_requests'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Payme stand-in listening on http://{options['host']}:{options['port']}/api "
+            f"(set PAYME_USE_STUB=True to point PAYME_URL at it)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
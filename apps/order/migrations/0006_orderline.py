@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-19 16:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0008_product_stock'),
+        ('order', '0005_order_address_order_full_name_order_phone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1, verbose_name='Количество')),
+                ('unit_price', models.FloatField(default=0.0, verbose_name='Цена за единицу')),
+                ('discount', models.FloatField(default=0.0, verbose_name='Скидка на строку')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='order.order', verbose_name='Заказ')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_lines', to='market.product', verbose_name='Продукт')),
+            ],
+            options={
+                'verbose_name': 'Строка заказа',
+                'verbose_name_plural': 'Строки заказов',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['product', 'created_at'], name='order_line_product_created'), models.Index(fields=['created_at'], name='order_line_created')],
+            },
+        ),
+    ]
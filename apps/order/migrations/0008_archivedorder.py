@@ -0,0 +1,75 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+PARTITIONED_TABLE_SQL = """
+CREATE TABLE "order_archivedorder" (
+    "id" bigint NOT NULL,
+    "order_id" uuid NOT NULL,
+    "user_id" bigint NOT NULL REFERENCES "accounts_customuser" ("id") DEFERRABLE INITIALLY DEFERRED,
+    "address" varchar(255) NULL,
+    "phone" varchar(32) NULL,
+    "full_name" varchar(255) NULL,
+    "products" jsonb NULL,
+    "total_price" double precision NOT NULL,
+    "payment_status" integer NOT NULL,
+    "created_at" timestamp with time zone NOT NULL,
+    "archived_at" timestamp with time zone NOT NULL,
+    PRIMARY KEY ("id", "created_at")
+) PARTITION BY RANGE ("created_at");
+CREATE INDEX "archived_order_user_created" ON "order_archivedorder" ("user_id", "created_at" DESC);
+CREATE INDEX "archived_order_order_id" ON "order_archivedorder" ("order_id");
+"""
+
+
+def create_archive_table(apps, schema_editor):
+    model = apps.get_model('order', 'ArchivedOrder')
+    partitioned = getattr(settings, 'ORDER_ARCHIVE_PARTITIONED', True)
+    if schema_editor.connection.vendor == 'postgresql' and partitioned:
+        # Monthly partitions are created on demand by `manage.py archive_orders`
+        schema_editor.execute(PARTITIONED_TABLE_SQL)
+    else:
+        schema_editor.create_model(model)
+
+
+def drop_archive_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('order', 'ArchivedOrder'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0007_order_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ArchivedOrder',
+                    fields=[
+                        ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                        ('order_id', models.UUIDField(editable=False, verbose_name='ID заказа')),
+                        ('address', models.CharField(blank=True, max_length=255, null=True, verbose_name='Адрес')),
+                        ('phone', models.CharField(blank=True, max_length=32, null=True, verbose_name='Телефон')),
+                        ('full_name', models.CharField(blank=True, max_length=255, null=True, verbose_name='ФИО')),
+                        ('products', models.JSONField(blank=True, null=True, verbose_name='Продукты')),
+                        ('total_price', models.FloatField(default=0.0, verbose_name='Общая цена')),
+                        ('payment_status', models.IntegerField(choices=[(0, 'Чек создан. Ожидание подтверждения оплаты.'), (1, 'Первая стадия проверок. Создание транзакции в биллинге поставщика.'), (2, 'Списание денег с карты'), (3, 'Закрытие транзакции в биллинге поставщика'), (4, 'Чек оплачен'), (5, 'Чек заходирован'), (6, 'Получение команды на холдирование средств. Если чек находится в этом статусе достаточно долго - необходимо обратиться к техническим специалистам Payme Business'), (20, 'Чек стоит на паузе для ручного вмешательства'), (21, 'Чек в очереди на отмену'), (30, 'Чек в очереди на закрытие транзакции в биллинге поставщика'), (50, 'Чек отменен')], default=0, verbose_name='Статус оплаты')),
+                        ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                        ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                    ],
+                    options={
+                        'verbose_name': 'Архивный заказ',
+                        'verbose_name_plural': 'Архивные заказы',
+                        'ordering': ['-created_at'],
+                        'indexes': [models.Index(fields=['user', '-created_at'], name='archived_order_user_created'), models.Index(fields=['order_id'], name='archived_order_order_id')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
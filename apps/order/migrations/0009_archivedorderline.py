@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-19 17:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0008_product_stock'),
+        ('order', '0008_archivedorder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrderLine',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('archived_order_id', models.BigIntegerField(verbose_name='Архивный заказ')),
+                ('quantity', models.PositiveIntegerField(default=1, verbose_name='Количество')),
+                ('unit_price', models.FloatField(default=0.0, verbose_name='Цена за единицу')),
+                ('discount', models.FloatField(default=0.0, verbose_name='Скидка на строку')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_order_lines', to='market.product', verbose_name='Продукт')),
+            ],
+            options={
+                'verbose_name': 'Строка архивного заказа',
+                'verbose_name_plural': 'Строки архивных заказов',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['archived_order_id'], name='archived_line_order'), models.Index(fields=['product', 'created_at'], name='archived_line_product_created')],
+            },
+        ),
+    ]
@@ -43,6 +43,8 @@ class Order(models.Model):
         (30, "Чек в очереди на закрытие транзакции в биллинге поставщика"),
         (50, "Чек отменен"),
     )
+    # States after which a receipt never changes again (paid, cancelled)
+    TERMINAL_STATES = (4, 50)
     order_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name=_("ID заказа"))
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='orders', verbose_name=_('Пользователь'))
     address = models.CharField(max_length=255, blank=True, null=True, verbose_name=_('Адрес'))
@@ -62,4 +64,105 @@ class Order(models.Model):
         ordering = ["-created_at"]
         verbose_name = _("Заказ")
         verbose_name_plural = _("Заказы")
-        
\ No newline at end of file
+        indexes = [
+            # UserOrderListView: filter by user, newest first
+            models.Index(fields=['user', '-created_at'], name='order_user_created'),
+            # Reconciliation scans by payment status
+            models.Index(fields=['payment_status', 'created_at'], name='order_status_created'),
+        ]
+
+
+class OrderLine(models.Model):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='lines', verbose_name=_("Заказ"))
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True, related_name='order_lines', verbose_name=_("Продукт"))
+    quantity = models.PositiveIntegerField(_("Количество"), default=1)
+    unit_price = models.FloatField(_("Цена за единицу"), default=0.0)
+    discount = models.FloatField(_("Скидка на строку"), default=0.0)
+    # Copied from the order so per-period analytics do not need to join it
+    created_at = models.DateTimeField(_("Дата создания"))
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"Order #{self.order_id} line: product #{self.product_id} x {self.quantity}"
+
+    @property
+    def total_price(self):
+        return self.unit_price * self.quantity
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = _("Строка заказа")
+        verbose_name_plural = _("Строки заказов")
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='order_line_product_created'),
+            models.Index(fields=['created_at'], name='order_line_created'),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """
+    Cold storage for old orders in a terminal state, filled by ``manage.py archive_orders``.
+
+    On PostgreSQL the table is range-partitioned by month on ``created_at``
+    (see migration 0008), the primary key there is ``(id, created_at)``.
+    """
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    order_id = models.UUIDField(editable=False, verbose_name=_("ID заказа"))
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='archived_orders', verbose_name=_('Пользователь'))
+    address = models.CharField(max_length=255, blank=True, null=True, verbose_name=_('Адрес'))
+    phone = models.CharField(max_length=32, blank=True, null=True, verbose_name=_('Телефон'))
+    full_name = models.CharField(max_length=255, blank=True, null=True, verbose_name=_('ФИО'))
+    products = models.JSONField(verbose_name=_("Продукты"), null=True, blank=True)
+    total_price = models.FloatField(_("Общая цена"), default=0.0)
+    payment_status = models.IntegerField(_("Статус оплаты"), choices=Order.PAYMENT_STATES, default=0)
+    created_at = models.DateTimeField(verbose_name=_("Дата создания"))
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Дата архивации"))
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"Archived order #{self.id}, {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = _("Архивный заказ")
+        verbose_name_plural = _("Архивные заказы")
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='archived_order_user_created'),
+            models.Index(fields=['order_id'], name='archived_order_order_id'),
+        ]
+
+
+class ArchivedOrderLine(models.Model):
+    """
+    An :class:`OrderLine` moved to cold storage together with its order.
+
+    ``archived_order_id`` is the ``id`` of the :class:`ArchivedOrder`; it is not a
+    foreign key because the partitioned archive's primary key is ``(id, created_at)``.
+    """
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    archived_order_id = models.BigIntegerField(verbose_name=_("Архивный заказ"))
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_order_lines', verbose_name=_("Продукт"))
+    quantity = models.PositiveIntegerField(_("Количество"), default=1)
+    unit_price = models.FloatField(_("Цена за единицу"), default=0.0)
+    discount = models.FloatField(_("Скидка на строку"), default=0.0)
+    created_at = models.DateTimeField(_("Дата создания"))
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"Archived order #{self.archived_order_id} line: product #{self.product_id} x {self.quantity}"
+
+    @property
+    def total_price(self):
+        return self.unit_price * self.quantity
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = _("Строка архивного заказа")
+        verbose_name_plural = _("Строки архивных заказов")
+        indexes = [
+            models.Index(fields=['archived_order_id'], name='archived_line_order'),
+            models.Index(fields=['product', 'created_at'], name='archived_line_product_created'),
+        ]
@@ -0,0 +1,213 @@
+"""
+Local stand-in for the Payme JSON-RPC API.
+
+Implements the ``cards.*`` and ``receipts.*`` methods used by ``PaymeClient`` with
+configurable latency, error injection and receipt state progressions, so checkout
+can be load-tested without the Payme test environment. Start it with
+``python manage.py payme_stub`` and set ``PAYME_USE_STUB=True``.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LatencyDistribution:
+    """
+    Parses ``kind:params`` specs (values in milliseconds):
+
+    fixed:50  uniform:20,200  normal:100,30  exponential:100  lognormal:4.5,0.5
+    """
+
+    KINDS = ('fixed', 'uniform', 'normal', 'exponential', 'lognormal')
+
+    def __init__(self, spec, rng):
+        kind, _, params = spec.partition(':')
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}', expected one of {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(',') if p]
+        self.rng = rng
+
+    def sample(self):
+        """Return a delay in seconds."""
+        p = self.params
+        if self.kind == 'fixed':
+            ms = p[0] if p else 0
+        elif self.kind == 'uniform':
+            ms = self.rng.uniform(p[0], p[1])
+        elif self.kind == 'normal':
+            ms = self.rng.gauss(p[0], p[1])
+        elif self.kind == 'exponential':
+            ms = self.rng.expovariate(1 / p[0])
+        else:
+            ms = self.rng.lognormvariate(p[0], p[1])
+        return max(ms, 0) / 1000
+
+
+class StateProgression:
+    """
+    Weighted choice of the state returned by ``receipts.pay``, e.g. ``4:0.95,50:0.05``.
+    """
+
+    def __init__(self, spec, rng):
+        self.states = []
+        self.weights = []
+        for part in spec.split(','):
+            state, _, weight = part.partition(':')
+            self.states.append(int(state))
+            self.weights.append(float(weight or 1))
+        self.rng = rng
+
+    def sample(self):
+        return self.rng.choices(self.states, weights=self.weights)[0]
+
+
+class PaymeStub:
+    """In-memory card and receipt store plus the fault injection knobs."""
+
+    def __init__(self, latency='fixed:0', error_rate=0.0, http_error_rate=0.0, hang_rate=0.0,
+                 hang_seconds=30.0, pay_states='4', verify_code='666666', seed=None):
+        self.rng = random.Random(seed)
+        self.latency = LatencyDistribution(latency, self.rng)
+        self.pay_states = StateProgression(pay_states, self.rng)
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.verify_code = verify_code
+        self.cards = {}
+        self.receipts = {}
+        self.lock = threading.Lock()
+        self.methods = {
+            'cards.create': self.cards_create,
+            'cards.get_verify_code': self.cards_get_verify_code,
+            'cards.verify': self.cards_verify,
+            'receipts.create': self.receipts_create,
+            'receipts.pay': self.receipts_pay,
+        }
+
+    def roll(self, rate):
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def delay(self):
+        with self.lock:
+            seconds = self.latency.sample()
+        time.sleep(seconds)
+
+    def dispatch(self, payload):
+        """Return ``(http_status, response_body)`` for a JSON-RPC request."""
+        if self.roll(self.hang_rate):
+            time.sleep(self.hang_seconds)
+        self.delay()
+        if self.roll(self.http_error_rate):
+            return 500, {"error": "Injected HTTP error"}
+
+        request_id = payload.get('id')
+        if self.roll(self.error_rate):
+            return 200, self.error(request_id, -32400, "Injected system error")
+        handler = self.methods.get(payload.get('method'))
+        if handler is None:
+            return 200, self.error(request_id, -32601, "Method not found")
+        try:
+            result = handler(payload.get('params') or {})
+        except LookupError as e:
+            return 200, self.error(request_id, -31602, str(e))
+        return 200, {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def error(self, request_id, code, message):
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    def card_response(self, token):
+        card = self.cards[token]
+        return {"card": {"number": card['number'], "expire": card['expire'], "token": token,
+                         "recurrent": True, "verify": card['verified']}}
+
+    def cards_create(self, params):
+        card = params.get('card') or {}
+        number = str(card.get('number', ''))
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.cards[token] = {
+                'number': f"{number[:6]}******{number[-4:]}",
+                'expire': card.get('expire'),
+                'verified': False,
+            }
+        return self.card_response(token)
+
+    def cards_get_verify_code(self, params):
+        if params.get('token') not in self.cards:
+            raise LookupError("Card not found")
+        return {"sent": True, "phone": "99890*****99", "wait": 60000}
+
+    def cards_verify(self, params):
+        token = params.get('token')
+        if token not in self.cards:
+            raise LookupError("Card not found")
+        if str(params.get('code')) != self.verify_code:
+            raise LookupError("Invalid verification code")
+        with self.lock:
+            self.cards[token]['verified'] = True
+        return self.card_response(token)
+
+    def receipts_create(self, params):
+        receipt_id = uuid.uuid4().hex[:24]
+        receipt = {"_id": receipt_id, "create_time": int(time.time() * 1000), "pay_time": 0,
+                   "state": 0, "amount": params.get('amount'), "account": params.get('account'),
+                   "detail": params.get('detail')}
+        with self.lock:
+            self.receipts[receipt_id] = receipt
+        return {"receipt": receipt}
+
+    def receipts_pay(self, params):
+        receipt = self.receipts.get(params.get('id'))
+        if receipt is None:
+            raise LookupError("Receipt not found")
+        if params.get('token') not in self.cards:
+            raise LookupError("Card not found")
+        with self.lock:
+            receipt['state'] = self.pay_states.sample()
+            receipt['pay_time'] = int(time.time() * 1000)
+        return {"receipt": receipt}
+
+
+class PaymeStubHandler(BaseHTTPRequestHandler):
+    stub = None
+    quiet = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            status, body = 200, self.stub.error(None, -32700, "Parse error")
+        else:
+            status, body = self.stub.dispatch(payload)
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(stub, host='127.0.0.1', port=8089, quiet=True):
+    handler = type('BoundPaymeStubHandler', (PaymeStubHandler,), {'stub': stub, 'quiet': quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(stub, host='127.0.0.1', port=0):
+    """Run the stand-in in a daemon thread and return ``(server, url)``, e.g. for benchmarks."""
+    server = make_server(stub, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/api"
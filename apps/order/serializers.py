@@ -2,7 +2,7 @@ from rest_framework import serializers
 from django.utils import timezone
 from datetime import date
 
-from apps.order.models import CardDetails, Order
+from apps.order.models import ArchivedOrder, CardDetails, Order
 from apps.market.models import Product
 from apps.market.serializers import ProductSerializer
 
@@ -81,6 +81,42 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ('order_id', 'user', 'created_at', 'payment_status', 'address', 'phone', 'full_name')
 
     def get_products(self, obj):
-        product_ids = [p['id'] for p in obj.products]
-        products = Product.objects.filter(id__in=product_ids)
-        return ProductSerializer(products, many=True, context=self.context).data
\ No newline at end of file
+        products_by_id = self._products_by_id()
+        product_ids = {p['id'] for p in obj.products}
+        # Same order as Product.Meta.ordering, like the former per-order query
+        products = sorted(
+            (products_by_id[pk] for pk in product_ids if pk in products_by_id),
+            key=lambda product: product.created_at, reverse=True,
+        )
+        return ProductSerializer(products, many=True, context=self.context).data
+
+    def _products_by_id(self):
+        """
+        Load the products of every order on the page with one set of queries.
+
+        A view that serializes one page with several serializers passes all of the
+        page's orders as ``context['orders']``, their products are then loaded once.
+        """
+        if getattr(self, '_products_cache', None) is None:
+            if 'orders' in self.context:
+                if 'products_by_id' not in self.context:
+                    self.context['products_by_id'] = self._load_products(self.context['orders'])
+                self._products_cache = self.context['products_by_id']
+            else:
+                orders = self.parent.instance if self.parent is not None else [self.instance]
+                self._products_cache = self._load_products(orders)
+        return self._products_cache
+
+    def _load_products(self, orders):
+        product_ids = {p['id'] for order in orders for p in order.products or []}
+        queryset = ProductSerializer.setup_eager_loading(
+            Product.objects.filter(id__in=product_ids), self.context.get('language'),
+        )
+        return {product.id: product for product in queryset}
+
+
+class ArchivedOrderSerializer(OrderSerializer):
+    class Meta(OrderSerializer.Meta):
+        model = ArchivedOrder
+        fields = ['id', 'order_id', 'user', 'address', 'phone', 'full_name', 'products', 'total_price',
+                  'payment_status', 'created_at']
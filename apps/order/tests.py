@@ -1,3 +1,152 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import CustomUser
+from apps.core.testing import Endpoint, QueryBudgetTestCase
+from apps.market.models import Category, Product
+from apps.order.gateway import CircuitBreaker, Deadline, DeadlineExceeded, PaymentGatewayUnavailable
+from apps.order.models import ArchivedOrder, ArchivedOrderLine, Order, OrderLine
+from apps.order.views import PaymeClient
+
+# A new card per call, an already known number takes a different path in CardDetailsView
+CARD_NUMBERS = {1: '4111 1111 1111 1111', 100: '4012 8888 8888 1881'}
+ARCHIVED_ID_OFFSET = 10 ** 6
+
+
+class OrderQueryBudgetTests(QueryBudgetTestCase):
+    urls_module = 'apps.order.urls'
+    endpoints = {
+        'card-details': Endpoint('post', auth=True, budget=4, status=201, data=lambda test, size: {
+            'card_number': CARD_NUMBERS[size], 'card_holder': 'Test Customer', 'expiration_date': '1299',
+        }),
+        'card-verify-code': Endpoint('post', auth=True, budget=2, data=lambda test, size: {'card_id': test.card.id}),
+        'card-verify': Endpoint('post', auth=True, budget=3, data=lambda test, size: {
+            'card_id': test.card.id, 'code': test.payme.verify_code,
+        }),
+        'order-create': Endpoint('post', auth=True, budget=9, data=lambda test, size: {
+            'card_id': test.card.id, 'address': 'Tashkent', 'phone': '+998900000000', 'full_name': 'Test Customer',
+            'product_list': [{'product_id': product.id, 'quantity': 1} for product in test.products[:size]],
+        }),
+        'user-orders': Endpoint(auth=True, budget=12, query={'page_size': 50}),
+    }
+
+    def seed(self, size):
+        previous = self.seeded
+        super().seed(size)
+        orders = Order.objects.bulk_create([
+            Order(
+                user=self.customer, total_price=product.price, payment_status=4,
+                products=[{'id': product.id, 'name': str(product), 'quantity': 1, 'price': product.price}],
+            )
+            for product in self.products[previous:size]
+        ])
+        # Listed together with the live orders, one of each per product
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(
+                id=ARCHIVED_ID_OFFSET + i, order_id=uuid.uuid4(), user=self.customer, total_price=order.total_price,
+                payment_status=order.payment_status, products=order.products, created_at=order.created_at,
+            )
+            for i, order in enumerate(orders, start=previous)
+        ])
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.enterContext(override_settings(CACHES={'breaker': {
+            'BACKEND': 'apps.core.cache_backends.InstrumentedFileBasedCache',
+            'LOCATION': cache_dir,
+            'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_LIVE_ENTRIES': False},
+        }}))
+        self.breaker = CircuitBreaker('payme', failure_threshold=2, recovery_timeout=60, cache_alias='breaker')
+
+    def recover(self):
+        self.breaker.cache.set(self.breaker.opened_at_key, time.time() - 61, timeout=None)
+
+    def test_transitions(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertRaises(PaymentGatewayUnavailable, self.breaker.before_call)
+
+        self.recover()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.breaker.before_call()
+        # Only one probe at a time
+        self.assertRaises(PaymentGatewayUnavailable, self.breaker.before_call)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        self.recover()
+        self.breaker.before_call()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.before_call()
+
+    def test_state_survives_culling(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        for i in range(100):
+            self.breaker.cache.set(f'other:{i}', i)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+
+class DeadlineTests(SimpleTestCase):
+    def test_timeout_is_capped(self):
+        self.assertEqual(Deadline(60).timeout(5), 5)
+        self.assertLessEqual(Deadline(1).timeout(5), 1)
+
+    def test_exhausted(self):
+        self.assertRaises(DeadlineExceeded, Deadline(0).timeout, 5)
+        self.assertRaises(DeadlineExceeded, PaymeClient(deadline=0).deadline.timeout, 5)
+
+
+class ArchiveOrdersTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='buyer@example.com', username='buyer', password='x')
+        self.product = Product.objects.create(name="Продукт", category=Category.objects.create(name="Категория"), price=100.0)
+        self.old = self.order(age=timedelta(days=400))
+        self.live = self.order(age=timedelta(days=1))
+
+    def order(self, age):
+        order = Order.objects.create(user=self.user, total_price=200.0, payment_status=4, products=[])
+        created_at = timezone.now() - age
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        OrderLine.objects.create(order=order, product=self.product, quantity=2, unit_price=100.0, created_at=created_at)
+        return order
+
+    def test_lines_are_archived(self):
+        call_command('archive_orders', stdout=io.StringIO())
+        self.assertQuerySetEqual(Order.objects.all(), [self.live])
+        self.assertEqual(OrderLine.objects.get().order_id, self.live.id)
+        line = ArchivedOrderLine.objects.get()
+        self.assertEqual((line.archived_order_id, line.product_id, line.quantity), (self.old.id, self.product.id, 2))
+
+    def test_invalid_tablespace(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_orders', tablespace='cold" ; DROP TABLE x; --', stdout=io.StringIO())
+
+    def test_user_orders_include_archive(self):
+        call_command('archive_orders', stdout=io.StringIO())
+        self.client.force_authenticate(self.user)
+        url = reverse('user-orders')
+
+        results = self.client.get(url).json()['results']
+        self.assertEqual([(order['id'], order['archived']) for order in results], [(self.live.id, False), (self.old.id, True)])
+        results = self.client.get(url, {'archived': 'true'}).json()['results']
+        self.assertEqual([order['id'] for order in results], [self.old.id])
+        results = self.client.get(url, {'archived': 'false'}).json()['results']
+        self.assertEqual([order['id'] for order in results], [self.live.id])
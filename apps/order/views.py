@@ -9,22 +9,28 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 import requests
 import json
+import time
 import uuid
+from apps.core import metrics
+from apps.core.translations import LANGUAGE_PARAMETER, requested_language
+from apps.market.cache import bump_product_cache_versions
 from apps.market.models import Product
 
-from apps.order.models import CardDetails, Order
+from apps.order.gateway import CircuitBreaker, Deadline, PaymentGatewayUnavailable, payme_error_status
+from apps.order.models import ArchivedOrder, CardDetails, Order, OrderLine
 from apps.order.serializers import CardDetailsSerializer
-from apps.order.serializers import OrderSerializer
+from apps.order.serializers import ArchivedOrderSerializer, OrderSerializer
 
 import logging
 from django.conf import settings
 from django.db import transaction
-from requests.exceptions import RequestException
+from django.db.models import BooleanField, Case, F, Value, When
+from requests.exceptions import RequestException, Timeout
 
 logger = logging.getLogger(__name__);
 
 class PaymeClient:
-    def __init__(self):
+    def __init__(self, deadline=None):
         self.url = settings.PAYME_URL;
         self.id = settings.PAYME_ID;
         self.key = settings.PAYME_KEY;
@@ -33,7 +39,10 @@ class PaymeClient:
             "X-Auth": f"{self.id}",  # Only send id, not key
             "Content-Type": "application/json",
         };
-        self.timeout = 10  # Added for performance
+        self.timeout = settings.PAYME_TIMEOUT
+        # Caps the total time spent on the gateway across all calls of one request
+        self.deadline = Deadline(settings.PAYME_REQUEST_DEADLINE if deadline is None else deadline)
+        self.breaker = CircuitBreaker('payme')
 
     def _make_request(self, payload):
         method = payload.get("method", "")
@@ -49,12 +58,26 @@ class PaymeClient:
                 "Content-Type": "application/json",
             }
         try:
-            response = requests.post(self.url, headers=headers, json=payload, timeout=self.timeout)
+            timeout = self.deadline.timeout(self.timeout)
+            self.breaker.before_call()
+        except RequestException as e:
+            metrics.PAYME_REQUESTS.inc(method=method, status=payme_error_status(e))
+            raise
+        start = time.perf_counter()
+        try:
+            response = requests.post(self.url, headers=headers, json=payload, timeout=timeout)
             response.raise_for_status()
-            return response.json()
+            data = response.json()
         except RequestException as e:
+            metrics.PAYME_LATENCY.observe(time.perf_counter() - start, method=method)
+            metrics.PAYME_REQUESTS.inc(method=method, status=payme_error_status(e))
+            self.breaker.record_failure()
             logger.error(f"Payme request failed: {str(e)}")
             raise;
+        metrics.PAYME_LATENCY.observe(time.perf_counter() - start, method=method)
+        metrics.PAYME_REQUESTS.inc(method=method, status='rpc_error' if data.get('error') else 'ok')
+        self.breaker.record_success()
+        return data
 
     def create_card(self, card_number, expire):
         payload = {
@@ -88,6 +111,11 @@ class PaymeClient:
         payload = {"id": 123, "method": "receipts.pay", "params": {"id": receipt_id, "token": token}};
         return self._make_request(payload);
 
+def gateway_unavailable_response(error):
+    response = Response({"error": str(error)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = str(settings.PAYME_BREAKER_RECOVERY_TIMEOUT)
+    return response
+
 class CardDetailsView(APIView):
     permission_classes = [IsAuthenticated]
  
@@ -178,6 +206,8 @@ class CardVerifyCodeView(APIView):
         try:
             data = payme_client.get_verify_code(card.payme_token)
             return Response(data, status=200)
+        except PaymentGatewayUnavailable as e:
+            return gateway_unavailable_response(e)
         except RequestException as e:
             return Response({"error": str(e)}, status=400)
 
@@ -221,6 +251,8 @@ class CardVerifyView(APIView):
                 return Response({"success": True, "data": data}, status=200)
             else:
                 return Response({"error": "Проверка не удалась"}, status=400)
+        except PaymentGatewayUnavailable as e:
+            return gateway_unavailable_response(e)
         except RequestException as e:
             return Response({"error": str(e)}, status=400)
 
@@ -254,7 +286,9 @@ class OrderCreateView(APIView):
         operation_summary='Create Order',
         responses={
             200: OrderSerializer,
-            400: 'Bad Request'
+            400: 'Bad Request',
+            503: 'Payments temporarily unavailable',
+            504: 'Payment gateway timeout'
         }
     )
     def post(self, request):
@@ -269,10 +303,15 @@ class OrderCreateView(APIView):
         card = get_object_or_404(CardDetails, id=card_id, user=request.user, verified=True)
         products = self._validate_products(product_list)
 
-        items, total_amount, products_json = self._prepare_order_data(products, product_list)
+        items, total_amount, products_json, lines = self._prepare_order_data(products, product_list)
 
         with transaction.atomic():
-            order = self._create_and_pay_order(card, total_amount, items, products_json, address, phone, full_name)
+            try:
+                order = self._create_and_pay_order(card, total_amount, items, products_json, lines, address, phone, full_name)
+            except PaymentGatewayUnavailable as e:
+                return gateway_unavailable_response(e)
+            except Timeout as e:
+                return Response({"error": str(e)}, status=status.HTTP_504_GATEWAY_TIMEOUT)
             if order.payment_status == 4:
                 self._update_stock(products, product_list)
             status_desc = dict(Order.PAYMENT_STATES).get(order.payment_status, "Неизвестное состояние")
@@ -285,7 +324,7 @@ class OrderCreateView(APIView):
 
     def _validate_products(self, product_list):
         product_ids = [p['product_id'] for p in product_list]
-        products = Product.objects.filter(id__in=product_ids)
+        products = Product.objects.filter(id__in=product_ids).prefetch_related('translations')
         if len(products) != len(product_ids):
             raise ValueError("Некоторые продукты не найдены")
         for prod in products:
@@ -298,6 +337,7 @@ class OrderCreateView(APIView):
         items = []
         total_amount = 0.0
         products_json = []
+        lines = []
         for prod in products:
             for pl in product_list:
                 if pl['product_id'] == prod.id:
@@ -321,9 +361,10 @@ class OrderCreateView(APIView):
                         "quantity": quantity,
                         "price": price
                     })
-        return items, int(total_amount * 100), products_json
+                    lines.append(OrderLine(product=prod, quantity=quantity, unit_price=price, discount=discount))
+        return items, int(total_amount * 100), products_json, lines
 
-    def _create_and_pay_order(self, card, total_amount, items, products_json, address=None, phone=None, full_name=None):
+    def _create_and_pay_order(self, card, total_amount, items, products_json, lines, address=None, phone=None, full_name=None):
         order_uuid = uuid.uuid4()
         order_id = str(order_uuid)
         payme_client = PaymeClient()
@@ -347,14 +388,22 @@ class OrderCreateView(APIView):
             phone=phone,
             full_name=full_name
         )
+        for line in lines:
+            line.order = order
+            line.created_at = order.created_at
+        OrderLine.objects.bulk_create(lines)
         return order
 
     def _update_stock(self, products, product_list):
-        for prod in products:
-            for pl in product_list:
-                if pl['product_id'] == prod.id:
-                    prod.stock -= pl['quantity']
-                    prod.save()
+        # One UPDATE for the whole order instead of a save() (and translation save) per product
+        quantities = {}
+        for pl in product_list:
+            quantities[pl['product_id']] = quantities.get(pl['product_id'], 0) + pl['quantity']
+        Product.objects.filter(id__in=quantities).update(stock=Case(
+            *[When(id=product_id, then=F('stock') - quantity) for product_id, quantity in quantities.items()],
+            default=F('stock'),
+        ))
+        bump_product_cache_versions(quantities)
 
     
 class UserOrderListView(APIView):
@@ -362,12 +411,21 @@ class UserOrderListView(APIView):
 
     @swagger_auto_schema(
         operation_id='list_user_orders',
-        operation_description='Retrieve a paginated list of all orders for the authenticated user.',
+        operation_description=(
+            'Retrieve a paginated list of all orders for the authenticated user, newest first. '
+            'Orders moved to the archive are included and marked with "archived": true.'
+        ),
         operation_summary='List User Orders',
         tags=['Orders'],
         manual_parameters=[
             openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
             openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of items per page (max 50)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(
+                'archived', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                description="By default live and archived (old, completed) orders are listed together; "
+                            "true lists only archived orders, false only live ones",
+            ),
+            LANGUAGE_PARAMETER,
         ],
         responses={
             200: openapi.Response(
@@ -389,8 +447,21 @@ class UserOrderListView(APIView):
         }
     )
     def get(self, request):
-        # Get all orders for the authenticated user
-        queryset = Order.objects.filter(user=request.user).order_by('-created_at')
+        # Orders of the authenticated user, old completed ones are moved to the archive
+        # but still listed unless the client asks for one source with ?archived=
+        archived = request.query_params.get('archived', '').lower()
+        sources = []
+        if archived not in ('true', '1'):
+            sources.append(Order)
+        if archived not in ('false', '0'):
+            sources.append(ArchivedOrder)
+        rows = [
+            model.objects.filter(user=request.user)
+            .annotate(archived=Value(model is ArchivedOrder, output_field=BooleanField()))
+            .values_list('id', 'created_at', 'archived').order_by()
+            for model in sources
+        ]
+        queryset = rows[0].union(*rows[1:], all=True).order_by('-created_at', '-id')
         
         # Apply pagination
         paginator = PageNumberPagination()
@@ -398,11 +469,26 @@ class UserOrderListView(APIView):
         paginator.page_size_query_param = 'page_size'
         paginator.max_page_size = 50
         
-        paginated_orders = paginator.paginate_queryset(queryset, request)
+        page = paginator.paginate_queryset(queryset, request)
         
-        # Serialize the data
-        serializer = OrderSerializer(paginated_orders, many=True, context={'request': request})
+        # Load the orders of the page per source, serialize them and restore the page order
+        sources = {}
+        for model, serializer_class, is_archived in (
+            (Order, OrderSerializer, False), (ArchivedOrder, ArchivedOrderSerializer, True),
+        ):
+            ids = [pk for pk, created_at, row_archived in page if bool(row_archived) == is_archived]
+            if ids:
+                sources[is_archived] = (serializer_class, list(model.objects.filter(id__in=ids)))
+        context = {
+            'request': request, 'language': requested_language(request),
+            'orders': [order for serializer_class, orders in sources.values() for order in orders],
+        }
+        serialized = {}
+        for is_archived, (serializer_class, orders) in sources.items():
+            for order, data in zip(orders, serializer_class(orders, many=True, context=context).data):
+                serialized[is_archived, order.id] = dict(data, archived=is_archived)
+        results = [serialized[bool(row_archived), pk] for pk, created_at, row_archived in page]
         
         # Return paginated response
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(results)
 	
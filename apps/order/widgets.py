@@ -0,0 +1,12 @@
+from django_select2.forms import ModelSelect2Widget
+
+from apps.accounts.models import CustomUser
+
+
+class UserSelect2Widget(ModelSelect2Widget):
+    """AJAX user chooser: only the selected user is rendered, the rest is searched on demand."""
+    model = CustomUser
+    search_fields = ['email__icontains', 'username__icontains', 'first_name__icontains', 'last_name__icontains']
+
+    def label_from_instance(self, obj):
+        return obj.email or str(obj)
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware as BaseMessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware as BaseSessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware as BaseXFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware as BaseCsrfViewMiddleware
+
+# Hooks the handler calls outside of __call__; skipped requests must bypass them too
+HOOKS = ('process_view', 'process_template_response', 'process_exception')
+
+
+def is_api_request(request):
+    return request.path_info.startswith(tuple(settings.API_PATH_PREFIXES))
+
+
+class SkipForApiMixin:
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+def _skipping_hook(name, hook):
+    def wrapper(self, request, *args):
+        if is_api_request(request):
+            # process_template_response must hand the response on, the others return "nothing to do"
+            return args[0] if name == 'process_template_response' else None
+        return hook(self, request, *args)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+def skip_for_api(middleware_class):
+    """
+    Subclass of ``middleware_class`` that does nothing for requests under API_PATH_PREFIXES.
+    Being a subclass it still satisfies the admin's checks for the session, auth and
+    messages middleware.
+    """
+    attrs = {'__module__': __name__, '__doc__': f"{middleware_class.__name__}, skipped for API requests."}
+    for name in HOOKS:
+        hook = getattr(middleware_class, name, None)
+        if hook is not None:
+            attrs[name] = _skipping_hook(name, hook)
+    return type(middleware_class.__name__, (SkipForApiMixin, middleware_class), attrs)
+
+
+# The API authenticates with JWT in DRF and never uses sessions, CSRF cookies, messages
+# or frames, so its requests skip these; the admin, CKEditor and swagger keep them.
+# AuthenticationMiddleware goes too: it needs the session, DRF sets request.user itself.
+SessionMiddleware = skip_for_api(BaseSessionMiddleware)
+CsrfViewMiddleware = skip_for_api(BaseCsrfViewMiddleware)
+AuthenticationMiddleware = skip_for_api(BaseAuthenticationMiddleware)
+MessageMiddleware = skip_for_api(BaseMessageMiddleware)
+XFrameOptionsMiddleware = skip_for_api(BaseXFrameOptionsMiddleware)
@@ -0,0 +1,48 @@
+import logging
+import resource
+import tracemalloc
+
+from django.conf import settings
+
+from apps.core import memory
+from apps.core.instrumentation import view_label
+
+logger = logging.getLogger('apps.core.memory')
+
+
+# Middleware warning about requests that allocate more than MEMORY_REQUEST_WARNING_BYTES.
+# While tracemalloc traces it uses the traced peak, otherwise the growth of the
+# process' maximum RSS (which only shows requests pushing memory to a new high).
+class MemoryGuardMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.MEMORY_SIGNAL_ENABLED:
+            memory.install_signal_handler()
+        if not settings.MEMORY_REQUEST_WARNING_BYTES:
+            return self.get_response(request)
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        response = self.get_response(request)
+
+        if tracing:
+            allocated = tracemalloc.get_traced_memory()[1] - before
+            source = 'traced peak'
+        else:
+            # ru_maxrss is in KiB on Linux
+            allocated = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * 1024
+            source = 'max RSS growth'
+        if allocated > settings.MEMORY_REQUEST_WARNING_BYTES:
+            logger.warning(
+                "%s %s (%s) allocated %.1f MiB (%s), status %s",
+                request.method, request.get_full_path(), view_label(request),
+                allocated / (1024 * 1024), source, response.status_code,
+            )
+        return response
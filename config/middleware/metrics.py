@@ -0,0 +1,26 @@
+import time
+from contextlib import ExitStack
+
+from apps.core import metrics
+from apps.core.instrumentation import QueryCounter, view_label
+
+
+# Middleware recording request latency and database usage per resolved view
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            queries = QueryCounter().install(stack)
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        view = view_label(request)
+        metrics.HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        metrics.HTTP_LATENCY.observe(duration, view=view, method=request.method)
+        metrics.DB_QUERIES.observe(queries.count, view=view)
+        metrics.DB_TIME.observe(queries.duration, view=view)
+        metrics.maybe_flush()
+        return response
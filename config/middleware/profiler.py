@@ -0,0 +1,126 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.http import HttpResponse
+from rest_framework.exceptions import APIException
+
+from apps.accounts.authentication import CachedJWTAuthentication
+from apps.core.instrumentation import QueryLog, view_label
+
+PROFILE_PARAM = '_profile'
+REPORT_PARAM = '_profile_report'
+TOKEN_SALT = 'config.middleware.profiler'
+TOP_FUNCTIONS = 40
+
+
+def make_profile_token():
+    """Token for ``?_profile=<token>``, valid for PROFILER_TOKEN_MAX_AGE seconds (manage.py profiler_token)."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(uuid.uuid4().hex)
+
+
+# Middleware running single requests under cProfile on demand: ?_profile=1 for staff users
+# (session or JWT) or ?_profile=<signed token>. Other requests only pay a substring check.
+class ProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILER_ENABLED or PROFILE_PARAM not in request.META.get('QUERY_STRING', ''):
+            return self.get_response(request)
+        if PROFILE_PARAM not in request.GET or not self.is_allowed(request):
+            return self.get_response(request)
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            queries = QueryLog().install(stack)
+            profile.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.disable()
+        total = time.perf_counter() - start
+
+        report = self.build_report(request, response, profile, queries, total)
+        name = self.store(profile, report)
+        if REPORT_PARAM in request.GET:
+            response = HttpResponse(self.format_report(report), content_type='text/plain; charset=utf-8')
+        response['X-Profile'] = name
+        return response
+
+    def is_allowed(self, request):
+        token = request.GET[PROFILE_PARAM]
+        if token not in ('', '1'):
+            try:
+                signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=settings.PROFILER_TOKEN_MAX_AGE)
+                return True
+            except signing.BadSignature:
+                return False
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            # The API authenticates with JWT inside the view, after all middleware ran
+            try:
+                authenticated = CachedJWTAuthentication().authenticate(request)
+            except APIException:
+                return False
+            user = authenticated[0] if authenticated else None
+        return user is not None and user.is_active and user.is_staff
+
+    def build_report(self, request, response, profile, queries, total):
+        stats = pstats.Stats(profile)
+        functions = []
+        for (filename, line, function), (primitive_calls, calls, own, cumulative, callers) in stats.stats.items():
+            functions.append({
+                'function': f"{filename}:{line}({function})",
+                'calls': calls,
+                'own_ms': round(own * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3),
+            })
+        return {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': view_label(request),
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 3),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'top_cumulative': sorted(functions, key=lambda f: f['cumulative_ms'], reverse=True)[:TOP_FUNCTIONS],
+            'top_own': sorted(functions, key=lambda f: f['own_ms'], reverse=True)[:TOP_FUNCTIONS],
+            'queries': {
+                'count': queries.count,
+                'total_ms': round(queries.duration * 1000, 3),
+                'statements': queries.queries,
+            },
+        }
+
+    def store(self, profile, report):
+        """Write ``<name>.prof`` (pstats, e.g. for snakeviz) and ``<name>.json`` to PROFILER_DIR."""
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{report['view']}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+        profile.dump_stats(os.path.join(settings.PROFILER_DIR, f"{name}.prof"))
+        with open(os.path.join(settings.PROFILER_DIR, f"{name}.json"), 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return name
+
+    def format_report(self, report):
+        out = io.StringIO()
+        out.write(f"{report['method']} {report['path']} -> {report['status']} ({report['view']}), "
+                  f"{report['total_ms']:.1f} ms total\n\n")
+        for title, key in (('Top by cumulative time', 'top_cumulative'), ('Top by own time', 'top_own')):
+            out.write(f"{title}:\n{'calls':>8} {'own ms':>10} {'cum ms':>10}  function\n")
+            for entry in report[key]:
+                out.write(f"{entry['calls']:>8} {entry['own_ms']:>10.2f} {entry['cumulative_ms']:>10.2f}  "
+                          f"{entry['function']}\n")
+            out.write('\n')
+        queries = report['queries']
+        out.write(f"SQL: {queries['count']} queries, {queries['total_ms']:.1f} ms\n")
+        for statement in queries['statements']:
+            out.write(f"{statement['ms']:>10.2f} ms  {statement['sql']}\n")
+        return out.getvalue()
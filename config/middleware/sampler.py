@@ -0,0 +1,28 @@
+import threading
+
+from django.conf import settings
+
+from apps.core import sampler
+from apps.core.instrumentation import view_label
+
+
+# Middleware telling the stack sampler which threads serve a request and for which view
+class SamplerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SAMPLER_ENABLED or not (sampler.is_running() or sampler.start()):
+            return self.get_response(request)
+
+        thread_id = threading.get_ident()
+        sampler.active_threads[thread_id] = view_label(request)
+        try:
+            return self.get_response(request)
+        finally:
+            sampler.active_threads.pop(thread_id, None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        thread_id = threading.get_ident()
+        if thread_id in sampler.active_threads:
+            sampler.active_threads[thread_id] = view_label(request)
@@ -0,0 +1,56 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+
+from apps.core.instrumentation import PhaseTimer, QueryCounter, current_timer
+
+
+# Middleware adding a Server-Timing header (db, serialize, render, total) for staff and sampled requests.
+# The serialize phase comes from install_serializer_timing(), installed by CoreConfig.ready().
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SERVER_TIMING_ENABLED:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        timer = PhaseTimer()
+        token = timer.activate()
+        try:
+            with ExitStack() as stack:
+                queries = QueryCounter().install(stack)
+                response = self.get_response(request)
+        finally:
+            PhaseTimer.deactivate(token)
+        total = time.perf_counter() - start
+
+        if self.should_report(request):
+            response['Server-Timing'] = self.header(timer, queries, total)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook, the callback runs once rendering is done
+        timer = current_timer()
+        if timer is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda r: timer.add('render', time.perf_counter() - started))
+        return response
+
+    def should_report(self, request):
+        # DRF sets request.user on the underlying request after JWT authentication
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and user.is_staff:
+            return True
+        return random.random() < settings.SERVER_TIMING_SAMPLE_RATE
+
+    def header(self, timer, queries, total):
+        entries = [f'db;dur={queries.duration * 1000:.1f};desc="{queries.count} queries"']
+        for phase in ('serialize', 'render'):
+            if phase in timer.phases:
+                entries.append(f'{phase};dur={timer.phases[phase] * 1000:.1f}')
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
@@ -0,0 +1,75 @@
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecYaml
+from drf_yasg.renderers import _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+logger = logging.getLogger(__name__)
+
+API_INFO = openapi.Info(
+    title="Make Up APIs",
+    default_version='v1',
+    description="Make Up Apies",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@snippets.local"),
+    license=openapi.License(name="BSD License"),
+)
+
+SCHEMA_FILES = {'json': 'openapi.json', 'yaml': 'openapi.yaml'}
+
+# (path, mtime) -> (content, etag), reloaded when generate_openapi rewrites the file
+_loaded = {}
+
+
+def schema_path(fmt):
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, SCHEMA_FILES[fmt])
+
+
+def load_schema(fmt):
+    """Content and ETag of the pre-generated schema, or None if it was not generated."""
+    path = schema_path(fmt)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    key = (path, mtime)
+    if key not in _loaded:
+        with open(path, 'rb') as f:
+            content = f.read()
+        _loaded.clear()
+        _loaded[key] = (content, f'"{hashlib.sha256(content).hexdigest()[:32]}"')
+    return _loaded[key]
+
+
+class PregeneratedSchemaView(get_schema_view(API_INFO, public=True, permission_classes=[permissions.AllowAny])):
+    """
+    Schema view serving the files written by ``manage.py generate_openapi`` when
+    OPENAPI_SCHEMA_PREGENERATED is on, instead of introspecting every view per hit.
+    The UI pages only render a template and load the spec from ``?format=openapi``.
+    """
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        if not settings.OPENAPI_SCHEMA_PREGENERATED or not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+
+        fmt = 'yaml' if renderer.codec_class is OpenAPICodecYaml else 'json'
+        schema = load_schema(fmt)
+        if schema is None:
+            logger.warning("%s is missing, run manage.py generate_openapi; generating the schema live", schema_path(fmt))
+            return super().get(request, version, format)
+
+        content, etag = schema
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=f"{renderer.media_type}; charset=utf-8")
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
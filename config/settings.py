@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -24,6 +25,8 @@ LOCAL_APPS = [
     'apps.market',
     'apps.banner',
     'apps.order',
+    'apps.analytics',
+    'apps.core',
 ]
 
 THIRD_PARTY_APPS = [
@@ -55,16 +58,25 @@ LOCAL_MIDDLEWARE = [
     'config.middleware.middleware.Custom404Middleware',
 ]
 
+# Requests under these prefixes skip the session, CSRF, auth, messages and X-Frame-Options
+# middleware (see config/middleware/api.py); everything else gets the full stack
+API_PATH_PREFIXES = [prefix for prefix in os.environ.get('API_PATH_PREFIXES', '/api/').split(',') if prefix]
+
 MIDDLEWARE = [
+    'config.middleware.metrics.MetricsMiddleware',
+    'config.middleware.server_timing.ServerTimingMiddleware',
+    'config.middleware.sampler.SamplerMiddleware',
+    'config.middleware.memory.MemoryGuardMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'config.middleware.api.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.middleware.api.CsrfViewMiddleware',
+    'config.middleware.api.AuthenticationMiddleware',
+    'config.middleware.profiler.ProfilerMiddleware',
+    'config.middleware.api.MessageMiddleware',
+    'config.middleware.api.XFrameOptionsMiddleware',
     *LOCAL_MIDDLEWARE,
 ]
 
@@ -128,14 +140,19 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "/var/www/media/"
 
+# The browsable API is a development tool; production only negotiates JSON and MessagePack
+BROWSABLE_API_ENABLED = os.environ.get('BROWSABLE_API_ENABLED', str(DEBUG)) == 'True'
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'apps.core.renderers.ORJSONRenderer',
+        # Accept: application/msgpack for the mobile clients, when msgpack is installed
+        *(['apps.core.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if BROWSABLE_API_ENABLED else []),
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ),
     "DEFAULT_PARSER_CLASSES": (
         "rest_framework.parsers.JSONParser",
@@ -152,6 +169,109 @@ REST_FRAMEWORK = {
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caches shared by the worker processes: 'file' (directories, one host), 'db' (`manage.py
+# createcachetable <table>` for both tables) or 'redis' (needs the redis package; use it when
+# several hosts serve the site)
+SHARED_CACHE_BACKEND = os.environ.get('SHARED_CACHE_BACKEND', 'file')
+SHARED_CACHE_BACKENDS = {
+    # backend, default LOCATION of 'shared', default LOCATION of 'coordination'
+    'file': ('apps.core.cache_backends.InstrumentedFileBasedCache', '/var/tmp/seedbee_cache', '/var/tmp/seedbee_coordination'),
+    'db': ('apps.core.cache_backends.InstrumentedDatabaseCache', 'seedbee_cache', 'seedbee_coordination'),
+    'redis': ('apps.core.cache_backends.InstrumentedRedisCache', 'redis://127.0.0.1:6379/1', 'redis://127.0.0.1:6379/2'),
+}
+_shared_cache_backend, _shared_cache_location, _coordination_cache_location = SHARED_CACHE_BACKENDS[SHARED_CACHE_BACKEND]
+
+CACHES = {
+    # In-process LRU in front of 'shared' (apps/core/tiered_cache.py); values read from
+    # 'shared' are reused locally for up to CACHE_LOCAL_TIMEOUT seconds
+    'default': {
+        'BACKEND': 'apps.core.tiered_cache.TieredCache',
+        'OPTIONS': {
+            'SHARED_ALIAS': 'shared',
+            'COORDINATION_ALIAS': 'coordination',
+            'LOCAL_MAX_ENTRIES': int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES', 1000)),
+            'LOCAL_TIMEOUT': float(os.environ.get('CACHE_LOCAL_TIMEOUT', 5)),
+            'METRICS_NAME': 'default',
+        },
+    },
+    # Cached data visible to every worker process (parler translations, catalog, JWT users).
+    # Past SHARED_CACHE_MAX_ENTRIES a tenth of the entries is dropped at random.
+    'shared': {
+        'BACKEND': _shared_cache_backend,
+        'LOCATION': os.environ.get('SHARED_CACHE_LOCATION', _shared_cache_location),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('SHARED_CACHE_MAX_ENTRIES', 20000)),
+            'CULL_FREQUENCY': 10,
+            'CULL_INTERVAL': 1,
+            'METRICS_NAME': 'shared',
+        },
+    },
+    # State the workers coordinate through (circuit breakers, cache namespace stamps and locks,
+    # select2 widgets); never loses live entries.
+    # With redis, point it at an instance with maxmemory-policy noeviction.
+    'coordination': {
+        'BACKEND': _shared_cache_backend,
+        'LOCATION': os.environ.get('COORDINATION_CACHE_LOCATION', _coordination_cache_location),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('COORDINATION_CACHE_MAX_ENTRIES', 50000)),
+            'CULL_LIVE_ENTRIES': False,
+            'CULL_INTERVAL': 60,
+            'METRICS_NAME': 'coordination',
+        },
+    },
+}
+
+# Workers evict changed keys from their in-process cache when told so over PostgreSQL
+# LISTEN/NOTIFY on this channel (apps/core/invalidation.py)
+CACHE_INVALIDATION_ENABLED = os.environ.get('CACHE_INVALIDATION_ENABLED', 'True') == 'True'
+CACHE_INVALIDATION_CHANNEL = os.environ.get('CACHE_INVALIDATION_CHANNEL', 'seedbee_cache')
+
+# Per-process metric snapshots merged by /metrics; clear the directory when the server restarts.
+# Snapshots of processes that exited more than METRICS_SNAPSHOT_MAX_AGE seconds ago are deleted.
+METRICS_DIR = os.environ.get('METRICS_DIR', '/var/tmp/seedbee_metrics')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+METRICS_SNAPSHOT_MAX_AGE = int(os.environ.get('METRICS_SNAPSHOT_MAX_AGE', 24 * 60 * 60))
+# Besides staff users, scrapers sending `Authorization: Bearer <token>` may read /metrics (empty: staff only)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Server-Timing header: always for staff users, for everyone else on this fraction of requests (0..1)
+# Enabling it also wraps DRF's Serializer.data at startup to time the serialize phase
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'True') == 'True'
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', 0.0))
+
+# Per-request cProfile for staff or a signed token (manage.py profiler_token), ?_profile=...
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'True') == 'True'
+PROFILER_DIR = os.environ.get('PROFILER_DIR', '/var/tmp/seedbee_profiles')
+PROFILER_TOKEN_MAX_AGE = int(os.environ.get('PROFILER_TOKEN_MAX_AGE', 3600))
+
+# Continuous SIGPROF stack sampler writing collapsed (flamegraph) stacks per view to SAMPLER_DIR.
+# Started by post_worker_init in gunicorn.conf.py, or on the first request of a sync worker otherwise.
+SAMPLER_ENABLED = os.environ.get('SAMPLER_ENABLED', 'False') == 'True'
+SAMPLER_INTERVAL = float(os.environ.get('SAMPLER_INTERVAL', 0.01))
+SAMPLER_DUMP_INTERVAL = float(os.environ.get('SAMPLER_DUMP_INTERVAL', 60))
+SAMPLER_DIR = os.environ.get('SAMPLER_DIR', '/var/tmp/seedbee_stacks')
+SAMPLER_MAX_DEPTH = int(os.environ.get('SAMPLER_MAX_DEPTH', 128))
+
+# tracemalloc diagnostics: staff endpoint /debug/memory and `kill -USR2 <worker pid>` reports;
+# requests allocating more than MEMORY_REQUEST_WARNING_BYTES are logged (0 disables)
+MEMORY_SIGNAL_ENABLED = os.environ.get('MEMORY_SIGNAL_ENABLED', 'True') == 'True'
+MEMORY_DIAGNOSTICS_DIR = os.environ.get('MEMORY_DIAGNOSTICS_DIR', '/var/tmp/seedbee_memory')
+MEMORY_TRACE_FRAMES = int(os.environ.get('MEMORY_TRACE_FRAMES', 10))
+MEMORY_MAX_SNAPSHOTS = int(os.environ.get('MEMORY_MAX_SNAPSHOTS', 10))
+MEMORY_REQUEST_WARNING_BYTES = int(os.environ.get('MEMORY_REQUEST_WARNING_BYTES', 64 * 1024 * 1024))
+
+# Serve the OpenAPI schema written by `manage.py generate_openapi` (run it at build time)
+# instead of generating it on every hit; live generation stays the default in development
+OPENAPI_SCHEMA_PREGENERATED = os.environ.get('OPENAPI_SCHEMA_PREGENERATED', str(not DEBUG)) == 'True'
+OPENAPI_SCHEMA_DIR = os.environ.get('OPENAPI_SCHEMA_DIR', os.path.join(BASE_DIR, 'openapi'))
+
+# django_select2 keeps widget definitions in the cache between page render and the
+# AJAX lookup, which may hit another worker (a lost definition is a 404 in the
+# autocomplete); use admin's bundled select2 assets.
+SELECT2_CACHE_BACKEND = 'coordination'
+SELECT2_JS = 'admin/js/vendor/select2/select2.full.min.js'
+SELECT2_CSS = 'admin/css/vendor/select2/select2.min.css'
+
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
     "http://localhost:8000",
@@ -305,9 +425,31 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# How long CachedJWTAuthentication reuses a resolved user's id and flags (seconds, 0 disables the cache)
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', 300))
+JWT_USER_CACHE = 'shared'
+
+# Create the order archive table range-partitioned by month (PostgreSQL only, read by migration order.0008)
+ORDER_ARCHIVE_PARTITIONED = os.environ.get('ORDER_ARCHIVE_PARTITIONED', 'True') == 'True'
+
+# Rows younger than this are left for the next `update_rollups` run (seconds)
+ROLLUP_SAFETY_LAG = int(os.environ.get('ROLLUP_SAFETY_LAG', 60))
+# Orders waiting for Payme hold the sales rollup back until paid or cancelled, for at most this long (seconds)
+ROLLUP_PENDING_TIMEOUT = int(os.environ.get('ROLLUP_PENDING_TIMEOUT', 24 * 60 * 60))
+
 PAYME_URL = os.environ.get('PAYME_URL', 'https://checkout.test.paycom.uz/api')
 PAYME_ID = os.environ.get('PAYME_ID', 'default_id_here')
 PAYME_KEY = os.environ.get('PAYME_KEY', 'default_key_here')
+# Local stand-in started with `python manage.py payme_stub`, used for load tests and benchmarks
+PAYME_STUB_URL = os.environ.get('PAYME_STUB_URL', 'http://127.0.0.1:8089/api')
+if os.environ.get('PAYME_USE_STUB', 'False') == 'True':
+    PAYME_URL = PAYME_STUB_URL
+PAYME_TIMEOUT = float(os.environ.get('PAYME_TIMEOUT', 10))
+# Total time budget for all Payme calls made while serving a single request (e.g. checkout)
+PAYME_REQUEST_DEADLINE = float(os.environ.get('PAYME_REQUEST_DEADLINE', 15))
+PAYME_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('PAYME_BREAKER_FAILURE_THRESHOLD', 5))
+PAYME_BREAKER_RECOVERY_TIMEOUT = int(os.environ.get('PAYME_BREAKER_RECOVERY_TIMEOUT', 30))
+PAYME_BREAKER_CACHE = 'coordination'
 
 LOGGING = {
     'version': 1,
@@ -1,35 +1,32 @@
 from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.urls import path, include, re_path
 from django.views.static import serve
 from django.conf import settings
 from django.conf.urls.static import static
 from django.utils.translation import gettext_lazy as _
 
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-
-from rest_framework import permissions
+from django_select2.views import AutoResponseView
+from apps.core.views import memory_view, metrics_view
+from config.openapi import PregeneratedSchemaView
 
 # Admin site Russian configuration
 admin.site.site_header = _("Seedbee.uz Администрирование")
 admin.site.site_title = _("Seedbee.uz Администрирование")
 admin.site.index_title = _("Администрирование")
 
-schema_view: get_schema_view = get_schema_view(
-    openapi.Info(
-        title="Make Up APIs",
-        default_version='v1',
-        description="Make Up Apies",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@snippets.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+schema_view = PregeneratedSchemaView
+
+select2_urlpatterns = ([
+    path('fields/auto.json', staff_member_required(AutoResponseView.as_view()), name='auto-json'),
+], 'django_select2')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Admin-only autocomplete lookups (user filter on orders and cards)
+    path('select2/', include(select2_urlpatterns)),
+    path('metrics', metrics_view, name='metrics'),
+    path('debug/memory', staff_member_required(memory_view), name='memory-diagnostics'),
 ]
 
 urlpatterns += [
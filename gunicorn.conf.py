@@ -0,0 +1,54 @@
+# Gunicorn settings, picked up automatically when gunicorn runs from this directory:
+#
+#     gunicorn config.wsgi
+#
+# The application is imported once in the master (GUNICORN_PRELOAD) and warmed up
+# before the first fork (GUNICORN_WARMUP, see apps/core/warmup.py), so workers start
+# serving immediately and share the warmed state with the master copy-on-write.
+import gc
+import os
+import time
+
+wsgi_app = 'config.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 3))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+warmup = os.environ.get('GUNICORN_WARMUP', 'True') == 'True'
+
+if preload_app:
+    # Nothing collected in the master before the freeze; every object created while
+    # importing the app ends up in the permanent generation (see when_ready)
+    gc.disable()
+
+
+def when_ready(server):
+    # Runs in the master after the preload and before the first worker is forked
+    if not preload_app:
+        return
+    from apps.core import warmup as app_warmup
+
+    start = time.perf_counter()
+    if warmup:
+        app_warmup.warm_up()
+    frozen = app_warmup.freeze()
+    gc.enable()
+    server.log.info("Master ready in %.0f ms after the preload, %s objects frozen", (time.perf_counter() - start) * 1000, frozen)
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+
+    from apps.core import invalidation, memory, sampler
+
+    if warmup and not preload_app:
+        from apps.core import warmup as app_warmup
+        app_warmup.warm_up()
+    # Timers and signal handlers do not survive fork(), set them up in the worker's main thread
+    sampler.start()
+    invalidation.start_listener()
+    if settings.MEMORY_SIGNAL_ENABLED:
+        memory.install_signal_handler()